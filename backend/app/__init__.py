@@ -3,24 +3,122 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from datetime import timedelta
+import os
+from app.utils.cache import response_cache
+from app.utils.metrics import metrics
+from app.utils.passwords import password_hasher
+from app.utils.serialization import install_json_provider
+from app.utils.database import build_engine_options, database_config_from_env, install_sqlite_pragmas
 
 db = SQLAlchemy()
 jwt = JWTManager()
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     
     # 配置
     app.config['SECRET_KEY'] = 'your-secret-key-here'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///volunteer_system.db'
+    app.config.update(database_config_from_env())
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = 'jwt-secret-string'
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    # 开启后用户统计读取物化计数器行（user_stats），由报名等操作增量维护
+    app.config['USER_STATS_COUNTERS'] = os.environ.get('USER_STATS_COUNTERS', 'false').lower() in ('true', '1', 'yes')
+    # 公开活动接口的响应缓存：memory（进程内 LRU）/ redis（多进程共享）/ none
+    app.config['RESPONSE_CACHE_BACKEND'] = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    app.config['RESPONSE_CACHE_REDIS_URL'] = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 30))
+    app.config['RESPONSE_CACHE_MAXSIZE'] = 1024
+    # auto：安装了 orjson 时使用更快的 JSON Provider；default：Flask 默认实现
+    app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER', 'auto')
+    # 离线签到批次队列：thread（后台线程批量处理）/ sync（请求内直接处理）
+    app.config['CHECKIN_QUEUE_MODE'] = os.environ.get('CHECKIN_QUEUE_MODE', 'thread')
+    app.config['CHECKIN_QUEUE_POLL_INTERVAL'] = 1.0
+    app.config['CHECKIN_QUEUE_BATCH_LIMIT'] = 100
+    app.config['CHECKIN_QUEUE_CLAIM_TIMEOUT'] = 300
+    # 批次处理失败（如数据库暂时被锁）后按指数退避重试，达到最大次数后标记为 failed
+    app.config['CHECKIN_QUEUE_MAX_ATTEMPTS'] = 5
+    app.config['CHECKIN_QUEUE_RETRY_BACKOFF'] = 2.0
+    # 密码哈希：bcrypt / scrypt / pbkdf2 及其成本参数，参数变化后用户下次登录时（响应发送后）自动重新哈希
+    app.config['PASSWORD_HASHER'] = os.environ.get('PASSWORD_HASHER', 'bcrypt')
+    app.config['BCRYPT_ROUNDS'] = int(os.environ.get('BCRYPT_ROUNDS', 10))
+    app.config['SCRYPT_N'] = int(os.environ.get('SCRYPT_N', 2 ** 15))
+    app.config['SCRYPT_R'] = 8
+    app.config['SCRYPT_P'] = 1
+    app.config['PBKDF2_ITERATIONS'] = int(os.environ.get('PBKDF2_ITERATIONS', 600000))
+    # 哈希计算线程池大小（0 为在请求线程内计算）及排队上限，超出时登录返回 503
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    app.config['PASSWORD_HASH_TIMEOUT'] = 10
+    # JWT 用户快照缓存，受保护接口不必每次按 identity 查询用户
+    app.config['JWT_IDENTITY_CACHE_TTL'] = int(os.environ.get('JWT_IDENTITY_CACHE_TTL', 60))
+    app.config['JWT_IDENTITY_CACHE_MAXSIZE'] = 4096
+    # 流式导出每批读取/写出的行数
+    app.config['EXPORT_BATCH_SIZE'] = 1000
+    # 批量导入：单次最大行数及每次提交的行数
+    app.config['IMPORT_MAX_ROWS'] = 20000
+    app.config['IMPORT_CHUNK_SIZE'] = 1000
+    # 附近活动查询的默认/最大半径（公里）
+    app.config['GEO_DEFAULT_RADIUS_KM'] = 10
+    app.config['GEO_MAX_RADIUS_KM'] = 200
+    # 周期任务：thread（每个进程的后台线程）/ none（由 flask run-jobs 外部触发）
+    app.config['SCHEDULER_MODE'] = os.environ.get('SCHEDULER_MODE', 'thread')
+    app.config['SCHEDULER_TICK'] = 5
+    # 活动/报名状态自动流转的间隔（秒）及未签到报名的宽限期（小时）
+    app.config['STATUS_TRANSITION_INTERVAL'] = int(os.environ.get('STATUS_TRANSITION_INTERVAL', 60))
+    app.config['NO_SHOW_GRACE_HOURS'] = 24
+    # 性能指标：/metrics（Prometheus 格式，仅在设置了 METRICS_TOKEN 时开放并校验令牌）、
+    # Server-Timing 响应头、慢查询日志阈值（毫秒，0 为关闭）
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'true').lower() not in ('false', '0', 'no')
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', 'false').lower() in ('true', '1', 'yes')
+    app.config['SLOW_QUERY_MS'] = int(os.environ.get('SLOW_QUERY_MS', 200))
+    # 只读接口的异步执行路径（需安装异步驱动，如 aiosqlite），同一请求的独立查询并发执行
+    app.config['ASYNC_READS'] = os.environ.get('ASYNC_READS', 'false').lower() in ('true', '1', 'yes')
+    app.config['ASYNC_DATABASE_URL'] = os.environ.get('ASYNC_DATABASE_URL')
+    app.config['ASYNC_DB_POOL_SIZE'] = int(os.environ.get('ASYNC_DB_POOL_SIZE', 10))
+    app.config['ASYNC_READ_TIMEOUT'] = 30
+    # 启动时自动建表/迁移；多实例部署可关闭，改为发布时执行一次 flask upgrade-db
+    app.config['SCHEMA_AUTO_UPGRADE'] = os.environ.get('SCHEMA_AUTO_UPGRADE', 'true').lower() not in ('false', '0', 'no')
+    # 生产服务器 fork 前预热的公开接口
+    app.config['WARMUP_PATHS'] = [
+        '/api/activities/',
+        '/api/activities/?cursor=',
+        '/api/activities/?search=志愿服务',
+        '/api/activities/1',
+    ]
+    
+    # 覆盖默认配置（测试、压测等场景）
+    if config:
+        app.config.update(config)
+    
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', build_engine_options(app.config))
     
     # 初始化扩展
     db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, app.config)
+        if app.config['METRICS_ENABLED']:
+            metrics.init_app(app, db.engine)
     jwt.init_app(app)
     CORS(app)
+    response_cache.init_app(app)
+    password_hasher.init_app(app)
+    install_json_provider(app)
+    
+    from app.utils.checkin_queue import checkin_queue
+    checkin_queue.init_app(app)
+    
+    from app.utils.async_reads import async_reads
+    async_reads.init_app(app)
+    
+    from app.utils.identity import identity_cache
+    identity_cache.init_app(app, jwt)
+    
+    from app.utils.scheduler import scheduler
+    from app.utils.status_transitions import transition_statuses
+    scheduler.add_job('status-transitions', transition_statuses, 'STATUS_TRANSITION_INTERVAL')
+    scheduler.init_app(app)
     
     # 注册蓝图
     from app.routes.auth import auth_bp
@@ -30,9 +128,26 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(activities_bp, url_prefix='/api/activities')
     app.register_blueprint(users_bp, url_prefix='/api/users')
+    if app.config['METRICS_ENABLED'] and app.config['METRICS_TOKEN']:
+        from app.routes.metrics import metrics_bp
+        app.register_blueprint(metrics_bp)
+    
+    # 命令行工具
+    from app.cli import register_commands
+    register_commands(app)
+    
+    # 创建/迁移数据库表结构、全文索引及空间索引；关闭自动迁移时只检测索引是否可用
+    from app.utils.geo import detect_geo_index, init_geo_index
+    from app.utils.schema import upgrade_schema
+    from app.utils.search import detect_search_index, init_search_index
     
-    # 创建数据库表
     with app.app_context():
-        db.create_all()
+        if app.config['SCHEMA_AUTO_UPGRADE']:
+            upgrade_schema(app, db)
+            init_search_index(app, db)
+            init_geo_index(app, db)
+        else:
+            detect_search_index(app, db)
+            detect_geo_index(app, db)
     
     return app
\ No newline at end of file
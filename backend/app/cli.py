@@ -0,0 +1,70 @@
+import json
+import os
+import click
+from app import db
+from app.models.activity_facet import ActivityFacet
+from app.models.user import User
+from app.utils.activity_import import import_activities, read_activity_rows
+from app.utils.geo import init_geo_index
+from app.utils.scheduler import scheduler
+from app.utils.schema import upgrade_schema
+from app.utils.search import init_search_index
+
+
+def register_commands(app):
+    """注册 flask 命令行命令"""
+
+    @app.cli.command('upgrade-db')
+    def upgrade_db_command():
+        """创建/迁移数据库表结构、全文索引及空间索引（SCHEMA_AUTO_UPGRADE=false 时在发布时执行）"""
+        upgrade_schema(app, db)
+        init_search_index(app, db)
+        init_geo_index(app, db)
+        click.echo('Database schema is up to date')
+
+    @app.cli.command('rebuild-facets')
+    def rebuild_facets_command():
+        """按活动表重新统计分类/状态计数（直接修改过数据库后执行）"""
+        rebuilt = ActivityFacet.rebuild()
+        db.session.commit()
+        click.echo(f'Rebuilt {rebuilt} activity facet counts')
+
+    @app.cli.command('import-activities')
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--created-by', required=True, help='活动创建者的用户名')
+    @click.option('--format', 'import_format', type=click.Choice(['csv', 'json', 'ndjson']),
+                  help='文件格式，默认按扩展名判断')
+    @click.option('--chunk-size', type=int, default=None, help='每次提交的行数')
+    @click.option('--dry-run', is_flag=True, help='只校验不写入')
+    def import_activities_command(path, created_by, import_format, chunk_size, dry_run):
+        """从 CSV / JSON / NDJSON 文件批量导入活动"""
+        user = User.query.filter_by(username=created_by).first()
+        if user is None:
+            raise click.ClickException(f'User not found: {created_by}')
+
+        import_format = import_format or os.path.splitext(path)[1].lstrip('.').lower()
+        with open(path, encoding='utf-8') as f:
+            try:
+                rows = read_activity_rows(f.read(), import_format)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+
+        report = import_activities(
+            rows, user.id,
+            chunk_size=chunk_size or app.config.get('IMPORT_CHUNK_SIZE', 1000),
+            dry_run=dry_run
+        )
+        for error in report['errors']:
+            click.echo(f"row {error['row']}: {error['error']}", err=True)
+        click.echo(json.dumps(
+            {key: value for key, value in report.items() if key != 'errors'}, ensure_ascii=False
+        ))
+
+    @app.cli.command('run-jobs')
+    @click.option('--job', 'names', multiple=True, help='只运行指定任务，可重复')
+    def run_jobs_command(names):
+        """立即运行一次周期任务（SCHEDULER_MODE=none 时可由 cron 调用）"""
+        for name in names or scheduler.jobs:
+            if name not in scheduler.jobs:
+                raise click.ClickException(f'Unknown job: {name}')
+            click.echo(f'{name}: {json.dumps(scheduler.run(name), ensure_ascii=False)}')
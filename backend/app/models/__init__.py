@@ -1,5 +1,10 @@
 from .user import User
 from .activity import Activity
 from .registration import Registration
+from .user_stats import UserStats
+from .checkin_batch import CheckInBatch
+from .monthly_hours import MonthlyHours
+from .hours_ledger import HoursLedgerEntry
+from .activity_facet import ActivityFacet
 
-__all__ = ['User', 'Activity', 'Registration']
\ No newline at end of file
+__all__ = ['User', 'Activity', 'Registration', 'UserStats', 'CheckInBatch', 'MonthlyHours', 'HoursLedgerEntry', 'ActivityFacet']
\ No newline at end of file
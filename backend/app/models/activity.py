@@ -1,4 +1,6 @@
+from collections import defaultdict
 from app import db
+from app.utils.serialization import Projection
 from datetime import datetime
 
 class Activity(db.Model):
@@ -19,10 +21,26 @@ class Activity(db.Model):
     contact_person = db.Column(db.String(50))
     contact_phone = db.Column(db.String(20))
     image_url = db.Column(db.String(255))
+    latitude = db.Column(db.Float)  # 活动地点坐标（可选），用于附近活动查询
+    longitude = db.Column(db.Float)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # 与列表查询的筛选/排序方式对应的复合索引（SQLite 索引隐含 id 作为末列）
+    __table_args__ = (
+        db.Index('ix_activities_status_created_at', 'status', 'created_at'),
+        db.Index('ix_activities_category_status_created_at', 'category', 'status', 'created_at'),
+        db.Index('ix_activities_created_by_created_at', 'created_by', 'created_at'),
+        # 定时任务按结束时间查找需要流转状态的活动
+        db.Index('ix_activities_status_end_time', 'status', 'end_time'),
+        # 按开始时间窗口查询；附近活动在没有 R*Tree 索引时按纬度范围缩小扫描
+        db.Index('ix_activities_status_start_time', 'status', 'start_time'),
+        db.Index('ix_activities_latitude_longitude', 'latitude', 'longitude'),
+        # 活动列表的 ETag 取全表最大 updated_at
+        db.Index('ix_activities_updated_at', 'updated_at'),
+    )
+    
     # 关系
     registrations = db.relationship('Registration', backref='activity', lazy=True)
     creator = db.relationship('User', backref='created_activities')
@@ -37,8 +55,66 @@ class Activity(db.Model):
         """检查活动是否仍在进行中"""
         return self.status == 'active' and self.start_time > datetime.utcnow()
     
-    def to_dict(self):
-        """转换为字典"""
+    @classmethod
+    def reserve_seat(cls, activity_id):
+        """原子地占用一个名额，满员时返回 False
+
+        使用带条件的 UPDATE 在数据库内完成“检查+加一”，并发报名时不会超员。
+        """
+        updated = cls.query.filter(
+            cls.id == activity_id,
+            cls.current_participants < cls.max_participants
+        ).update(
+            {cls.current_participants: cls.current_participants + 1},
+            synchronize_session=False
+        )
+        return updated == 1
+    
+    @classmethod
+    def release_seat(cls, activity_id):
+        """原子地释放一个名额"""
+        cls.query.filter(
+            cls.id == activity_id,
+            cls.current_participants > 0
+        ).update(
+            {cls.current_participants: cls.current_participants - 1},
+            synchronize_session=False
+        )
+    
+    @classmethod
+    def complete_expired(cls, now=None):
+        """将已结束但仍为 active 的活动标记为 completed（集合 UPDATE，不提交事务）
+
+        按分类分块更新，以实际更新的行数同步分类计数。返回被更新的活动 id 列表。
+        """
+        from app.models.activity_facet import ActivityFacet
+        
+        now = now or datetime.utcnow()
+        by_category = defaultdict(list)
+        for row in db.session.query(cls.id, cls.category).filter(
+            cls.status == 'active', cls.end_time <= now
+        ):
+            by_category[row.category].append(row.id)
+        
+        ids, deltas = [], {}
+        for category, category_ids in by_category.items():
+            updated = 0
+            for start in range(0, len(category_ids), 500):
+                updated += cls.query.filter(
+                    cls.id.in_(category_ids[start:start + 500]), cls.status == 'active'
+                ).update(
+                    {cls.status: 'completed', cls.updated_at: now},
+                    synchronize_session=False
+                )
+            ids.extend(category_ids)
+            deltas[(category, 'active')] = -updated
+            deltas[(category, 'completed')] = updated
+        ActivityFacet.add(deltas)
+        return ids
+    
+    def to_dict(self, now=None):
+        """转换为字典，批量序列化时可传入同一个 now"""
+        now = now or datetime.utcnow()
         return {
             'id': self.id,
             'title': self.title,
@@ -55,11 +131,46 @@ class Activity(db.Model):
             'contact_person': self.contact_person,
             'contact_phone': self.contact_phone,
             'image_url': self.image_url,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'created_by': self.created_by,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'is_full': self.is_full,
-            'is_active': self.is_active
+            'is_active': self.status == 'active' and self.start_time > now
         }
     
     def __repr__(self):
-        return f'<Activity {self.title}>'
\ No newline at end of file
+        return f'<Activity {self.title}>'
+
+# 列表接口使用的列投影，默认输出与 to_dict() 一致；
+# excerpt 为 SQL 截取的描述摘要，列表视图无需加载完整的描述文本
+ACTIVITY_FULL_FIELDS = [
+    'id', 'title', 'description', 'location', 'start_time', 'end_time',
+    'max_participants', 'current_participants', 'status', 'category',
+    'volunteer_hours', 'requirements', 'contact_person', 'contact_phone',
+    'image_url', 'latitude', 'longitude', 'created_by', 'created_at', 'is_full', 'is_active'
+]
+ACTIVITY_SUMMARY_FIELDS = [
+    'id', 'title', 'excerpt', 'location', 'start_time', 'end_time',
+    'max_participants', 'current_participants', 'status', 'category',
+    'volunteer_hours', 'image_url', 'latitude', 'longitude', 'created_by', 'created_at',
+    'is_full', 'is_active'
+]
+ACTIVITY_PROJECTION = Projection(
+    Activity,
+    [f for f in ACTIVITY_FULL_FIELDS if not f.startswith('is_')] + [
+        ('excerpt', db.func.substr(Activity.description, 1, 120))
+    ],
+    computed={
+        'is_full': (
+            ('current_participants', 'max_participants'),
+            lambda row, now: row['current_participants'] >= row['max_participants']
+        ),
+        'is_active': (
+            ('status', 'start_time'),
+            lambda row, now: row['status'] == 'active' and row['start_time'] > now
+        ),
+    },
+    presets={'summary': ACTIVITY_SUMMARY_FIELDS, 'full': ACTIVITY_FULL_FIELDS},
+    output=ACTIVITY_FULL_FIELDS
+)
@@ -0,0 +1,94 @@
+from collections import defaultdict
+from app import db
+from app.models.activity import Activity
+from sqlalchemy.exc import IntegrityError
+
+class ActivityFacet(db.Model):
+    """按 (分类, 状态) 汇总的活动数量，由创建、导入与状态流转增量维护，用于筛选栏计数"""
+    __tablename__ = 'activity_facets'
+    
+    # 分类为空（NULL）的活动计入空字符串
+    category = db.Column(db.String(50), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @staticmethod
+    def add(deltas):
+        """按 {(分类, 状态): 增量} 更新计数，缺失的行直接插入（不提交事务）
+
+        先 UPDATE，未命中时在保存点中 INSERT；并发插入同一行冲突时回退为 UPDATE。
+        """
+        merged = defaultdict(int)
+        for (category, status), delta in deltas.items():
+            merged[(category or '', status)] += delta
+        
+        for (category, status), delta in merged.items():
+            if not delta:
+                continue
+            key = {'category': category, 'status': status}
+            updated = ActivityFacet.query.filter_by(**key).update(
+                {ActivityFacet.count: ActivityFacet.count + delta}, synchronize_session=False
+            )
+            if updated:
+                continue
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(ActivityFacet.__table__.insert(), [dict(key, count=delta)])
+            except IntegrityError:
+                ActivityFacet.query.filter_by(**key).update(
+                    {ActivityFacet.count: ActivityFacet.count + delta}, synchronize_session=False
+                )
+    
+    @staticmethod
+    def rebuild():
+        """按 activities 表重新统计全部计数（不提交事务），返回写入的行数"""
+        # NULL 与空字符串分类合并为同一行
+        merged = defaultdict(int)
+        for category, status, count in db.session.query(
+            Activity.category, Activity.status, db.func.count(Activity.id)
+        ).group_by(Activity.category, Activity.status):
+            merged[(category or '', status)] += count
+
+        ActivityFacet.query.delete(synchronize_session=False)
+        if merged:
+            db.session.execute(ActivityFacet.__table__.insert(), [
+                {'category': category, 'status': status, 'count': count}
+                for (category, status), count in merged.items()
+            ])
+        return len(merged)
+    
+    @staticmethod
+    def counts(category=None, status=None):
+        """读取全部计数（一次小表查询），返回各分类、各状态的数量及总数
+
+        分类计数只按 status 筛选，状态计数只按 category 筛选（每个维度不受自身筛选影响），
+        total 同时满足两个筛选条件；status / category 为 None 时不筛选。
+        """
+        return _summarize(
+            db.session.query(ActivityFacet.category, ActivityFacet.status, ActivityFacet.count),
+            category, status
+        )
+    
+    def __repr__(self):
+        return f'<ActivityFacet {self.category}/{self.status}: {self.count}>'
+
+def _summarize(rows, category, status):
+    categories, statuses, total = defaultdict(int), defaultdict(int), 0
+    for row_category, row_status, count in rows:
+        row_category = row_category or ''
+        if not count:
+            continue
+        if status is None or row_status == status:
+            categories[row_category] += count
+        if category is None or row_category == category:
+            statuses[row_status] += count
+        if (status is None or row_status == status) and (category is None or row_category == category):
+            total += count
+    return {'categories': dict(categories), 'statuses': dict(statuses), 'total': total}
+
+def live_facet_counts(query, category=None, status=None):
+    """对任意活动查询（如带关键词搜索）按 (分类, 状态) 实时 GROUP BY 计数，返回格式同 counts()"""
+    rows = query.with_entities(
+        Activity.category, Activity.status, db.func.count(Activity.id)
+    ).order_by(None).group_by(Activity.category, Activity.status)
+    return _summarize(rows, category, status)
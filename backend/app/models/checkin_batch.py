@@ -0,0 +1,42 @@
+from app import db
+from datetime import datetime
+
+class CheckInBatch(db.Model):
+    """签到终端上传的签到批次，按幂等键去重，由后台队列按到达顺序处理"""
+    __tablename__ = 'checkin_batches'
+    
+    id = db.Column(db.Integer, primary_key=True)  # 自增 id 即到达顺序
+    idempotency_key = db.Column(db.String(100), unique=True, nullable=False)
+    activity_id = db.Column(db.Integer, db.ForeignKey('activities.id'), nullable=False)
+    submitted_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    items = db.Column(db.JSON, nullable=False)  # [{registration_id, checked_in_at}]
+    status = db.Column(db.String(20), default='pending')  # pending, processing, applied, failed
+    attempts = db.Column(db.Integer, default=0)  # 已认领处理的次数
+    retry_at = db.Column(db.DateTime)  # 处理失败后等待重试，此前不会被认领
+    results = db.Column(db.JSON)  # 每一项的处理结果
+    error = db.Column(db.Text)
+    claimed_by = db.Column(db.String(64))  # 正在处理该批次的工作线程
+    claimed_at = db.Column(db.DateTime)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    applied_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_checkin_batches_status_id', 'status', 'id'),
+    )
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'batch_id': self.idempotency_key,
+            'activity_id': self.activity_id,
+            'status': self.status,
+            'item_count': len(self.items or []),
+            'results': self.results,
+            'error': self.error,
+            'attempts': self.attempts or 0,
+            'received_at': self.received_at.isoformat() if self.received_at else None,
+            'applied_at': self.applied_at.isoformat() if self.applied_at else None
+        }
+    
+    def __repr__(self):
+        return f'<CheckInBatch {self.idempotency_key}>'
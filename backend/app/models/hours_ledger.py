@@ -0,0 +1,117 @@
+from app import db
+from app.models.activity import Activity
+from app.models.monthly_hours import MonthlyHours
+from app.models.registration import Registration
+from app.models.user import User
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import func
+
+class HoursLedgerEntry(db.Model):
+    """志愿时长流水（只追加），users.volunteer_hours 与 monthly_hours 为其增量汇总"""
+    __tablename__ = 'hours_ledger'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    activity_id = db.Column(db.Integer, db.ForeignKey('activities.id'))
+    registration_id = db.Column(db.Integer, db.ForeignKey('registrations.id'))
+    hours = db.Column(db.Float, nullable=False)
+    reason = db.Column(db.String(20), nullable=False, default='completion')  # completion, backfill, adjustment
+    period = db.Column(db.String(7), nullable=False)  # YYYY-MM，对应 monthly_hours
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_hours_ledger_user_time', 'user_id', 'created_at'),
+    )
+    
+    @staticmethod
+    def period_of(moment):
+        """流水所属的月份"""
+        return moment.strftime('%Y-%m')
+    
+    @staticmethod
+    def record(user_ids, hours, activity_id=None, registration_ids=None, reason='completion'):
+        """为一批用户记一笔相同的时长，并增量更新个人总时长与月度汇总（不提交事务）
+        
+        registration_ids 与 user_ids 一一对应（可省略）。
+        """
+        if not user_ids or not hours:
+            return
+        
+        now = datetime.utcnow()
+        period = HoursLedgerEntry.period_of(now)
+        registration_ids = registration_ids or [None] * len(user_ids)
+        db.session.execute(HoursLedgerEntry.__table__.insert(), [
+            {'user_id': user_id, 'activity_id': activity_id, 'registration_id': registration_id,
+             'hours': hours, 'reason': reason, 'period': period, 'created_at': now}
+            for user_id, registration_id in zip(user_ids, registration_ids)
+        ])
+        User.add_volunteer_hours(user_ids, hours)
+        MonthlyHours.add(user_ids, period, hours)
+    
+    @staticmethod
+    def backfill():
+        """由已完成的报名补建流水与月度汇总（流水表新建时执行一次，不提交事务）
+        
+        已有的 users.volunteer_hours 保持不变；与补建流水合计不一致的差额
+        记为一笔 adjustment，使流水合计与个人总时长一致。返回写入的流水条数。
+        """
+        now = datetime.utcnow()
+        rows = []
+        for registration in db.session.query(
+            Registration.id, Registration.user_id, Registration.activity_id,
+            Registration.completion_time, Activity.volunteer_hours
+        ).join(Activity, Activity.id == Registration.activity_id).filter(
+            Registration.status == 'completed', Activity.volunteer_hours > 0
+        ):
+            completed_at = registration.completion_time or now
+            rows.append({
+                'user_id': registration.user_id, 'activity_id': registration.activity_id,
+                'registration_id': registration.id, 'hours': registration.volunteer_hours,
+                'reason': 'backfill', 'period': HoursLedgerEntry.period_of(completed_at),
+                'created_at': completed_at
+            })
+        
+        totals = defaultdict(float)
+        for row in rows:
+            totals[row['user_id']] += row['hours']
+        for user_id, volunteer_hours in db.session.query(User.id, User.volunteer_hours).filter(
+            User.volunteer_hours != 0
+        ):
+            difference = (volunteer_hours or 0) - totals[user_id]
+            if abs(difference) > 1e-9:
+                rows.append({
+                    'user_id': user_id, 'activity_id': None, 'registration_id': None,
+                    'hours': difference, 'reason': 'adjustment',
+                    'period': HoursLedgerEntry.period_of(now), 'created_at': now
+                })
+        
+        if not rows:
+            return 0
+        db.session.execute(HoursLedgerEntry.__table__.insert(), rows)
+        
+        # 由流水重建月度汇总
+        db.session.execute(MonthlyHours.__table__.delete())
+        db.session.execute(MonthlyHours.__table__.insert().from_select(
+            ['user_id', 'period', 'hours'],
+            db.session.query(
+                HoursLedgerEntry.user_id, HoursLedgerEntry.period, func.sum(HoursLedgerEntry.hours)
+            ).group_by(HoursLedgerEntry.user_id, HoursLedgerEntry.period)
+        ))
+        return len(rows)
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'activity_id': self.activity_id,
+            'registration_id': self.registration_id,
+            'hours': self.hours,
+            'reason': self.reason,
+            'period': self.period,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    def __repr__(self):
+        return f'<HoursLedgerEntry User:{self.user_id} {self.hours}>'
@@ -0,0 +1,58 @@
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from app import db
+
+class MonthlyHours(db.Model):
+    """按月汇总的志愿时长（由时长流水增量维护），用于月度排行"""
+    __tablename__ = 'monthly_hours'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    period = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    hours = db.Column(db.Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        db.Index('ix_monthly_hours_period_rank', 'period', db.desc('hours'), 'user_id'),
+    )
+    
+    @staticmethod
+    def _increment(user_ids, period, hours):
+        """为已有汇总行的用户累加时长，返回被更新的用户 id 集合"""
+        condition = (MonthlyHours.period == period, MonthlyHours.user_id.in_(user_ids))
+        if db.engine.dialect.update_returning:
+            return set(db.session.execute(
+                update(MonthlyHours).where(*condition).values(hours=MonthlyHours.hours + hours)
+                .returning(MonthlyHours.user_id)
+            ).scalars())
+        existing = {user_id for user_id, in db.session.query(MonthlyHours.user_id).filter(*condition)}
+        if existing:
+            MonthlyHours.query.filter(*condition).update(
+                {MonthlyHours.hours: MonthlyHours.hours + hours}, synchronize_session=False
+            )
+        return existing
+    
+    @staticmethod
+    def add(user_ids, period, hours, chunk_size=500):
+        """为一批用户累加某月的时长，缺失的汇总行直接插入（不提交事务）
+
+        先 UPDATE，缺失的行在保存点中 INSERT；并发插入同一行冲突时回退为 UPDATE 后重试。
+        """
+        user_ids = list(set(user_ids))
+        for start in range(0, len(user_ids), chunk_size):
+            missing = user_ids[start:start + chunk_size]
+            while missing:
+                updated = MonthlyHours._increment(missing, period, hours)
+                missing = [user_id for user_id in missing if user_id not in updated]
+                if not missing:
+                    break
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(MonthlyHours.__table__.insert(), [
+                            {'user_id': user_id, 'period': period, 'hours': hours} for user_id in missing
+                        ])
+                    break
+                except IntegrityError:
+                    # 其他事务已插入其中部分行，保存点回滚后重新 UPDATE
+                    continue
+    
+    def __repr__(self):
+        return f'<MonthlyHours User:{self.user_id} {self.period}>'
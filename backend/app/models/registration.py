@@ -1,5 +1,8 @@
 from app import db
+from app.models.activity import Activity
+from app.utils.serialization import Projection
 from datetime import datetime
+from sqlalchemy import case, update
 
 class Registration(db.Model):
     __tablename__ = 'registrations'
@@ -7,7 +10,7 @@ class Registration(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     activity_id = db.Column(db.Integer, db.ForeignKey('activities.id'), nullable=False)
-    status = db.Column(db.String(20), default='registered')  # registered, checked_in, completed, cancelled
+    status = db.Column(db.String(20), default='registered')  # registered, checked_in, completed, cancelled, absent
     registration_time = db.Column(db.DateTime, default=datetime.utcnow)
     check_in_time = db.Column(db.DateTime)
     completion_time = db.Column(db.DateTime)
@@ -15,8 +18,17 @@ class Registration(db.Model):
     rating = db.Column(db.Integer)  # 活动评分 1-5
     feedback = db.Column(db.Text)  # 反馈意见
     
-    # 复合唯一约束，确保用户不能重复报名同一活动
-    __table_args__ = (db.UniqueConstraint('user_id', 'activity_id', name='unique_user_activity'),)
+    # 复合唯一约束，确保用户不能重复报名同一活动；
+    # 以及与“我的报名”、统计等查询对应的复合索引
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'activity_id', name='unique_user_activity'),
+        db.Index('ix_registrations_user_time', 'user_id', 'registration_time'),
+        db.Index('ix_registrations_user_status_time', 'user_id', 'status', 'registration_time'),
+        db.Index('ix_registrations_activity_status', 'activity_id', 'status'),
+    )
+    
+    # IN (...) 子句每批的最大参数个数
+    BULK_CHUNK_SIZE = 500
     
     def check_in(self):
         """签到"""
@@ -45,6 +57,110 @@ class Registration(db.Model):
             return True
         return False
     
+    @classmethod
+    def close_no_shows(cls, ended_before):
+        """活动结束于 ended_before 之前仍未签到的报名标记为 absent（集合 UPDATE，不提交事务）
+
+        宽限期内的报名保持不变，离线签到终端延迟上传的签到仍可生效。返回更新的行数。
+        """
+        ended = db.session.query(Activity.id).filter(
+            Activity.status.in_(('active', 'completed')),
+            Activity.end_time <= ended_before
+        )
+        return cls.query.filter(
+            cls.activity_id.in_(ended.scalar_subquery()),
+            cls.status == 'registered'
+        ).update({cls.status: 'absent'}, synchronize_session=False)
+    
+    @classmethod
+    def bulk_transition(cls, activity_id, from_status, to_status, time_field, registration_ids=None):
+        """批量状态流转（签到/完成），用集合 UPDATE 代替逐条修改
+
+        registration_ids 为 None 时处理该活动下所有处于 from_status 的报名。
+        成功的报名取自 UPDATE 实际修改的行（UPDATE ... RETURNING；数据库不支持时先加行锁再读取），
+        并发事务已改变状态的报名不会被计为成功。
+        不提交事务，返回 (成功的 (id, user_id) 列表, 每一项的处理结果)。
+        """
+        now = datetime.utcnow()
+        values = {cls.status: to_status, getattr(cls, time_field): now}
+        
+        def transition(*criteria):
+            condition = (cls.activity_id == activity_id, cls.status == from_status) + criteria
+            if db.engine.dialect.update_returning:
+                return db.session.execute(
+                    update(cls).where(*condition).values(values).returning(cls.id, cls.user_id)
+                ).all()
+            rows = db.session.query(cls.id, cls.user_id).filter(*condition).with_for_update().all()
+            if rows:
+                cls.query.filter(cls.id.in_([row.id for row in rows])).update(
+                    values, synchronize_session=False
+                )
+            return rows
+        
+        if registration_ids is None:
+            succeeded = [tuple(row) for row in transition()]
+            succeeded.sort()
+            registration_ids = [registration_id for registration_id, _ in succeeded]
+        else:
+            succeeded = []
+            for start in range(0, len(registration_ids), cls.BULK_CHUNK_SIZE):
+                chunk = registration_ids[start:start + cls.BULK_CHUNK_SIZE]
+                succeeded.extend(tuple(row) for row in transition(cls.id.in_(chunk)))
+            order = {registration_id: i for i, registration_id in enumerate(registration_ids)}
+            succeeded.sort(key=lambda row: order[row[0]])
+        
+        # 未更新的报名再查询当前状态，用于说明失败原因
+        updated = {registration_id for registration_id, _ in succeeded}
+        missed = [registration_id for registration_id in registration_ids if registration_id not in updated]
+        current = {}
+        for start in range(0, len(missed), cls.BULK_CHUNK_SIZE):
+            current.update(db.session.query(cls.id, cls.status).filter(
+                cls.activity_id == activity_id,
+                cls.id.in_(missed[start:start + cls.BULK_CHUNK_SIZE])
+            ).all())
+        
+        results = []
+        for registration_id in registration_ids:
+            if registration_id in updated:
+                results.append({'registration_id': registration_id, 'success': True,
+                                'status': to_status})
+            elif registration_id not in current:
+                results.append({'registration_id': registration_id, 'success': False,
+                                'error': 'Registration not found'})
+            else:
+                results.append({'registration_id': registration_id, 'success': False,
+                                'error': f'Registration is {current[registration_id]}'})
+        return succeeded, results
+    
+    @classmethod
+    def check_in_at(cls, check_in_times):
+        """按 {报名 id: 签到时间} 将仍处于 registered 的报名改为 checked_in（不提交事务）
+
+        每块一条带 CASE 的集合 UPDATE，保留各自的签到时间；实际更新的行取自 UPDATE ... RETURNING
+        （数据库不支持时先加行锁再读取）。返回 {实际签到的报名 id: user_id}。
+        """
+        registration_ids = list(check_in_times)
+        checked_in = {}
+        for start in range(0, len(registration_ids), cls.BULK_CHUNK_SIZE):
+            chunk = registration_ids[start:start + cls.BULK_CHUNK_SIZE]
+            condition = (cls.id.in_(chunk), cls.status == 'registered')
+            values = {
+                cls.status: 'checked_in',
+                cls.check_in_time: case({rid: check_in_times[rid] for rid in chunk}, value=cls.id)
+            }
+            if db.engine.dialect.update_returning:
+                rows = db.session.execute(
+                    update(cls).where(*condition).values(values).returning(cls.id, cls.user_id)
+                ).all()
+            else:
+                rows = db.session.query(cls.id, cls.user_id).filter(*condition).with_for_update().all()
+                if rows:
+                    cls.query.filter(cls.id.in_([row.id for row in rows])).update(
+                        values, synchronize_session=False
+                    )
+            checked_in.update((row.id, row.user_id) for row in rows)
+        return checked_in
+    
     def to_dict(self):
         """转换为字典"""
         return {
@@ -61,4 +177,13 @@ class Registration(db.Model):
         }
     
     def __repr__(self):
-        return f'<Registration User:{self.user_id} Activity:{self.activity_id}>'
\ No newline at end of file
+        return f'<Registration User:{self.user_id} Activity:{self.activity_id}>'
+
+# 列表接口使用的列投影，与 to_dict() 输出一致
+REGISTRATION_PROJECTION = Projection(
+    Registration,
+    [
+        'id', 'user_id', 'activity_id', 'status', 'registration_time',
+        'check_in_time', 'completion_time', 'notes', 'rating', 'feedback'
+    ]
+)
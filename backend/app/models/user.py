@@ -1,6 +1,7 @@
 from app import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from functools import partial
+from app.utils.passwords import password_hasher
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -22,11 +23,33 @@ class User(db.Model):
     
     def set_password(self, password):
         """设置密码哈希"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        """验证密码"""
-        return check_password_hash(self.password_hash, password)
+        """验证密码；哈希算法或参数与当前配置不同时，在响应发送后重新哈希"""
+        matched, rehash = password_hasher.verify(password, self.password_hash)
+        if matched and rehash:
+            password_hasher.rehash_after_response(
+                password, partial(User.replace_password_hash, self.id, self.password_hash)
+            )
+        return matched
+    
+    @classmethod
+    def replace_password_hash(cls, user_id, old_hash, new_hash):
+        """替换密码哈希并提交；其间密码已被修改时保持不变"""
+        cls.query.filter_by(id=user_id, password_hash=old_hash).update(
+            {cls.password_hash: new_hash}, synchronize_session=False
+        )
+        db.session.commit()
+    
+    @classmethod
+    def add_volunteer_hours(cls, user_ids, hours, chunk_size=500):
+        """用集合 UPDATE 为一批用户累加志愿时长（不提交事务）"""
+        for start in range(0, len(user_ids), chunk_size):
+            cls.query.filter(cls.id.in_(user_ids[start:start + chunk_size])).update(
+                {cls.volunteer_hours: cls.volunteer_hours + hours},
+                synchronize_session=False
+            )
     
     def to_dict(self):
         """转换为字典"""
@@ -43,4 +66,7 @@ class User(db.Model):
         }
     
     def __repr__(self):
-        return f'<User {self.username}>'
\ No newline at end of file
+        return f'<User {self.username}>'
+
+# 按总时长排行（降序，时长相同按 id 升序）
+db.Index('ix_users_hours_rank', User.volunteer_hours.desc(), User.id)
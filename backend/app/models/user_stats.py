@@ -0,0 +1,142 @@
+from app import db
+from app.models.activity import Activity
+from app.models.registration import Registration
+from app.models.user import User
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from app.utils.async_reads import async_reads
+
+class UserStats(db.Model):
+    """用户统计计数器（物化行），由报名、签到、完成等操作增量维护"""
+    __tablename__ = 'user_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total_registrations = db.Column(db.Integer, nullable=False, default=0)
+    checked_in_activities = db.Column(db.Integer, nullable=False, default=0)
+    completed_activities = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_activities = db.Column(db.Integer, nullable=False, default=0)
+    created_activities = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    COUNTERS = (
+        'total_registrations', 'completed_activities', 'checked_in_activities',
+        'cancelled_activities', 'created_activities'
+    )
+    
+    @staticmethod
+    def aggregate(user_id, read_only=False):
+        """用一条聚合查询计算用户统计（按状态条件求和）
+
+        read_only 为真时（只读接口）通过 async_reads 执行，开启 ASYNC_READS 时走异步引擎；
+        写事务中回填计数器需要读到未提交的变更，使用当前会话。
+        一条语句只需一次往返，比拆成子查询并发执行更快。
+        """
+        def status_count(status):
+            return func.coalesce(func.sum(case((Registration.status == status, 1), else_=0)), 0)
+        
+        volunteer_hours = db.session.query(User.volunteer_hours).filter(
+            User.id == user_id
+        ).scalar_subquery()
+        created_activities = db.session.query(func.count(Activity.id)).filter(
+            Activity.created_by == user_id
+        ).scalar_subquery()
+        
+        query = db.session.query(
+            func.count(Registration.id),
+            status_count('completed'),
+            status_count('checked_in'),
+            status_count('cancelled'),
+            created_activities,
+            volunteer_hours
+        ).filter(Registration.user_id == user_id)
+        if read_only:
+            rows, = async_reads.fetch_all(query.statement)
+            row = rows[0]
+        else:
+            row = query.one()
+        
+        stats = dict(zip(UserStats.COUNTERS, row[:5]))
+        stats['volunteer_hours'] = row[5] or 0
+        return stats
+    
+    @staticmethod
+    def _increment(user_ids, deltas):
+        """为已有计数器行的用户累加增量，返回更新的行数"""
+        return UserStats.query.filter(UserStats.user_id.in_(user_ids)).update({
+            getattr(UserStats, name): getattr(UserStats, name) + delta
+            for name, delta in deltas.items()
+        }, synchronize_session=False)
+    
+    @staticmethod
+    def _create(user_id, deltas=None):
+        """按聚合结果创建计数器行，返回聚合结果（不提交事务）
+
+        INSERT 在保存点中执行；其他事务已并发创建该行时回滚保存点，
+        改为对已有行应用本次增量（对方的聚合结果看不到本事务未提交的变更）。
+        """
+        stats = UserStats.aggregate(user_id)
+        try:
+            with db.session.begin_nested():
+                db.session.execute(UserStats.__table__.insert(), [dict(
+                    user_id=user_id, updated_at=datetime.utcnow(),
+                    **{name: stats[name] for name in UserStats.COUNTERS}
+                )])
+        except IntegrityError:
+            if deltas:
+                UserStats._increment([user_id], deltas)
+        return stats
+    
+    @staticmethod
+    def load(user_id):
+        """按主键读取物化计数器，缺失时按聚合结果回填"""
+        row = db.session.query(UserStats, User.volunteer_hours).join(
+            User, User.id == UserStats.user_id
+        ).filter(UserStats.user_id == user_id).first()
+        
+        if row is None:
+            stats = UserStats._create(user_id)
+            db.session.commit()
+            return stats
+        
+        counters, volunteer_hours = row
+        stats = counters.to_dict()
+        stats['volunteer_hours'] = volunteer_hours or 0
+        return stats
+    
+    @staticmethod
+    def bump(user_id, **deltas):
+        """增量更新计数器，需在调用方提交事务前调用
+
+        仅在 USER_STATS_COUNTERS 开启时生效。计数器行不存在时，
+        直接按当前（已包含本次变更的）聚合结果创建。
+        """
+        if not current_app.config.get('USER_STATS_COUNTERS'):
+            return
+        
+        if not UserStats._increment([user_id], deltas):
+            UserStats._create(user_id, deltas)
+    
+    @staticmethod
+    def bump_many(user_ids, **deltas):
+        """批量增量更新多个用户的计数器（每个用户的增量相同）"""
+        if not current_app.config.get('USER_STATS_COUNTERS') or not user_ids:
+            return
+        
+        user_ids = list(set(user_ids))
+        existing = {row.user_id for row in db.session.query(UserStats.user_id).filter(
+            UserStats.user_id.in_(user_ids)
+        )}
+        UserStats._increment(existing, deltas)
+        
+        for user_id in user_ids:
+            if user_id not in existing:
+                UserStats._create(user_id, deltas)
+    
+    def to_dict(self):
+        """转换为字典"""
+        return {name: getattr(self, name) for name in self.COUNTERS}
+    
+    def __repr__(self):
+        return f'<UserStats User:{self.user_id}>'
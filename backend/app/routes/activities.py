@@ -1,64 +1,263 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, g, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models.activity import Activity
-from app.models.registration import Registration
+from app.models.activity import Activity, ACTIVITY_FULL_FIELDS, ACTIVITY_PROJECTION
+from app.models.activity_facet import ActivityFacet, live_facet_counts
+from app.models.registration import Registration, REGISTRATION_PROJECTION
 from app.models.user import User
+from app.models.hours_ledger import HoursLedgerEntry
+from app.models.user_stats import UserStats
+from app.models.checkin_batch import CheckInBatch
 from datetime import datetime
-from sqlalchemy import or_
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from app.utils.activity_import import import_activities, read_activity_rows
+from app.utils.async_reads import async_reads
+from app.utils.cache import response_cache
+from app.utils.checkin_queue import checkin_queue, parse_client_time
+from app.utils.conditional import conditional, make_etag
+from app.utils.database import equality_hint
+from app.utils.datetimes import parse_datetime
+from app.utils.export import stream_export
+from app.utils.geo import DISCOVERY_ARGS, apply_discovery_filters, has_coordinates, parse_coordinates
+from app.utils.identity import current_role, identity_cache
+from app.utils.pagination import paginate_query, parse_bool_arg
+from app.utils.search import apply_activity_search, uses_search_index
+from app.utils.serialization import Projection
 
 activities_bp = Blueprint('activities', __name__)
 
+def _filtered_activities_query(query, rank=None):
+    """按请求参数为活动查询添加筛选条件（含附近活动与时间窗口，参数无效时抛出 ValueError）"""
+    category = request.args.get('category')
+    status = request.args.get('status', 'active')
+    search = request.args.get('search')
+    # 全文检索或附近活动条件更有选择性时，由对应的索引驱动查询
+    hint = equality_hint(
+        db.engine, has_coordinates(request.args) or bool(search and uses_search_index(search))
+    )
+    
+    if category:
+        query = query.filter(hint(Activity.category == category))
+    if status:
+        query = query.filter(hint(Activity.status == status))
+    if search:
+        # 偏移分页时按相关度排序；游标分页需保持 (created_at, id) 顺序
+        if rank is None:
+            rank = 'cursor' not in request.args
+        query = apply_activity_search(query, search, rank=rank)
+    return apply_discovery_filters(query, request.args)
+
+def _activity_facets():
+    """按请求参数返回各分类、各状态的活动数量
+
+    无关键词及附近/时间窗口条件时读取预先维护的计数表；否则对匹配的活动实时分组计数。
+    """
+    category = request.args.get('category') or None
+    status = request.args.get('status', 'active') or None
+    search = request.args.get('search')
+    if search or any(request.args.get(name) for name in DISCOVERY_ARGS):
+        query = apply_activity_search(Activity.query, search, rank=False) if search else Activity.query
+        return live_facet_counts(apply_discovery_filters(query, request.args), category, status)
+    return ActivityFacet.counts(category, status)
+
+def _activity_validators(activity_id):
+    """活动详情的 ETag / Last-Modified，只查询版本相关的列"""
+    rows, = async_reads.fetch_all(
+        select(Activity.updated_at, Activity.start_time).where(Activity.id == activity_id)
+    )
+    row = rows[0] if rows else None
+    if row is None or row.updated_at is None:
+        return None
+    
+    # 活动开始后 is_active 变化，视为在开始时间被修改
+    now = datetime.utcnow()
+    started = row.start_time <= now
+    last_modified = max(row.updated_at, row.start_time) if started else row.updated_at
+    return make_etag(activity_id, row.updated_at, started), last_modified
+
+_ACTIVITY_LIST_DEFAULTS = {'page': '1', 'per_page': '10', 'status': 'active'}
+
+def _activity_list_validators():
+    """活动列表的 ETag，一条语句只查询版本信息，不查询数据页
+
+    - 筛选结果的数量（与分页的 COUNT 相同，可走索引）
+    - 全表最大 updated_at / id：活动的增改、报名人数及状态变化都会更新，与响应缓存整体失效的粒度一致
+    - 下一个开始的 active 活动的开始时间：活动开始后 is_active 变化，ETag 随之改变
+    后两者由索引直接取得。facets=true 时计数也计入 ETag。
+    统计结果保存在 g.activity_list_versions 中，未命中 304 时视图直接复用，不再重复 COUNT。
+    """
+    try:
+        query = _filtered_activities_query(Activity.query, rank=False)
+    except ValueError:
+        return None
+    
+    now = datetime.utcnow()
+    rows, = async_reads.fetch_all(select(
+        query.with_entities(func.count()).order_by(None).scalar_subquery(),
+        select(func.max(Activity.updated_at)).scalar_subquery(),
+        select(func.max(Activity.id)).scalar_subquery(),
+        select(func.min(Activity.start_time)).where(
+            Activity.status == 'active', Activity.start_time > now
+        ).scalar_subquery()
+    ))
+    total, max_updated_at, max_id, next_start = rows[0]
+    facets = _activity_facets() if parse_bool_arg(request.args, 'facets', default=False) else None
+    g.activity_list_versions = {'total': total, 'facets': facets}
+    
+    args = dict(_ACTIVITY_LIST_DEFAULTS)
+    for key in request.args:
+        args[key] = ','.join(sorted(request.args.getlist(key)))
+    return make_etag(sorted(args.items()), total, max_updated_at, max_id, next_start, facets), None
+
 @activities_bp.route('/', methods=['GET'])
+@response_cache.cached('activities', defaults=_ACTIVITY_LIST_DEFAULTS)
+@conditional(_activity_list_validators)
 def get_activities():
-    """获取活动列表"""
+    """获取活动列表
+
+    lat / lng / radius_km 查询附近的活动，starts_after / starts_before 按开始时间窗口筛选；
+    facets=true 时同时返回各分类、各状态的数量。
+    """
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        category = request.args.get('category')
-        status = request.args.get('status', 'active')
-        search = request.args.get('search')
-        
-        query = Activity.query
-        
-        # 筛选条件
-        if category:
-            query = query.filter(Activity.category == category)
-        if status:
-            query = query.filter(Activity.status == status)
-        if search:
-            query = query.filter(or_(
-                Activity.title.contains(search),
-                Activity.description.contains(search)
-            ))
-        
-        # 按创建时间倒序排列
-        query = query.order_by(Activity.created_at.desc())
-        
-        # 分页
-        activities = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # 按 fields 参数（默认 summary）只查询需要的列，直接由结果行序列化
+        projection = ACTIVITY_PROJECTION.for_request(
+            request.args, 'summary', required=('created_at',)
+        )
+        query = _filtered_activities_query(
+            Activity.query.with_entities(*projection.columns())
         )
         
-        return jsonify({
-            'activities': [activity.to_dict() for activity in activities.items],
-            'total': activities.total,
-            'pages': activities.pages,
-            'current_page': page
-        }), 200
+        # 按创建时间倒序分页（支持游标分页）；总数已由条件请求校验统计过时不再 COUNT
+        versions = g.get('activity_list_versions') or {}
+        rows, meta = paginate_query(
+            query, Activity.created_at, Activity.id, request.args, total=versions.get('total')
+        )
+        
+        result = {
+            'activities': projection.serialize_all(rows),
+            **meta
+        }
+        if parse_bool_arg(request.args, 'facets', default=False):
+            result['facets'] = versions.get('facets') or _activity_facets()
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# 报名导出：报名记录及参与者、活动的关键信息
+_REGISTRATION_EXPORT_FIELDS = list(REGISTRATION_PROJECTION.sources.items()) + [
+    ('username', User.username),
+    ('real_name', User.real_name),
+    ('email', User.email),
+    ('phone', User.phone),
+    ('activity_title', Activity.title),
+    ('activity_start_time', Activity.start_time),
+    ('activity_volunteer_hours', Activity.volunteer_hours),
+]
+_REGISTRATION_EXPORT_PROJECTION = Projection(
+    Registration, _REGISTRATION_EXPORT_FIELDS,
+    presets={'full': [name for name, _ in _REGISTRATION_EXPORT_FIELDS]}
+)
+
+@activities_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_activities():
+    """流式导出活动（管理员），支持与活动列表相同的筛选参数及 fields，format 为 csv / ndjson"""
+    try:
+        if current_role() != 'admin':
+            return jsonify({'error': 'Permission denied'}), 403
+        
+        projection = ACTIVITY_PROJECTION.for_request(request.args, 'full')
+        query = _filtered_activities_query(
+            Activity.query.with_entities(*projection.columns()), rank=False
+        ).order_by(Activity.created_at.desc(), Activity.id.desc())
         
+        return stream_export(query, projection, request.args.get('format', 'csv'), 'activities')
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@activities_bp.route('/registrations/export', methods=['GET'])
+@jwt_required()
+def export_registrations():
+    """流式导出报名名单
+
+    管理员可导出全部活动（支持活动列表的筛选参数，status 为空时不按活动状态筛选）；
+    指定 activity_id 时，活动创建者也可导出该活动的名单。registration_status 按报名状态筛选。
+    """
+    try:
+        user_id = get_jwt_identity()
+        activity_id = request.args.get('activity_id', type=int)
+        
+        if activity_id is not None:
+            activity = Activity.query.get(activity_id)
+            if not activity:
+                return jsonify({'error': 'Activity not found'}), 404
+            if not _can_manage_activity(activity, user_id):
+                return jsonify({'error': 'Permission denied'}), 403
+        elif current_role() != 'admin':
+            return jsonify({'error': 'Permission denied'}), 403
+        
+        projection = _REGISTRATION_EXPORT_PROJECTION.for_request(request.args, 'full')
+        query = Registration.query.with_entities(*projection.columns()).join(
+            Activity, Activity.id == Registration.activity_id
+        ).join(User, User.id == Registration.user_id)
+        
+        if activity_id is not None:
+            query = query.filter(Registration.activity_id == activity_id)
+        else:
+            query = _filtered_activities_query(query, rank=False)
+        
+        registration_status = request.args.get('registration_status')
+        if registration_status:
+            query = query.filter(Registration.status == registration_status)
+        
+        query = query.order_by(Registration.id)
+        
+        return stream_export(query, projection, request.args.get('format', 'csv'), 'registrations')
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@activities_bp.route('/facets', methods=['GET'])
+def get_activity_facets():
+    """活动筛选栏计数：各分类、各状态的活动数量
+
+    支持与活动列表相同的 category / status / search 及附近活动、时间窗口参数；分类计数只受 status 筛选，
+    状态计数只受 category 筛选，total 为同时满足两者的数量。
+    """
+    try:
+        return jsonify({'facets': _activity_facets()}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+_ACTIVITY_DETAIL_PROJECTION = ACTIVITY_PROJECTION.narrow(ACTIVITY_FULL_FIELDS)
+
 @activities_bp.route('/<int:activity_id>', methods=['GET'])
+@response_cache.cached('activity:{activity_id}')
+@conditional(_activity_validators)
 def get_activity(activity_id):
     """获取单个活动详情"""
     try:
-        activity = Activity.query.get(activity_id)
-        if not activity:
+        # 按完整字段投影查询，输出与 Activity.to_dict() 一致
+        rows, = async_reads.fetch_all(
+            select(*_ACTIVITY_DETAIL_PROJECTION.columns()).where(Activity.id == activity_id)
+        )
+        if not rows:
             return jsonify({'error': 'Activity not found'}), 404
         
-        return jsonify({'activity': activity.to_dict()}), 200
+        return jsonify({'activity': _ACTIVITY_DETAIL_PROJECTION.serialize_all(rows)[0]}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -79,14 +278,19 @@ def create_activity():
         
         # 解析时间
         try:
-            start_time = datetime.fromisoformat(data['start_time'].replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
+            start_time = parse_datetime(data['start_time'])
+            end_time = parse_datetime(data['end_time'])
         except ValueError:
             return jsonify({'error': 'Invalid datetime format'}), 400
         
         if start_time >= end_time:
             return jsonify({'error': 'Start time must be before end time'}), 400
         
+        try:
+            latitude, longitude = parse_coordinates(data.get('latitude'), data.get('longitude'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # 创建活动
         activity = Activity(
             title=data['title'],
@@ -101,11 +305,16 @@ def create_activity():
             contact_person=data.get('contact_person', ''),
             contact_phone=data.get('contact_phone', ''),
             image_url=data.get('image_url', ''),
+            latitude=latitude,
+            longitude=longitude,
             created_by=user_id
         )
         
         db.session.add(activity)
+        UserStats.bump(user_id, created_activities=1)
+        ActivityFacet.add({(activity.category, 'active'): 1})
         db.session.commit()
+        response_cache.invalidate_activity()
         
         return jsonify({
             'message': 'Activity created successfully',
@@ -116,6 +325,51 @@ def create_activity():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@activities_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_activities_batch():
+    """批量导入活动（管理员）
+
+    请求体为 JSON（数组或 {"activities": [...]}）、CSV（text/csv）或 NDJSON，
+    也可通过 multipart 的 file 字段上传 .csv / .json / .ndjson 文件。
+    有效行分块批量插入，返回逐行的错误报告；dry_run=true 时只校验不写入。
+    """
+    try:
+        if current_role() != 'admin':
+            return jsonify({'error': 'Permission denied'}), 403
+        
+        upload = request.files.get('file')
+        if upload:
+            import_format = upload.filename.rsplit('.', 1)[-1].lower()
+            text = upload.read().decode('utf-8')
+        else:
+            import_format = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson'}.get(
+                request.mimetype, 'json'
+            )
+            text = request.get_data(as_text=True)
+        
+        rows = read_activity_rows(text, import_format)
+        if not isinstance(rows, list):
+            return jsonify({'error': 'activities must be a list'}), 400
+        
+        max_rows = current_app.config.get('IMPORT_MAX_ROWS', 20000)
+        if len(rows) > max_rows:
+            return jsonify({'error': f'At most {max_rows} rows per import'}), 400
+        
+        report = import_activities(
+            rows, get_jwt_identity(),
+            chunk_size=current_app.config.get('IMPORT_CHUNK_SIZE', 1000),
+            dry_run=parse_bool_arg(request.args, 'dry_run', default=False)
+        )
+        return jsonify(report), 200
+        
+    except (ValueError, UnicodeDecodeError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @activities_bp.route('/<int:activity_id>/register', methods=['POST'])
 @jwt_required()
 def register_activity(activity_id):
@@ -151,17 +405,25 @@ def register_activity(activity_id):
             notes=request.get_json().get('notes', '') if request.get_json() else ''
         )
         
-        # 更新活动参与人数
-        activity.current_participants += 1
+        # 原子占用名额，并发报名时由数据库保证不超员
+        if not Activity.reserve_seat(activity_id):
+            db.session.rollback()
+            return jsonify({'error': 'Activity is full'}), 400
         
         db.session.add(registration)
+        UserStats.bump(user_id, total_registrations=1)
         db.session.commit()
+        response_cache.invalidate_activity(activity_id)
         
         return jsonify({
             'message': 'Registration successful',
             'registration': registration.to_dict()
         }), 201
         
+    except IntegrityError:
+        # 并发重复报名触发唯一约束，回滚同时释放已占用的名额
+        db.session.rollback()
+        return jsonify({'error': 'Already registered for this activity'}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -187,14 +449,209 @@ def unregister_activity(activity_id):
         registration.cancel()
         
         # 更新活动参与人数
-        activity = Activity.query.get(activity_id)
-        if activity:
-            activity.current_participants = max(0, activity.current_participants - 1)
+        Activity.release_seat(activity_id)
         
+        UserStats.bump(user_id, cancelled_activities=1)
         db.session.commit()
+        response_cache.invalidate_activity(activity_id)
         
         return jsonify({'message': 'Registration cancelled successfully'}), 200
         
     except Exception as e:
         db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def _can_manage_activity(activity, user_id):
+    """活动创建者或管理员可以管理活动（批量签到、确认完成等）"""
+    return activity.created_by == user_id or current_role() == 'admin'
+
+def _registration_ids_from_request():
+    """读取请求体中的 registration_ids，未提供时返回 None（表示整个活动）"""
+    data = request.get_json(silent=True) or {}
+    registration_ids = data.get('registration_ids')
+    if registration_ids is None:
+        return None
+    if not isinstance(registration_ids, list) or not all(
+        isinstance(item, int) and not isinstance(item, bool) for item in registration_ids
+    ):
+        raise ValueError('registration_ids must be a list of integers')
+    # 去重并保持顺序
+    return list(dict.fromkeys(registration_ids))
+
+@activities_bp.route('/<int:activity_id>/check-in', methods=['POST'])
+@jwt_required()
+def bulk_check_in(activity_id):
+    """批量签到（活动创建者或管理员），一个事务内完成"""
+    try:
+        user_id = get_jwt_identity()
+        
+        activity = Activity.query.get(activity_id)
+        if not activity:
+            return jsonify({'error': 'Activity not found'}), 404
+        
+        if not _can_manage_activity(activity, user_id):
+            return jsonify({'error': 'Permission denied'}), 403
+        
+        succeeded, results = Registration.bulk_transition(
+            activity_id, 'registered', 'checked_in', 'check_in_time',
+            _registration_ids_from_request()
+        )
+        UserStats.bump_many(
+            [member_id for _, member_id in succeeded], checked_in_activities=1
+        )
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Bulk check-in finished',
+            'succeeded': len(succeeded),
+            'failed': len(results) - len(succeeded),
+            'results': results
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@activities_bp.route('/<int:activity_id>/complete', methods=['POST'])
+@jwt_required()
+def bulk_complete(activity_id):
+    """批量确认完成并累加志愿时长（活动创建者或管理员），一个事务内完成"""
+    try:
+        user_id = get_jwt_identity()
+        
+        activity = Activity.query.get(activity_id)
+        if not activity:
+            return jsonify({'error': 'Activity not found'}), 404
+        
+        if not _can_manage_activity(activity, user_id):
+            return jsonify({'error': 'Permission denied'}), 403
+        
+        succeeded, results = Registration.bulk_transition(
+            activity_id, 'checked_in', 'completed', 'completion_time',
+            _registration_ids_from_request()
+        )
+        
+        # 记录志愿时长流水并更新个人及月度汇总
+        member_ids = [member_id for _, member_id in succeeded]
+        if member_ids and activity.volunteer_hours > 0:
+            HoursLedgerEntry.record(
+                member_ids, activity.volunteer_hours, activity_id=activity_id,
+                registration_ids=[registration_id for registration_id, _ in succeeded]
+            )
+        
+        UserStats.bump_many(member_ids, checked_in_activities=-1, completed_activities=1)
+        db.session.commit()
+        identity_cache.invalidate_many(member_ids)
+        
+        return jsonify({
+            'message': 'Bulk completion finished',
+            'succeeded': len(succeeded),
+            'failed': len(results) - len(succeeded),
+            'results': results
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@activities_bp.route('/<int:activity_id>/check-in/sync', methods=['POST'])
+@jwt_required()
+def sync_check_ins(activity_id):
+    """签到终端离线签到批量同步
+
+    批次以 Idempotency-Key 请求头（或 batch_id 字段）去重，重传时返回已有批次的状态；
+    新批次入队后立即返回 202，由后台队列按到达顺序应用，签到时间使用终端上报的时间。
+    """
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+        
+        idempotency_key = request.headers.get('Idempotency-Key') or data.get('batch_id')
+        if not idempotency_key:
+            return jsonify({'error': 'Idempotency-Key header or batch_id is required'}), 400
+        
+        activity = Activity.query.get(activity_id)
+        if not activity:
+            return jsonify({'error': 'Activity not found'}), 404
+        
+        if not _can_manage_activity(activity, user_id):
+            return jsonify({'error': 'Permission denied'}), 403
+        
+        # 重传的批次直接返回已记录的状态
+        batch = CheckInBatch.query.filter_by(idempotency_key=idempotency_key).first()
+        if batch:
+            if batch.activity_id != activity_id:
+                return jsonify({'error': 'Idempotency key already used for another activity'}), 409
+            return jsonify({'batch': batch.to_dict()}), 200
+        
+        # 校验并规范化签到项
+        items = data.get('items')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'items must be a non-empty list'}), 400
+        
+        received_at = datetime.utcnow()
+        normalized = []
+        for item in items:
+            registration_id = item.get('registration_id') if isinstance(item, dict) else None
+            if not isinstance(registration_id, int) or isinstance(registration_id, bool):
+                return jsonify({'error': 'Each item requires an integer registration_id'}), 400
+            try:
+                checked_in_at = parse_client_time(item.get('checked_in_at'), received_at)
+            except ValueError:
+                return jsonify({'error': 'Invalid datetime format'}), 400
+            normalized.append({
+                'registration_id': registration_id,
+                'checked_in_at': checked_in_at.isoformat()
+            })
+        
+        batch = CheckInBatch(
+            idempotency_key=idempotency_key,
+            activity_id=activity_id,
+            submitted_by=user_id,
+            items=normalized,
+            received_at=received_at
+        )
+        db.session.add(batch)
+        db.session.commit()
+        
+        checkin_queue.notify()
+        
+        return jsonify({'batch': batch.to_dict()}), 202
+        
+    except IntegrityError:
+        # 并发重传同一批次
+        db.session.rollback()
+        batch = CheckInBatch.query.filter_by(idempotency_key=idempotency_key).first()
+        if batch.activity_id != activity_id:
+            return jsonify({'error': 'Idempotency key already used for another activity'}), 409
+        return jsonify({'batch': batch.to_dict()}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@activities_bp.route('/<int:activity_id>/check-in/sync/<batch_id>', methods=['GET'])
+@jwt_required()
+def get_check_in_batch(activity_id, batch_id):
+    """查询离线签到批次的处理状态（活动创建者或管理员）"""
+    try:
+        activity = Activity.query.get(activity_id)
+        if not activity:
+            return jsonify({'error': 'Activity not found'}), 404
+        
+        if not _can_manage_activity(activity, get_jwt_identity()):
+            return jsonify({'error': 'Permission denied'}), 403
+        
+        batch = CheckInBatch.query.filter_by(
+            idempotency_key=batch_id, activity_id=activity_id
+        ).first()
+        if not batch:
+            return jsonify({'error': 'Batch not found'}), 404
+        
+        return jsonify({'batch': batch.to_dict()}), 200
+        
+    except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
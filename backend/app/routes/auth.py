@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_current_user
 from app import db
 from app.models.user import User
+from app.utils.identity import identity_cache, identity_claims
+from app.utils.passwords import PasswordHasherBusy
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
@@ -43,6 +45,8 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except PasswordHasherBusy:
+        return jsonify({'error': 'Server busy, please retry later'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -63,7 +67,8 @@ def login():
             return jsonify({'error': 'Invalid username or password'}), 401
         
         # 创建访问令牌
-        access_token = create_access_token(identity=user.id)
+        # 令牌中带上角色与用户名，角色判断无需查询数据库
+        access_token = create_access_token(identity=user.id, additional_claims=identity_claims(user))
         
         return jsonify({
             'message': 'Login successful',
@@ -71,7 +76,10 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy:
+        return jsonify({'error': 'Server busy, please retry later'}), 503, {'Retry-After': '1'}
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/profile', methods=['GET'])
@@ -79,13 +87,8 @@ def login():
 def get_profile():
     """获取用户资料"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        return jsonify({'user': user.to_dict()}), 200
+        # 用户快照由 JWT 用户加载缓存提供
+        return jsonify({'user': get_current_user()}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -111,6 +114,7 @@ def update_profile():
         
         user.updated_at = datetime.utcnow()
         db.session.commit()
+        identity_cache.invalidate(user_id)
         
         return jsonify({
             'message': 'Profile updated successfully',
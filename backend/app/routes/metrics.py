@@ -0,0 +1,25 @@
+import hmac
+from flask import Blueprint, current_app, request, jsonify
+from app.utils.cache import response_cache
+from app.utils.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus 格式的性能指标，需携带 METRICS_TOKEN 作为 Bearer 令牌"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token or not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    cache_samples = []
+    for namespace, counters in sorted(response_cache.stats().items()):
+        for result, key in (('hit', 'hits'), ('miss', 'misses')):
+            cache_samples.append(
+                ('', (('namespace', namespace), ('result', result)), counters[key])
+            )
+    
+    body = metrics.render(extra=[
+        ('response_cache_requests_total', 'counter', 'Response cache lookups.', cache_samples)
+    ])
+    return current_app.response_class(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,52 +1,64 @@
-from flask import Blueprint, request, jsonify
+import re
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.user import User
-from app.models.registration import Registration
-from app.models.activity import Activity
-from sqlalchemy import func
+from app.models.registration import Registration, REGISTRATION_PROJECTION
+from app.models.activity import Activity, ACTIVITY_PROJECTION
+from app.models.user_stats import UserStats
+from app.models.hours_ledger import HoursLedgerEntry
+from app.models.monthly_hours import MonthlyHours
+from app.utils.identity import identity_cache
+from app.utils.pagination import paginate_query
+from datetime import datetime
+from sqlalchemy import func, select
 
 users_bp = Blueprint('users', __name__)
 
+PERIOD_PATTERN = re.compile(r'\d{4}-\d{2}')
+
 @users_bp.route('/my-registrations', methods=['GET'])
 @jwt_required()
 def get_my_registrations():
     """获取我的报名记录"""
     try:
         user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         status = request.args.get('status')
         
-        query = Registration.query.filter_by(user_id=user_id)
+        # 通过 JOIN 一次性查询活动，只选取需要的列
+        query = Registration.query.with_entities(
+            *REGISTRATION_PROJECTION.columns(),
+            *ACTIVITY_PROJECTION.columns(prefix='activity__')
+        ).outerjoin(
+            Activity, Activity.id == Registration.activity_id
+        ).filter(Registration.user_id == user_id)
         
         if status:
             query = query.filter(Registration.status == status)
         
-        # 按报名时间倒序排列
-        query = query.order_by(Registration.registration_time.desc())
-        
-        # 分页
-        registrations = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # 按报名时间倒序分页（支持游标分页）
+        rows, meta = paginate_query(
+            query, Registration.registration_time, Registration.id, request.args
         )
         
-        # 获取活动详情
+        # 组装活动详情，整页共用一个 now
+        now = datetime.utcnow()
+        native_datetime = getattr(current_app.json, 'native_datetime', False)
+        offset = len(REGISTRATION_PROJECTION.fields)
         result = []
-        for reg in registrations.items:
-            reg_dict = reg.to_dict()
-            activity = Activity.query.get(reg.activity_id)
-            if activity:
-                reg_dict['activity'] = activity.to_dict()
+        for row in rows:
+            reg_dict = REGISTRATION_PROJECTION.serialize(row, 0, now, native_datetime)
+            if row[offset] is not None:
+                reg_dict['activity'] = ACTIVITY_PROJECTION.serialize(row, offset, now, native_datetime)
             result.append(reg_dict)
         
         return jsonify({
             'registrations': result,
-            'total': registrations.total,
-            'pages': registrations.pages,
-            'current_page': page
+            **meta
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -56,24 +68,27 @@ def get_my_activities():
     """获取我创建的活动"""
     try:
         user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
         
-        query = Activity.query.filter_by(created_by=user_id)
-        query = query.order_by(Activity.created_at.desc())
+        # 按 fields 参数（默认 summary）只查询需要的列
+        projection = ACTIVITY_PROJECTION.for_request(
+            request.args, 'summary', required=('created_at',)
+        )
+        query = Activity.query.with_entities(
+            *projection.columns()
+        ).filter(Activity.created_by == user_id)
         
-        # 分页
-        activities = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # 按创建时间倒序分页（支持游标分页）
+        rows, meta = paginate_query(
+            query, Activity.created_at, Activity.id, request.args
         )
         
         return jsonify({
-            'activities': [activity.to_dict() for activity in activities.items],
-            'total': activities.total,
-            'pages': activities.pages,
-            'current_page': page
+            'activities': projection.serialize_all(rows),
+            **meta
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -84,37 +99,79 @@ def get_user_statistics():
     try:
         user_id = get_jwt_identity()
         
-        # 总报名次数
-        total_registrations = Registration.query.filter_by(user_id=user_id).count()
-        
-        # 已完成活动数
-        completed_activities = Registration.query.filter_by(
-            user_id=user_id, status='completed'
-        ).count()
-        
-        # 已签到活动数
-        checked_in_activities = Registration.query.filter_by(
-            user_id=user_id, status='checked_in'
-        ).count()
-        
-        # 取消的活动数
-        cancelled_activities = Registration.query.filter_by(
-            user_id=user_id, status='cancelled'
-        ).count()
+        # 开启物化计数器时为一次主键读取，否则为一条聚合查询
+        if current_app.config.get('USER_STATS_COUNTERS'):
+            stats = UserStats.load(user_id)
+        else:
+            stats = UserStats.aggregate(user_id, read_only=True)
         
-        # 获取用户信息（包含志愿时长）
-        user = User.query.get(user_id)
+        return jsonify(stats), 200
         
-        # 创建的活动数
-        created_activities = Activity.query.filter_by(created_by=user_id).count()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@users_bp.route('/leaderboard', methods=['GET'])
+@jwt_required()
+def get_leaderboard():
+    """志愿时长排行榜：总榜（users.volunteer_hours）或月榜（monthly_hours）
+
+    前 N 名与当前用户名次均通过排行索引查询，不对全部用户排序。
+    名次为竞争排名，时长相同名次相同。
+    """
+    try:
+        user_id = get_jwt_identity()
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        period = request.args.get('period', 'all')
+        
+        if period == 'all':
+            hours_column = User.volunteer_hours
+            query = db.session.query(User.id, User.username, User.real_name, hours_column)
+            ahead = select(func.count(User.id))
+            mine = select(User.volunteer_hours).where(User.id == user_id)
+        else:
+            # 与 monthly_hours 中的键格式严格一致，如 2030-05
+            try:
+                if not PERIOD_PATTERN.fullmatch(period):
+                    raise ValueError(period)
+                datetime.strptime(period, '%Y-%m')
+            except ValueError:
+                return jsonify({'error': 'period must be all or YYYY-MM'}), 400
+            
+            hours_column = MonthlyHours.hours
+            query = db.session.query(
+                User.id, User.username, User.real_name, hours_column
+            ).join(MonthlyHours, MonthlyHours.user_id == User.id).filter(
+                MonthlyHours.period == period
+            )
+            ahead = select(func.count(MonthlyHours.user_id)).where(MonthlyHours.period == period)
+            mine = select(MonthlyHours.hours).where(
+                MonthlyHours.user_id == user_id, MonthlyHours.period == period
+            )
+        
+        rows = query.order_by(hours_column.desc(), User.id).limit(limit).all()
+        # 当前用户的时长与名次在同一条语句中读取，与排行列表一样是实时数据
+        my_hours_expr = func.coalesce(mine.correlate(None).scalar_subquery(), 0)
+        my_hours, ahead_count = db.session.execute(select(
+            my_hours_expr, ahead.where(hours_column > my_hours_expr).scalar_subquery()
+        )).one()
+        my_rank = ahead_count + 1
+        
+        leaderboard = []
+        for index, (member_id, username, real_name, hours) in enumerate(rows):
+            if not leaderboard or hours != leaderboard[-1]['hours']:
+                rank = index + 1
+            leaderboard.append({
+                'rank': rank,
+                'user_id': member_id,
+                'username': username,
+                'real_name': real_name,
+                'hours': hours
+            })
         
         return jsonify({
-            'total_registrations': total_registrations,
-            'completed_activities': completed_activities,
-            'checked_in_activities': checked_in_activities,
-            'cancelled_activities': cancelled_activities,
-            'volunteer_hours': user.volunteer_hours if user else 0,
-            'created_activities': created_activities
+            'period': period,
+            'leaderboard': leaderboard,
+            'me': {'rank': my_rank, 'hours': my_hours}
         }), 200
         
     except Exception as e:
@@ -135,6 +192,7 @@ def check_in(registration_id):
             return jsonify({'error': 'Registration not found'}), 404
         
         if registration.check_in():
+            UserStats.bump(user_id, checked_in_activities=1)
             db.session.commit()
             return jsonify({
                 'message': 'Check-in successful',
@@ -166,14 +224,17 @@ def complete_activity(registration_id):
         feedback = data.get('feedback')
         
         if registration.complete(rating=rating, feedback=feedback):
-            # 更新用户志愿时长
+            # 记录志愿时长流水并更新个人及月度汇总
             activity = Activity.query.get(registration.activity_id)
             if activity and activity.volunteer_hours > 0:
-                user = User.query.get(user_id)
-                if user:
-                    user.volunteer_hours += activity.volunteer_hours
+                HoursLedgerEntry.record(
+                    [user_id], activity.volunteer_hours, activity_id=activity.id,
+                    registration_ids=[registration.id]
+                )
             
+            UserStats.bump(user_id, checked_in_activities=-1, completed_activities=1)
             db.session.commit()
+            identity_cache.invalidate(user_id)
             return jsonify({
                 'message': 'Activity completed successfully',
                 'registration': registration.to_dict()
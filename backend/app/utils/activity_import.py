@@ -0,0 +1,172 @@
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import String, insert
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.activity import Activity
+from app.models.activity_facet import ActivityFacet
+from app.models.user_stats import UserStats
+from app.utils.cache import response_cache
+from app.utils.datetimes import parse_datetime
+from app.utils.geo import parse_coordinates
+
+# 可导入的字段及默认值（与 create_activity 一致）
+IMPORT_REQUIRED_FIELDS = ('title', 'description', 'location', 'start_time', 'end_time')
+IMPORT_OPTIONAL_FIELDS = {
+    'max_participants': 50,
+    'category': '',
+    'volunteer_hours': 0.0,
+    'requirements': '',
+    'contact_person': '',
+    'contact_phone': '',
+    'image_url': '',
+    'latitude': None,
+    'longitude': None,
+}
+
+# 文本列（含 Text 列）及字符串列的长度上限，取自模型定义
+_TEXT_FIELDS = tuple(
+    column.name for column in Activity.__table__.columns
+    if isinstance(column.type, String)
+    and (column.name in IMPORT_REQUIRED_FIELDS or column.name in IMPORT_OPTIONAL_FIELDS)
+)
+_MAX_LENGTHS = {
+    column.name: column.type.length
+    for column in Activity.__table__.columns
+    if isinstance(column.type, String) and column.type.length
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime(value):
+    """解析 ISO 8601 时间（规则见 parse_datetime）；表格中的时间大量重复，解析结果按字符串缓存"""
+    return parse_datetime(value)
+
+
+def _validate_row(row):
+    """校验并转换一行，返回 (插入用的字典, 错误信息)"""
+    if not isinstance(row, dict):
+        return None, 'Row must be an object'
+
+    for field in IMPORT_REQUIRED_FIELDS:
+        if not row.get(field):
+            return None, f'{field} is required'
+
+    for field in _TEXT_FIELDS:
+        value = row.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (str, int, float))):
+            return None, f'{field} must be a string'
+
+    try:
+        start_time = _parse_datetime(str(row['start_time']))
+        end_time = _parse_datetime(str(row['end_time']))
+    except ValueError:
+        return None, 'Invalid datetime format'
+    if start_time >= end_time:
+        return None, 'Start time must be before end time'
+
+    values = {field: row[field] for field in IMPORT_REQUIRED_FIELDS}
+    values['start_time'] = start_time
+    values['end_time'] = end_time
+    for field, default in IMPORT_OPTIONAL_FIELDS.items():
+        value = row.get(field)
+        values[field] = default if value in (None, '') else value
+
+    try:
+        values['max_participants'] = int(values['max_participants'])
+        values['volunteer_hours'] = float(values['volunteer_hours'])
+    except (TypeError, ValueError):
+        return None, 'max_participants and volunteer_hours must be numbers'
+    if values['max_participants'] <= 0 or values['volunteer_hours'] < 0:
+        return None, 'max_participants must be positive and volunteer_hours non-negative'
+    try:
+        values['latitude'], values['longitude'] = parse_coordinates(values['latitude'], values['longitude'])
+    except ValueError as e:
+        return None, str(e)
+
+    for field in _TEXT_FIELDS:
+        values[field] = str(values[field])
+        if field in _MAX_LENGTHS and len(values[field]) > _MAX_LENGTHS[field]:
+            return None, f'{field} exceeds {_MAX_LENGTHS[field]} characters'
+    return values, None
+
+
+def validate_activity_rows(rows):
+    """一次遍历校验全部行，返回 (有效行 [(行号, 字典)], 错误 [{row, error}])
+
+    行号为数据行序号，从 1 开始（CSV 不含表头）。
+    校验中出现的类型错误只记为该行的错误，不中断整个导入。
+    """
+    valid, errors = [], []
+    for number, row in enumerate(rows, 1):
+        try:
+            values, error = _validate_row(row)
+        except TypeError:
+            values, error = None, 'Invalid value type'
+        if error:
+            errors.append({'row': number, 'error': error})
+        else:
+            valid.append((number, values))
+    return valid, errors
+
+
+def import_activities(rows, created_by, chunk_size=1000, dry_run=False):
+    """批量导入活动：整体校验后，有效行分块 executemany 插入并逐块提交
+
+    无效行不影响其他行，结果中按行号报告错误。某一块写入数据库失败时只回滚该块，
+    其中的行记为失败，其余块继续导入。返回导入报告。
+    """
+    rows = list(rows)
+    valid, errors = validate_activity_rows(rows)
+
+    imported = 0
+    if not dry_run and valid:
+        now = datetime.utcnow()
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            try:
+                db.session.execute(insert(Activity), [
+                    dict(values, created_by=created_by, status='active', current_participants=0,
+                         created_at=now, updated_at=now)
+                    for _, values in chunk
+                ])
+                UserStats.bump(created_by, created_activities=len(chunk))
+                ActivityFacet.add(Counter((values['category'], 'active') for _, values in chunk))
+                db.session.commit()
+            except SQLAlchemyError as e:
+                # 该块整体回滚，已提交的块保留，块内各行按行号报告为失败
+                db.session.rollback()
+                current_app.logger.warning('Activity import chunk failed: %s', e)
+                error = f'Database error: {getattr(e, "orig", None) or e}'
+                errors.extend({'row': number, 'error': error} for number, _ in chunk)
+                continue
+            imported += len(chunk)
+        if imported:
+            response_cache.invalidate_activity()
+        errors.sort(key=lambda error: error['row'])
+
+    return {
+        'total': len(rows),
+        'valid': len(valid),
+        'imported': imported,
+        'failed': len(errors),
+        'errors': errors,
+        'dry_run': dry_run
+    }
+
+
+def read_activity_rows(text, import_format):
+    """从 CSV / JSON（数组或 {"activities": [...]}）/ NDJSON 文本读取待导入的行"""
+    if import_format == 'csv':
+        return list(csv.DictReader(io.StringIO(text.lstrip('\ufeff'))))
+    if import_format == 'ndjson':
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    if import_format == 'json':
+        data = json.loads(text)
+        return data.get('activities', []) if isinstance(data, dict) else data
+    raise ValueError(f'Unsupported import format: {import_format}')
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import threading
+from flask import current_app
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app import db
+from app.utils.database import install_sqlite_pragmas
+from app.utils.metrics import metrics
+
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine
+except ImportError:  # 需要 greenlet
+    create_async_engine = None
+
+# 同步驱动对应的异步驱动
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_database_url(config, url):
+    """ASYNC_DATABASE_URL 未设置时，将同步引擎的 URL 换成对应的异步驱动
+
+    使用引擎的 URL 而不是配置中的原始字符串：Flask-SQLAlchemy 会把 SQLite 相对路径解析到实例目录。
+    """
+    if config.get('ASYNC_DATABASE_URL'):
+        return config['ASYNC_DATABASE_URL']
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # 内存数据库无法被另一个引擎共享
+        return None
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name())
+    return url.set(drivername=drivername).render_as_string(hide_password=False) if drivername else None
+
+
+class AsyncReads:
+    """只读查询的异步执行路径
+
+    ASYNC_READS 开启且安装了异步驱动（SQLite 为 aiosqlite）时，fetch_all() 把语句交给
+    SQLAlchemy asyncio 引擎在每个进程一个的后台事件循环上并发执行，请求线程只等待结果；
+    同一请求中互不依赖的查询（如分页的数据页与 COUNT）不再依次排队，
+    所有请求的数据库等待都由同一个事件循环复用。未开启时在当前会话中依次执行。
+
+    事件循环与引擎在首次使用时创建，fork 之后按进程号重新创建。
+    并发执行的语句各自使用一个连接，不在同一个读事务内。
+    """
+
+    def init_app(self, app):
+        url = None
+        if app.config.get('ASYNC_READS'):
+            with app.app_context():
+                url = async_database_url(app.config, db.engine.url)
+            try:
+                if create_async_engine is None or url is None:
+                    raise ImportError('no async driver for this database URL')
+                make_url(url).get_dialect().import_dbapi()
+            except ImportError as e:
+                app.logger.warning('Async reads disabled: %s', e)
+                url = None
+
+        app.extensions['async_reads'] = {
+            'app': app,
+            'url': url,
+            'loop': None,
+            'thread': None,
+            'engine': None,
+            'pid': None,
+            'lock': threading.Lock(),
+        }
+
+    @staticmethod
+    def _state(app=None):
+        return (app or current_app).extensions['async_reads']
+
+    def enabled(self):
+        return self._state()['url'] is not None
+
+    def _ensure_started(self, state):
+        """确保当前进程的事件循环线程与异步引擎已创建，返回 (loop, engine)"""
+        if state['pid'] == os.getpid():
+            return state['loop'], state['engine']
+        with state['lock']:
+            if state['pid'] != os.getpid():
+                config = state['app'].config
+                pool_size = config.get('ASYNC_DB_POOL_SIZE', 10)
+                engine = create_async_engine(
+                    state['url'], poolclass=AsyncAdaptedQueuePool,
+                    pool_size=pool_size, max_overflow=pool_size
+                )
+                install_sqlite_pragmas(engine.sync_engine, config)
+                if 'metrics' in state['app'].extensions:
+                    metrics.watch_engine(engine.sync_engine)
+
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='async-reads', daemon=True)
+                thread.start()
+                state.update(loop=loop, engine=engine, thread=thread, pid=os.getpid())
+        return state['loop'], state['engine']
+
+    @staticmethod
+    async def _fetch(engine, statement):
+        async with engine.connect() as conn:
+            result = await conn.execute(statement)
+            return result.all()
+
+    async def _gather(self, engine, statements):
+        return await asyncio.gather(*(self._fetch(engine, statement) for statement in statements))
+
+    def fetch_all(self, *statements):
+        """执行若干只读语句，按顺序返回各自的结果行列表
+
+        协程在调用线程的上下文副本中运行，查询仍计入当前请求的指标。
+        """
+        state = self._state()
+        if state['url'] is None:
+            return [db.session.execute(statement).all() for statement in statements]
+
+        loop, engine = self._ensure_started(state)
+        future = asyncio.run_coroutine_threadsafe(self._gather(engine, statements), loop)
+        return future.result(timeout=state['app'].config.get('ASYNC_READ_TIMEOUT', 30))
+
+    def shutdown(self, app=None):
+        """关闭当前进程的事件循环与连接（fork 之前调用）"""
+        state = self._state(app)
+        with state['lock']:
+            if state['pid'] != os.getpid():
+                return
+            loop, engine = state['loop'], state['engine']
+            asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            state['thread'].join()
+            loop.close()
+            state.update(loop=None, engine=None, thread=None, pid=None)
+
+
+async_reads = AsyncReads()
@@ -0,0 +1,218 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, make_response, request
+from app.utils.conditional import apply_validators
+
+
+class MemoryBackend:
+    """进程内 LRU 缓存，条目带过期时间
+
+    失效只作用于当前进程；多进程部署时其他进程最多返回 TTL 内的旧数据，
+    需要跨进程一致时使用 RedisBackend。
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend:
+    """基于 Redis 的共享缓存，多个工作进程共用缓存条目与失效版本号"""
+
+    def __init__(self, url, prefix='volunteer:cache:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.setex(self.prefix + key, ttl, value)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def get_counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+
+class NullBackend:
+    """不缓存任何内容"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def get_counter(self, key):
+        return 0
+
+    def incr(self, key):
+        return 0
+
+
+def create_backend(config):
+    """根据 RESPONSE_CACHE_BACKEND 配置创建缓存后端"""
+    name = config.get('RESPONSE_CACHE_BACKEND', 'memory')
+    if name == 'memory':
+        return MemoryBackend(config.get('RESPONSE_CACHE_MAXSIZE', 1024))
+    if name == 'redis':
+        return RedisBackend(config['RESPONSE_CACHE_REDIS_URL'])
+    if name in ('none', ''):
+        return NullBackend()
+    raise ValueError(f'Unknown RESPONSE_CACHE_BACKEND: {name}')
+
+
+class ResponseCache:
+    """公开只读接口的响应缓存
+
+    缓存键由命名空间、命名空间版本号和规范化后的查询参数组成；
+    写操作递增命名空间版本号使旧条目整体失效，旧条目随 TTL 自然淘汰。
+    """
+
+    def init_app(self, app):
+        app.extensions['response_cache'] = {
+            'backend': create_backend(app.config),
+            'ttl': app.config.get('RESPONSE_CACHE_TTL', 30),
+            'stats': {},
+            'lock': threading.Lock(),
+        }
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['response_cache']
+
+    def _record(self, name, outcome):
+        state = self._state()
+        with state['lock']:
+            counters = state['stats'].setdefault(name, {'hits': 0, 'misses': 0})
+            counters[outcome] += 1
+
+    def stats(self):
+        """返回各命名空间的命中/未命中计数"""
+        state = self._state()
+        with state['lock']:
+            return {name: dict(counters) for name, counters in state['stats'].items()}
+
+    def invalidate(self, namespace):
+        """使某个命名空间下的所有缓存条目失效"""
+        self._state()['backend'].incr(f'gen:{namespace}')
+
+    def invalidate_activity(self, activity_id=None):
+        """活动数据变化后，失效活动列表及对应活动详情的缓存"""
+        self.invalidate('activities')
+        if activity_id is not None:
+            self.invalidate(f'activity:{activity_id}')
+
+    @staticmethod
+    def _normalize_args(defaults):
+        args = dict(defaults)
+        for key in request.args:
+            args[key] = ','.join(sorted(request.args.getlist(key)))
+        return '&'.join(f'{key}={value}' for key, value in sorted(args.items()))
+
+    @staticmethod
+    def _pack(response):
+        """缓存条目：首行为 ETag / Last-Modified（JSON），其后为响应体"""
+        etag, _ = response.get_etag()
+        last_modified = response.last_modified
+        meta = {'etag': etag, 'last_modified': last_modified.timestamp() if last_modified else None}
+        return json.dumps(meta).encode('utf-8') + b'\n' + response.get_data()
+
+    @staticmethod
+    def _unpack(entry):
+        """由缓存条目还原响应，带有验证器时按条件请求返回 304"""
+        meta, body = entry.split(b'\n', 1)
+        meta = json.loads(meta)
+        response = current_app.response_class(body, mimetype='application/json')
+        if meta['etag'] is None:
+            return response
+        last_modified = meta['last_modified']
+        if last_modified is not None:
+            last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+        return apply_validators(response, meta['etag'], last_modified)
+
+    def cached(self, namespace, defaults=None):
+        """缓存视图的 200 响应体及其 ETag / Last-Modified
+
+        namespace 可包含视图参数占位符，如 'activity:{activity_id}'；
+        defaults 为查询参数默认值，使省略参数与显式传入默认值命中同一条目。
+        应放在 conditional 外层：命中缓存时直接用保存的验证器处理条件请求，不执行查询。
+        """
+        defaults = defaults or {}
+        name = namespace.split(':', 1)[0]
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                state = self._state()
+                backend = state['backend']
+                scope = namespace.format(**kwargs)
+                # 先读取版本号：生成响应期间若有写操作，结果写入旧版本的键，不会再被读到
+                generation = backend.get_counter(f'gen:{scope}')
+                key = f'{scope}:{generation}:{self._normalize_args(defaults)}'
+
+                entry = backend.get(key)
+                if entry is not None:
+                    self._record(name, 'hits')
+                    response = self._unpack(entry)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                self._record(name, 'misses')
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    backend.set(key, self._pack(response), state['ttl'])
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
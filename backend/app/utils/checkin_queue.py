@@ -0,0 +1,226 @@
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.checkin_batch import CheckInBatch
+from app.models.registration import Registration
+from app.models.user_stats import UserStats
+from app.utils.datetimes import parse_datetime
+
+
+def parse_client_time(value, received_at):
+    """解析终端上报的签到时间（ISO 8601），转换为 UTC；缺失或晚于接收时间时使用接收时间"""
+    if value is None:
+        return received_at
+    return min(parse_datetime(value), received_at)
+
+
+class CheckInQueue:
+    """离线签到批次的后台处理队列
+
+    接口只负责校验并持久化批次（按幂等键去重），由后台线程按到达顺序
+    批量应用，一次提交处理多个批次，以吸收终端恢复联网后的集中重传。
+    批次先“认领”再处理，多进程部署时每个批次只会被一个进程应用；
+    处理中断的批次在 CHECKIN_QUEUE_CLAIM_TIMEOUT 秒后可被重新认领。
+    数据库错误视为暂时性失败，批次放回队列，按 CHECKIN_QUEUE_RETRY_BACKOFF 秒指数退避后重试，
+    认领满 CHECKIN_QUEUE_MAX_ATTEMPTS 次或出现数据错误时才标记为 failed。
+    后台模式下每个进程在处理第一个请求时启动线程并定期轮询，
+    重启前未处理完的批次无需等待新批次到达即可继续处理。
+    """
+
+    def init_app(self, app):
+        app.extensions['checkin_queue'] = {
+            'app': app,
+            'event': threading.Event(),
+            'thread': None,
+            'lock': threading.Lock(),
+        }
+        if app.config.get('CHECKIN_QUEUE_MODE') == 'thread':
+            app.before_request(self.ensure_started)
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['checkin_queue']
+
+    def notify(self):
+        """通知后台线程有新批次；同步模式下直接在当前请求中处理"""
+        if current_app.config.get('CHECKIN_QUEUE_MODE') == 'sync':
+            self.drain()
+            return
+
+        self.ensure_started()
+        self._state()['event'].set()
+
+    def ensure_started(self):
+        """确保当前进程的后台线程在运行（fork 之后的子进程中会重新启动）"""
+        state = self._state()
+        if state['thread'] is not None and state['thread'].is_alive():
+            return
+        with state['lock']:
+            if state['thread'] is None or not state['thread'].is_alive():
+                state['thread'] = threading.Thread(
+                    target=self._worker, args=(state,), name='checkin-queue', daemon=True
+                )
+                state['thread'].start()
+
+    def _worker(self, state):
+        app = state['app']
+        interval = app.config.get('CHECKIN_QUEUE_POLL_INTERVAL', 1.0)
+        while True:
+            state['event'].wait(interval)
+            state['event'].clear()
+            with app.app_context():
+                try:
+                    self.drain()
+                except Exception:
+                    app.logger.exception('Check-in queue worker failed')
+                finally:
+                    db.session.remove()
+
+    def drain(self):
+        """处理所有待处理批次，返回处理的批次数"""
+        total = 0
+        while True:
+            processed = self.process_next()
+            if not processed:
+                return total
+            total += processed
+
+    def process_next(self):
+        """认领并应用一组待处理批次（一个事务），返回批次数"""
+        config = current_app.config
+        limit = config.get('CHECKIN_QUEUE_BATCH_LIMIT', 100)
+        token = uuid.uuid4().hex
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=config.get('CHECKIN_QUEUE_CLAIM_TIMEOUT', 300))
+
+        claimable = or_(
+            and_(CheckInBatch.status == 'pending',
+                 or_(CheckInBatch.retry_at.is_(None), CheckInBatch.retry_at <= now)),
+            and_(CheckInBatch.status == 'processing', CheckInBatch.claimed_at < stale)
+        )
+        candidates = db.session.query(CheckInBatch.id).filter(claimable).order_by(
+            CheckInBatch.id
+        ).limit(limit).all()
+        if not candidates:
+            return 0
+
+        CheckInBatch.query.filter(
+            CheckInBatch.id.in_([row.id for row in candidates]), claimable
+        ).update({
+            'status': 'processing', 'claimed_by': token, 'claimed_at': now,
+            'attempts': func.coalesce(CheckInBatch.attempts, 0) + 1
+        }, synchronize_session=False)
+        db.session.commit()
+
+        batches = CheckInBatch.query.filter_by(
+            claimed_by=token, status='processing'
+        ).order_by(CheckInBatch.id).all()
+        if not batches:
+            # 被其他进程抢先认领
+            return len(candidates)
+
+        try:
+            self._apply(batches)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception('Failed to apply check-in batches')
+            self._release(token, e, retryable=isinstance(e, SQLAlchemyError))
+        return len(batches)
+
+    @staticmethod
+    def _release(token, error, retryable):
+        """处理失败后释放认领的批次：可重试时放回队列并设置退避时间，否则标记为 failed"""
+        config = current_app.config
+        max_attempts = config.get('CHECKIN_QUEUE_MAX_ATTEMPTS', 5)
+        backoff = config.get('CHECKIN_QUEUE_RETRY_BACKOFF', 2.0)
+        now = datetime.utcnow()
+        for batch in CheckInBatch.query.filter_by(claimed_by=token, status='processing'):
+            attempts = batch.attempts or 1
+            batch.error = str(error)
+            batch.claimed_by = None
+            if retryable and attempts < max_attempts:
+                batch.status = 'pending'
+                batch.retry_at = now + timedelta(seconds=backoff * 2 ** (attempts - 1))
+            else:
+                batch.status = 'failed'
+        db.session.commit()
+
+    @staticmethod
+    def _apply(batches):
+        """按到达顺序应用批次内的签到，重复的签到只生效第一次"""
+        registration_ids = list({
+            item['registration_id'] for batch in batches for item in batch.items
+        })
+        registrations = {}
+        for start in range(0, len(registration_ids), Registration.BULK_CHUNK_SIZE):
+            chunk = registration_ids[start:start + Registration.BULK_CHUNK_SIZE]
+            for row in db.session.query(
+                Registration.id, Registration.user_id, Registration.activity_id, Registration.status
+            ).filter(Registration.id.in_(chunk)):
+                registrations[row.id] = {
+                    'user_id': row.user_id, 'activity_id': row.activity_id, 'status': row.status
+                }
+
+        # 每个报名第一次有效的签到：{报名 id: 签到时间}，及对应的处理结果
+        check_in_times = {}
+        planned_results = {}
+        batch_results = []
+        for batch in batches:
+            results = []
+            for item in batch.items:
+                registration_id = item['registration_id']
+                registration = registrations.get(registration_id)
+                if registration is None or registration['activity_id'] != batch.activity_id:
+                    results.append({'registration_id': registration_id, 'success': False,
+                                    'error': 'Registration not found'})
+                elif registration['status'] != 'registered':
+                    results.append({'registration_id': registration_id, 'success': False,
+                                    'error': f'Registration is {registration["status"]}'})
+                else:
+                    registration['status'] = 'checked_in'
+                    check_in_times[registration_id] = datetime.fromisoformat(item['checked_in_at'])
+                    planned_results[registration_id] = {
+                        'registration_id': registration_id, 'success': True, 'status': 'checked_in'
+                    }
+                    results.append(planned_results[registration_id])
+            batch_results.append(results)
+
+        # 只有 UPDATE 实际修改的报名算作签到成功；读取后被并发签到或取消的报名按当前状态报告失败
+        checked_in = Registration.check_in_at(check_in_times)
+        missed = [registration_id for registration_id in check_in_times if registration_id not in checked_in]
+        current = {}
+        for start in range(0, len(missed), Registration.BULK_CHUNK_SIZE):
+            current.update(db.session.query(Registration.id, Registration.status).filter(
+                Registration.id.in_(missed[start:start + Registration.BULK_CHUNK_SIZE])
+            ).all())
+        for registration_id in missed:
+            status = current.get(registration_id)
+            planned_results[registration_id].clear()
+            planned_results[registration_id].update(
+                registration_id=registration_id, success=False,
+                error=f'Registration is {status}' if status else 'Registration not found'
+            )
+
+        now = datetime.utcnow()
+        for batch, results in zip(batches, batch_results):
+            batch.results = results
+            batch.error = None
+            batch.status = 'applied'
+            batch.applied_at = now
+
+        # 同一用户可能在多个活动的批次中签到，按次数分组更新计数器
+        counts = Counter(checked_in.values())
+        for times in set(counts.values()):
+            UserStats.bump_many(
+                [user_id for user_id, count in counts.items() if count == times],
+                checked_in_activities=times
+            )
+
+
+checkin_queue = CheckInQueue()
@@ -0,0 +1,64 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import current_app, make_response, request
+
+
+def make_etag(*parts):
+    """根据资源的版本信息生成 ETag"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _is_not_modified(etag, last_modified):
+    """按 HTTP 语义判断客户端缓存是否仍然有效（If-None-Match 优先）"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def apply_validators(response, etag, last_modified=None):
+    """为 200 响应设置 ETag / Last-Modified；客户端缓存仍有效时改为返回 304"""
+    if _is_not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
+
+
+def conditional(validators=None):
+    """为 GET 视图添加 ETag / Last-Modified 条件请求支持
+
+    validators(**view_args) 只查询版本信息（不加载完整记录），返回
+    (etag, last_modified)；返回 None 时（如资源不存在）直接交给视图处理。
+    命中时返回 304，不执行视图也不做序列化。
+
+    不传 validators 时以响应体的哈希作为 ETag：不额外查询，304 只节省传输；
+    与外层的响应缓存配合时，缓存命中即可直接比较，不执行视图。
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if validators is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                return apply_validators(response, make_etag(response.get_data()))
+
+            result = validators(**kwargs)
+            if result is None:
+                return view(*args, **kwargs)
+
+            etag, last_modified = result
+            if _is_not_modified(etag, last_modified):
+                return apply_validators(current_app.response_class(status=304), etag, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            return apply_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,76 @@
+import os
+from sqlalchemy import event, func
+from sqlalchemy.engine import make_url
+
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else None
+
+
+def database_config_from_env():
+    """从环境变量读取数据库相关配置"""
+    return {
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('DATABASE_URL', 'sqlite:///volunteer_system.db'),
+        # 服务器型数据库（PostgreSQL/MySQL 等）的连接池设置
+        'DB_POOL_SIZE': _env_int('DB_POOL_SIZE'),
+        'DB_MAX_OVERFLOW': _env_int('DB_MAX_OVERFLOW'),
+        'DB_POOL_RECYCLE': _env_int('DB_POOL_RECYCLE'),
+        'DB_POOL_TIMEOUT': _env_int('DB_POOL_TIMEOUT'),
+        # SQLite 连接参数：WAL 允许读写并发，busy_timeout 避免立即报 database is locked
+        'SQLITE_JOURNAL_MODE': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'SQLITE_SYNCHRONOUS': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'SQLITE_BUSY_TIMEOUT': _env_int('SQLITE_BUSY_TIMEOUT') or 5000,
+    }
+
+
+def equality_hint(engine, selective):
+    """返回包装等值筛选条件（如 status、category）的函数
+
+    SQLite 没有统计信息（未执行 ANALYZE）时，查询规划器假定索引列上的等值条件只匹配少量行，
+    即使查询另有选择性更高的条件（全文检索、附近活动），也会按 status / category 索引遍历并逐行检查；
+    selective 为真时用 likely() 标记这些条件，使查询由全文索引或空间索引驱动。
+    """
+    if selective and engine.dialect.name == 'sqlite':
+        return func.likely
+    return lambda condition: condition
+
+
+def build_engine_options(config):
+    """根据配置生成 SQLALCHEMY_ENGINE_OPTIONS"""
+    if make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name() == 'sqlite':
+        return {}
+
+    options = {'pool_pre_ping': True}
+    pool_settings = {
+        'pool_size': 'DB_POOL_SIZE',
+        'max_overflow': 'DB_MAX_OVERFLOW',
+        'pool_recycle': 'DB_POOL_RECYCLE',
+        'pool_timeout': 'DB_POOL_TIMEOUT',
+    }
+    for option, key in pool_settings.items():
+        if config.get(key) is not None:
+            options[option] = config[key]
+    return options
+
+
+def install_sqlite_pragmas(engine, config):
+    """在每个新的 SQLite 连接上设置 journal_mode / synchronous / busy_timeout"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = [
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT')),
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS')),
+    ]
+    pragmas = [(name, value) for name, value in pragmas if value is not None]
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
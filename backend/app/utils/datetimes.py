@@ -0,0 +1,13 @@
+from datetime import datetime, timezone
+
+
+def parse_datetime(value):
+    """解析 ISO 8601 时间，统一为不带时区的 UTC 时间（与 datetime.utcnow() 及数据库中的存储一致）
+
+    带时区偏移（含 Z 后缀）的时间换算为 UTC；不带时区的时间视为已是 UTC。
+    格式不合法时抛出 ValueError。
+    """
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
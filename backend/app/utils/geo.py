@@ -0,0 +1,203 @@
+import calendar
+import math
+from flask import current_app
+from sqlalchemy import and_, column, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+from app.models.activity import Activity
+from app.utils.datetimes import parse_datetime
+
+# 每纬度对应的公里数（球面近似）
+KM_PER_DEGREE = 111.32
+
+# 附近活动与时间窗口查询使用的请求参数
+DISCOVERY_ARGS = ('lat', 'lng', 'starts_after', 'starts_before')
+
+# R*Tree 空间索引：按 (纬度, 经度, 开始时间) 三个维度索引有坐标的活动，开始时间为 Unix 秒，
+# 通过触发器与 activities 表保持同步。R*Tree 以 32 位浮点数存储边界并向外取整，
+# 查询结果是精确条件的超集，最终仍按 activities 表中的列精确筛选。
+ACTIVITIES_GEO = table(
+    'activities_geo', column('id'), column('min_lat'), column('max_lat'),
+    column('min_lng'), column('max_lng'), column('min_start'), column('max_start')
+)
+
+_START_SECONDS = "CAST(strftime('%s', {0}.start_time) AS INTEGER)"
+_GEO_VALUES = (
+    '{0}.id, {0}.latitude, {0}.latitude, {0}.longitude, {0}.longitude, '
+    + _START_SECONDS + ', ' + _START_SECONDS
+)
+
+GEO_SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS activities_geo USING rtree(
+        id, min_lat, max_lat, min_lng, max_lng, min_start, max_start
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS activities_geo_ai AFTER INSERT ON activities
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO activities_geo VALUES (""" + _GEO_VALUES.format('new') + """);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS activities_geo_ad AFTER DELETE ON activities BEGIN
+        DELETE FROM activities_geo WHERE id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS activities_geo_au AFTER UPDATE OF latitude, longitude, start_time ON activities BEGIN
+        DELETE FROM activities_geo WHERE id = old.id;
+        INSERT INTO activities_geo SELECT """ + _GEO_VALUES.format('new') + """
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END""",
+)
+
+GEO_REBUILD = (
+    'DELETE FROM activities_geo',
+    'INSERT INTO activities_geo SELECT ' + _GEO_VALUES.format('activities') + """
+    FROM activities WHERE latitude IS NOT NULL AND longitude IS NOT NULL""",
+)
+
+
+def init_geo_index(app, db):
+    """创建活动空间索引（需在应用上下文中调用）
+
+    仅支持带 R*Tree 模块的 SQLite，其他情况下附近活动查询按坐标列的范围条件执行。
+    """
+    app.extensions['activity_geo'] = False
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    try:
+        with db.engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'activities_geo'"
+            )).first()
+            for statement in GEO_SCHEMA:
+                conn.execute(text(statement))
+            if not exists:
+                # 首次创建时从已有数据构建索引
+                for statement in GEO_REBUILD:
+                    conn.execute(text(statement))
+    except OperationalError as e:
+        app.logger.warning('R*Tree geo index unavailable, falling back to column ranges: %s', e)
+        return
+
+    app.extensions['activity_geo'] = True
+
+
+def detect_geo_index(app, db):
+    """不做任何建表操作，仅检测空间索引是否已存在（需在应用上下文中调用）"""
+    app.extensions['activity_geo'] = False
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    with db.engine.connect() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'activities_geo'"
+        )).first()
+    app.extensions['activity_geo'] = exists is not None
+
+
+def rebuild_geo_index(db):
+    """根据 activities 表重建空间索引"""
+    with db.engine.begin() as conn:
+        for statement in GEO_REBUILD:
+            conn.execute(text(statement))
+
+
+def parse_coordinates(latitude, longitude):
+    """校验活动坐标，返回 (纬度, 经度)；两者均未提供时返回 (None, None)"""
+    if latitude in (None, '') and longitude in (None, ''):
+        return None, None
+    if latitude in (None, '') or longitude in (None, ''):
+        raise ValueError('latitude and longitude must be given together')
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError('latitude and longitude must be numbers')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('latitude must be within [-90, 90] and longitude within [-180, 180]')
+    return latitude, longitude
+
+
+def _parse_time_arg(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return parse_datetime(value)
+    except ValueError:
+        raise ValueError(f'Invalid datetime format for {name}')
+
+
+def _longitude_ranges(longitude, delta):
+    """经度范围 [longitude - delta, longitude + delta]，跨越 ±180° 时拆成两段
+
+    返回 [(下界, 上界, 该段对应的中心经度)]，中心经度用于计算该段内的经度差。
+    """
+    low, high = longitude - delta, longitude + delta
+    if delta >= 180:
+        return [(-180, 180, longitude)]
+    if low < -180:
+        return [(low + 360, 180, longitude + 360), (-180, high, longitude)]
+    if high > 180:
+        return [(low, 180, longitude), (-180, high - 360, longitude - 360)]
+    return [(low, high, longitude)]
+
+
+def has_coordinates(args):
+    """请求参数中是否给出了查询中心坐标"""
+    return bool(args.get('lat') and args.get('lng'))
+
+
+def apply_discovery_filters(query, args):
+    """按附近活动与时间窗口参数筛选活动
+
+    - lat / lng / radius_km: 以 (lat, lng) 为中心、radius_km 公里（默认 GEO_DEFAULT_RADIUS_KM）内的活动，
+      按等距圆柱投影近似计算距离，只返回有坐标的活动
+    - starts_after / starts_before: 开始时间位于 [starts_after, starts_before) 内的活动
+
+    有 R*Tree 索引时先按外接矩形与时间窗口在索引中查出候选 id，再精确筛选，不扫描活动表；
+    否则直接按坐标列的范围条件筛选。参数无效时抛出 ValueError。
+    """
+    starts_after = _parse_time_arg(args, 'starts_after')
+    starts_before = _parse_time_arg(args, 'starts_before')
+    if starts_after:
+        query = query.filter(Activity.start_time >= starts_after)
+    if starts_before:
+        query = query.filter(Activity.start_time < starts_before)
+
+    latitude, longitude = parse_coordinates(args.get('lat'), args.get('lng'))
+    if latitude is None:
+        return query
+
+    config = current_app.config
+    try:
+        radius = float(args.get('radius_km') or config.get('GEO_DEFAULT_RADIUS_KM', 10))
+    except ValueError:
+        raise ValueError('radius_km must be a number')
+    max_radius = config.get('GEO_MAX_RADIUS_KM', 200)
+    if not 0 < radius <= max_radius:
+        raise ValueError(f'radius_km must be within (0, {max_radius}]')
+
+    lat_delta = radius / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    ranges = _longitude_ranges(longitude, lat_delta / cos_lat if cos_lat > 1e-9 else 180)
+
+    if current_app.extensions.get('activity_geo'):
+        geo = ACTIVITIES_GEO.c
+        candidates = select(geo.id).where(
+            geo.min_lat <= latitude + lat_delta, geo.max_lat >= latitude - lat_delta,
+            or_(*(and_(geo.max_lng >= low, geo.min_lng <= high) for low, high, _ in ranges))
+        )
+        if starts_after:
+            candidates = candidates.where(geo.max_start >= calendar.timegm(starts_after.timetuple()) - 1)
+        if starts_before:
+            candidates = candidates.where(geo.min_start <= calendar.timegm(starts_before.timetuple()) + 1)
+        query = query.filter(Activity.id.in_(candidates))
+
+    return query.filter(
+        Activity.latitude.between(latitude - lat_delta, latitude + lat_delta),
+        or_(*(
+            and_(
+                Activity.longitude.between(low, high),
+                (Activity.latitude - latitude) * (Activity.latitude - latitude)
+                + (Activity.longitude - center) * (Activity.longitude - center) * (cos_lat * cos_lat)
+                <= lat_delta * lat_delta
+            )
+            for low, high, center in ranges
+        ))
+    )
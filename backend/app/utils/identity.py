@@ -0,0 +1,61 @@
+from flask import current_app
+from flask_jwt_extended import get_current_user, get_jwt
+from app import db
+from app.models.user import User
+from app.utils.cache import MemoryBackend
+
+
+class IdentityCache:
+    """JWT 用户加载缓存
+
+    注册为 flask_jwt_extended 的 user_lookup_loader，受保护接口通过
+    get_current_user() 取得用户快照（User.to_dict() 的结果），
+    命中时不查询数据库。缓存为进程内 LRU，条目在 JWT_IDENTITY_CACHE_TTL 秒后过期；
+    资料或志愿时长变化后由调用方 invalidate，其他进程最多读到 TTL 内的旧快照。
+    用户不存在时返回 None，flask_jwt_extended 以 401 拒绝请求。
+    """
+
+    def init_app(self, app, jwt):
+        app.extensions['identity_cache'] = {
+            'backend': MemoryBackend(app.config.get('JWT_IDENTITY_CACHE_MAXSIZE', 4096)),
+            'ttl': app.config.get('JWT_IDENTITY_CACHE_TTL', 60),
+        }
+        jwt.user_lookup_loader(self._lookup)
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['identity_cache']
+
+    def _lookup(self, jwt_header, jwt_data):
+        user_id = jwt_data[current_app.config.get('JWT_IDENTITY_CLAIM', 'sub')]
+        state = self._state()
+        snapshot = state['backend'].get(user_id)
+        if snapshot is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return None
+            snapshot = user.to_dict()
+            state['backend'].set(user_id, snapshot, state['ttl'])
+        return dict(snapshot)
+
+    def invalidate(self, user_id):
+        """用户资料变化后使其快照失效（在提交事务之后调用）"""
+        self.invalidate_many([user_id])
+
+    def invalidate_many(self, user_ids):
+        backend = self._state()['backend']
+        for user_id in user_ids:
+            backend.delete(user_id)
+
+
+def current_role():
+    """当前用户角色：优先读取令牌中的 role 声明，旧令牌回退到缓存的用户快照"""
+    return get_jwt().get('role') or get_current_user()['role']
+
+
+def identity_claims(user):
+    """写入访问令牌的稳定声明，角色判断无需查询数据库"""
+    return {'role': user.role, 'username': user.username}
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,169 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import (
+    current_app, g, has_app_context, has_request_context, request, request_finished, request_started
+)
+from sqlalchemy import event
+
+# 请求耗时直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metrics:
+    """请求级性能指标：按端点统计耗时直方图、SQL 查询数与数据库耗时
+
+    通过 Flask 请求信号与 SQLAlchemy 的 before/after_cursor_execute 事件采集；
+    请求之外（后台线程等）的查询计入 endpoint="background"。
+    指标保存在进程内，多进程部署时每个进程分别暴露。
+    """
+
+    def init_app(self, app, engine):
+        app.extensions['metrics'] = {
+            'lock': threading.Lock(),
+            'requests': {},      # (endpoint, method, status) -> 次数
+            'latency': {},       # (endpoint, method) -> [各桶计数..., +Inf 桶, 总和, 次数]
+            'queries': {},       # endpoint -> [查询数, 数据库耗时]
+            'slow_queries': 0,
+        }
+        request_started.connect(self._request_started, app)
+        request_finished.connect(self._request_finished, app)
+        self.watch_engine(engine)
+
+    def watch_engine(self, engine):
+        """采集该引擎上执行的查询（异步引擎传入其 sync_engine）"""
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    @staticmethod
+    def _state(app=None):
+        return (app or current_app).extensions['metrics']
+
+    @staticmethod
+    def _request_started(sender, **extra):
+        g.metrics = {'start': time.perf_counter(), 'queries': 0, 'db_time': 0.0}
+
+    def _request_finished(self, sender, response, **extra):
+        metrics = g.pop('metrics', None)
+        if metrics is None:
+            return
+        elapsed = time.perf_counter() - metrics['start']
+        endpoint = request.endpoint or 'unmatched'
+
+        state = self._state(sender)
+        with state['lock']:
+            key = (endpoint, request.method, str(response.status_code))
+            state['requests'][key] = state['requests'].get(key, 0) + 1
+            histogram = state['latency'].setdefault(
+                (endpoint, request.method), [0] * (len(LATENCY_BUCKETS) + 1) + [0.0, 0]
+            )
+            histogram[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            histogram[-2] += elapsed
+            histogram[-1] += 1
+            queries = state['queries'].setdefault(endpoint, [0, 0.0])
+            queries[0] += metrics['queries']
+            queries[1] += metrics['db_time']
+
+        if sender.config.get('SERVER_TIMING'):
+            response.headers['Server-Timing'] = (
+                f'db;dur={metrics["db_time"] * 1000:.1f};desc="{metrics["queries"]} queries", '
+                f'app;dur={elapsed * 1000:.1f}'
+            )
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # 开始时间记在本次执行的 context 上：语句出错时 after_cursor_execute 不会触发，也不会残留
+        if context is not None:
+            context._metrics_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_metrics_query_start', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if not has_app_context():
+            return
+
+        metrics = g.get('metrics') if has_request_context() else None
+        if metrics is not None:
+            metrics['queries'] += 1
+            metrics['db_time'] += elapsed
+        else:
+            state = self._state()
+            with state['lock']:
+                queries = state['queries'].setdefault('background', [0, 0.0])
+                queries[0] += 1
+                queries[1] += elapsed
+
+        threshold = current_app.config.get('SLOW_QUERY_MS', 0)
+        if threshold and elapsed * 1000 >= threshold:
+            state = self._state()
+            with state['lock']:
+                state['slow_queries'] += 1
+            current_app.logger.warning(
+                'Slow query (%.1f ms, endpoint=%s): %s', elapsed * 1000,
+                request.endpoint if has_request_context() else 'background',
+                ' '.join(statement.split())[:1000]
+            )
+
+    def render(self, extra=()):
+        """以 Prometheus 文本格式输出全部指标；extra 为额外的 (名称, 类型, 帮助, 样本) 列表"""
+        state = self._state()
+        with state['lock']:
+            requests = dict(state['requests'])
+            latency = {key: list(value) for key, value in state['latency'].items()}
+            queries = {key: list(value) for key, value in state['queries'].items()}
+            slow_queries = state['slow_queries']
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+                lines.append(f'{name}{suffix}{{{label_text}}} {value}' if label_text
+                             else f'{name}{suffix} {value}')
+
+        family('http_requests_total', 'counter', 'Total HTTP requests.', [
+            ('', (('endpoint', endpoint), ('method', method), ('status', status)), count)
+            for (endpoint, method, status), count in sorted(requests.items())
+        ])
+
+        samples = []
+        for (endpoint, method), histogram in sorted(latency.items()):
+            labels = (('endpoint', endpoint), ('method', method))
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), histogram):
+                cumulative += count
+                samples.append(('_bucket', labels + (('le', _format_bound(bound)),), cumulative))
+            samples.append(('_sum', labels, f'{histogram[-2]:.6f}'))
+            samples.append(('_count', labels, histogram[-1]))
+        family('http_request_duration_seconds', 'histogram', 'HTTP request latency.', samples)
+
+        family('db_queries_total', 'counter', 'SQL statements executed.', [
+            ('', (('endpoint', endpoint),), count)
+            for endpoint, (count, _) in sorted(queries.items())
+        ])
+        family('db_query_duration_seconds_total', 'counter', 'Time spent executing SQL.', [
+            ('', (('endpoint', endpoint),), f'{seconds:.6f}')
+            for endpoint, (_, seconds) in sorted(queries.items())
+        ])
+        family('db_slow_queries_total', 'counter', 'SQL statements slower than SLOW_QUERY_MS.', [
+            ('', (), slow_queries)
+        ])
+
+        for name, kind, help_text, extra_samples in extra:
+            family(name, kind, help_text, extra_samples)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+metrics = Metrics()
@@ -0,0 +1,106 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from math import ceil
+from sqlalchemy import and_, func, or_, select
+from app.utils.async_reads import async_reads
+
+
+def parse_bool_arg(args, name, default=True):
+    """解析布尔型查询参数（false/0/no 视为假）"""
+    value = args.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ('false', '0', 'no')
+
+
+def encode_cursor(sort_value, row_id):
+    """将 (排序值, id) 编码为不透明的游标字符串"""
+    payload = [sort_value.isoformat() if sort_value else None, row_id]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """解析游标字符串，格式不合法时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        sort_value, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (TypeError, ValueError, binascii.Error):
+        raise ValueError('Invalid cursor')
+
+
+def _keyset_query(query, sort_column, id_column, cursor, per_page):
+    """按 (sort_column, id) 倒序定位到游标之后，多取一条用于判断是否还有下一页"""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id)
+        ))
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1)
+
+
+def _keyset_page(items, sort_column, id_column, per_page):
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return items, next_cursor
+
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, per_page=10):
+    """按 (sort_column, id) 倒序做游标分页，返回 (items, next_cursor)
+
+    使用 WHERE 条件定位上一页末尾，深分页与第一页的代价相同。
+    """
+    per_page = max(per_page, 1)
+    items = _keyset_query(query, sort_column, id_column, cursor, per_page).all()
+    return _keyset_page(items, sort_column, id_column, per_page)
+
+
+def _count_statement(query):
+    return select(func.count()).select_from(query.order_by(None).statement.subquery())
+
+
+def paginate_query(query, sort_column, id_column, args, total=None):
+    """根据请求参数选择偏移分页或游标分页，返回 (items, 分页信息)
+
+    - 传入 cursor 参数（首页可为空字符串）时使用游标分页，返回 next_cursor
+    - include_total=false 时跳过 COUNT(*) 查询；调用方已知总数时传入 total，同样不再查询
+    数据页与 COUNT 通过 async_reads.fetch_all 执行，开启 ASYNC_READS 时两者并发。
+    """
+    per_page = args.get('per_page', 10, type=int)
+    include_total = parse_bool_arg(args, 'include_total')
+    count = [_count_statement(query)] if include_total and total is None else []
+
+    if 'cursor' in args:
+        per_page = max(per_page, 1)
+        page_query = _keyset_query(query, sort_column, id_column, args.get('cursor'), per_page)
+        results = async_reads.fetch_all(page_query.statement, *count)
+        items, next_cursor = _keyset_page(results[0], sort_column, id_column, per_page)
+        meta = {'next_cursor': next_cursor, 'has_more': next_cursor is not None}
+        if include_total:
+            meta['total'] = results[1][0][0] if count else total
+        return items, meta
+
+    page = args.get('page', 1, type=int)
+    # 与 Flask-SQLAlchemy paginate(error_out=False) 一致：非法页码取 1，非法每页条数取 20
+    per_page = per_page if per_page >= 1 else 20
+    page_query = query.order_by(sort_column.desc(), id_column.desc()).limit(per_page).offset(
+        (max(page, 1) - 1) * per_page
+    )
+    results = async_reads.fetch_all(page_query.statement, *count)
+    if count:
+        total = results[1][0][0]
+    elif not include_total:
+        total = None
+    meta = {
+        'total': total,
+        'pages': (ceil(total / per_page) if total else 0) if include_total else None,
+        'current_page': page
+    }
+    return results[0], meta
@@ -0,0 +1,182 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import after_this_request, current_app, has_request_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import bcrypt
+except ImportError:  # 未安装 bcrypt 时只能使用 scrypt / pbkdf2
+    bcrypt = None
+
+
+class PasswordHasherBusy(Exception):
+    """密码哈希线程池已满或等待超时"""
+
+
+class BcryptHasher:
+    """bcrypt 哈希，rounds 为成本因子（每加 1 耗时翻倍）"""
+
+    name = 'bcrypt'
+
+    def __init__(self, rounds=10):
+        if bcrypt is None:
+            raise RuntimeError('PASSWORD_HASHER=bcrypt requires the bcrypt package')
+        self.rounds = rounds
+
+    def identify(self, encoded):
+        return encoded.startswith(('$2a$', '$2b$', '$2y$'))
+
+    def hash(self, password):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('ascii')
+
+    def verify(self, password, encoded):
+        return bcrypt.checkpw(password.encode('utf-8'), encoded.encode('ascii'))
+
+    def needs_rehash(self, encoded):
+        return not encoded.startswith('$2b$') or int(encoded.split('$')[2]) != self.rounds
+
+
+class WerkzeugHasher:
+    """Werkzeug 格式的哈希（method$salt$hash），method 中包含成本参数"""
+
+    def __init__(self, name, method):
+        self.name = name
+        self.method = method
+
+    def identify(self, encoded):
+        return '$' in encoded and not encoded.startswith('$')
+
+    def hash(self, password):
+        return generate_password_hash(password, self.method)
+
+    def verify(self, password, encoded):
+        return check_password_hash(encoded, password)
+
+    def needs_rehash(self, encoded):
+        return encoded.split('$', 1)[0] != self.method
+
+
+def create_hasher(config):
+    """根据 PASSWORD_HASHER 配置创建用于生成新哈希的 hasher"""
+    name = config.get('PASSWORD_HASHER', 'bcrypt')
+    if name == 'bcrypt':
+        return BcryptHasher(config.get('BCRYPT_ROUNDS', 10))
+    if name == 'scrypt':
+        n, r, p = (config.get(key) for key in ('SCRYPT_N', 'SCRYPT_R', 'SCRYPT_P'))
+        return WerkzeugHasher('scrypt', f'scrypt:{n or 2 ** 15}:{r or 8}:{p or 1}')
+    if name == 'pbkdf2':
+        return WerkzeugHasher('pbkdf2', f'pbkdf2:sha256:{config.get("PBKDF2_ITERATIONS", 600000)}')
+    raise ValueError(f'Unknown PASSWORD_HASHER: {name}')
+
+
+class PasswordHasher:
+    """密码哈希子系统
+
+    新密码使用 PASSWORD_HASHER 配置的算法与成本参数；验证时按哈希格式识别算法，
+    旧算法或旧参数的哈希在登录成功、响应发送后按当前配置重新生成，不增加登录耗时。
+    哈希计算在有界线程池中执行（bcrypt / hashlib 计算期间释放 GIL）：
+    并发计算数不超过 PASSWORD_HASH_WORKERS，排队数超过 PASSWORD_HASH_MAX_PENDING
+    时立即抛出 PasswordHasherBusy，避免登录高峰占满所有请求线程。
+    PASSWORD_HASH_WORKERS 为 0 时在请求线程内直接计算。
+    """
+
+    def init_app(self, app):
+        hasher = create_hasher(app.config)
+        verifiers = [hasher]
+        if bcrypt is not None and hasher.name != 'bcrypt':
+            verifiers.append(BcryptHasher(app.config.get('BCRYPT_ROUNDS', 10)))
+        # Werkzeug 可验证任意 method 的哈希（包括原有的默认 pbkdf2 哈希）
+        verifiers.append(WerkzeugHasher('werkzeug', None))
+
+        workers = app.config.get('PASSWORD_HASH_WORKERS', 4)
+        app.extensions['password_hasher'] = {
+            'hasher': hasher,
+            'verifiers': verifiers,
+            'workers': workers,
+            'slots': threading.BoundedSemaphore(
+                workers + app.config.get('PASSWORD_HASH_MAX_PENDING', 32)
+            ) if workers else None,
+            'timeout': app.config.get('PASSWORD_HASH_TIMEOUT', 10),
+            'pool': None,
+            'lock': threading.Lock(),
+        }
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['password_hasher']
+
+    def _run(self, fn, *args):
+        """在线程池中执行 fn 并等待结果"""
+        state = self._state()
+        if not state['workers']:
+            return fn(*args)
+
+        if not state['slots'].acquire(blocking=False):
+            raise PasswordHasherBusy('Too many pending password hash operations')
+        try:
+            with state['lock']:
+                # 延迟创建，避免在 fork 前启动线程
+                if state['pool'] is None:
+                    state['pool'] = ThreadPoolExecutor(
+                        max_workers=state['workers'], thread_name_prefix='password-hash'
+                    )
+            future = state['pool'].submit(fn, *args)
+        except Exception:
+            state['slots'].release()
+            raise
+        future.add_done_callback(lambda _: state['slots'].release())
+
+        try:
+            return future.result(timeout=state['timeout'])
+        except TimeoutError:
+            raise PasswordHasherBusy('Password hash operation timed out') from None
+
+    def _verifier(self, encoded):
+        for verifier in self._state()['verifiers']:
+            if verifier.identify(encoded):
+                return verifier
+        return None
+
+    def hash(self, password):
+        """按当前配置生成密码哈希"""
+        return self._run(self._state()['hasher'].hash, password)
+
+    def needs_rehash(self, encoded):
+        """哈希的算法或成本参数与当前配置不同"""
+        hasher = self._state()['hasher']
+        return not hasher.identify(encoded) or hasher.needs_rehash(encoded)
+
+    def verify(self, password, encoded):
+        """验证密码，返回 (是否匹配, 是否需要按当前配置重新哈希)"""
+        verifier = self._verifier(encoded or '')
+        if verifier is None:
+            return False, False
+        if not self._run(verifier.verify, password, encoded):
+            return False, False
+        return True, self.needs_rehash(encoded)
+
+    def rehash_after_response(self, password, save):
+        """响应发送后按当前配置重新哈希，并在新的应用上下文中调用 save(新哈希)
+
+        不在请求中时立即执行。失败只记录日志，用户下次登录时会再次尝试。
+        """
+        app = current_app._get_current_object()
+
+        def rehash():
+            with app.app_context():
+                try:
+                    save(self.hash(password))
+                except Exception:
+                    app.logger.exception('Password rehash failed')
+
+        if not has_request_context():
+            rehash()
+            return
+
+        @after_this_request
+        def defer(response):
+            response.call_on_close(rehash)
+            return response
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,82 @@
+import os
+import threading
+import time
+from flask import current_app
+from app import db
+
+
+class Scheduler:
+    """进程内周期任务调度
+
+    任务为在应用上下文中执行的函数，按各自的间隔（秒）运行。
+    SCHEDULER_MODE 为 thread 时，每个进程在处理第一个请求时启动后台线程
+    （fork 之后按进程号重新启动）；为 none 时不启动，可改用 flask run-jobs 由 cron 触发。
+    任务应为幂等的集合 UPDATE，多个进程同时运行也不会产生错误结果。
+    """
+
+    def __init__(self):
+        self.jobs = {}
+
+    def add_job(self, name, func, interval_key):
+        """注册任务，间隔取自配置项 interval_key"""
+        self.jobs[name] = (func, interval_key)
+
+    def init_app(self, app):
+        app.extensions['scheduler'] = {
+            'app': app,
+            'thread': None,
+            'pid': None,
+            'lock': threading.Lock(),
+            'last_run': {},
+        }
+        if app.config.get('SCHEDULER_MODE') == 'thread':
+            app.before_request(self.ensure_started)
+
+    @staticmethod
+    def _state():
+        return current_app.extensions['scheduler']
+
+    def ensure_started(self):
+        """确保当前进程的调度线程在运行"""
+        state = self._state()
+        if state['pid'] == os.getpid() and state['thread'] is not None and state['thread'].is_alive():
+            return
+        with state['lock']:
+            if state['pid'] == os.getpid() and state['thread'] is not None and state['thread'].is_alive():
+                return
+            state['pid'] = os.getpid()
+            state['thread'] = threading.Thread(
+                target=self._worker, args=(state,), name='scheduler', daemon=True
+            )
+            state['thread'].start()
+
+    def _worker(self, state):
+        app = state['app']
+        while True:
+            with app.app_context():
+                self.run_due()
+            time.sleep(app.config.get('SCHEDULER_TICK', 5))
+
+    def run_due(self):
+        """运行到期的任务"""
+        state = self._state()
+        now = time.monotonic()
+        for name, (func, interval_key) in self.jobs.items():
+            last_run = state['last_run'].get(name)
+            if last_run is None or now - last_run >= current_app.config[interval_key]:
+                state['last_run'][name] = now
+                self.run(name)
+
+    def run(self, name):
+        """立即运行一个任务，返回任务结果；失败时回滚并记录日志"""
+        func, _ = self.jobs[name]
+        try:
+            return func()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Scheduled job %s failed', name)
+        finally:
+            db.session.remove()
+
+
+scheduler = Scheduler()
@@ -0,0 +1,80 @@
+from sqlalchemy import inspect, text
+
+
+def ensure_columns(db):
+    """为已存在的表补加模型中新增的可空列
+
+    db.create_all() 不会修改已有的表；新增列均为可空列，可直接 ALTER TABLE ADD COLUMN。
+    返回新增的列名列表（表名.列名）。
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                conn.execute(text(
+                    f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN '
+                    f'{preparer.format_column(column)} {column.type.compile(db.engine.dialect)}'
+                ))
+                added.append(f'{table.name}.{column.name}')
+    return added
+
+
+def ensure_indexes(db):
+    """为已存在的表补建模型中声明但数据库中缺失的索引
+
+    db.create_all() 只会创建缺失的表，不会给已有表添加新索引，
+    因此旧版本的数据库文件需要在启动时补齐。返回新建的索引名列表。
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn, checkfirst=True)
+                    created.append(index.name)
+    return created
+
+
+def upgrade_schema(app, db):
+    """创建缺失的表并迁移已有数据库的结构（需在应用上下文中调用）"""
+    existing_tables = set(inspect(db.engine).get_table_names())
+    db.create_all()
+    added = ensure_columns(db)
+    if added:
+        app.logger.info('Added missing columns: %s', ', '.join(added))
+    created = ensure_indexes(db)
+    if created:
+        app.logger.info('Created missing indexes: %s', ', '.join(created))
+    
+    # 新建时长流水表时，由已有的完成记录补建流水与月度汇总
+    if 'hours_ledger' not in existing_tables:
+        from app.models.hours_ledger import HoursLedgerEntry
+        
+        backfilled = HoursLedgerEntry.backfill()
+        db.session.commit()
+        if backfilled:
+            app.logger.info('Backfilled %d hours ledger entries', backfilled)
+    
+    # 新建分类计数表时，按已有活动统计一次
+    if 'activity_facets' not in existing_tables:
+        from app.models.activity_facet import ActivityFacet
+        
+        rebuilt = ActivityFacet.rebuild()
+        db.session.commit()
+        if rebuilt:
+            app.logger.info('Built %d activity facet counts', rebuilt)
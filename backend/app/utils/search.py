@@ -0,0 +1,108 @@
+from app.models.activity import Activity
+from flask import current_app
+from sqlalchemy import column, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+
+# FTS5 全文索引表，以 activities 为外部内容表，通过触发器保持同步
+ACTIVITIES_FTS = table('activities_fts', column('rowid'), column('rank'), column('activities_fts'))
+
+# trigram 分词器按字符三元组建索引，适用于中文等无空格分词的文本
+MIN_FTS_TERM_LENGTH = 3
+
+FTS_SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS activities_fts USING fts5(
+        title, description,
+        content='activities', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS activities_fts_ai AFTER INSERT ON activities BEGIN
+        INSERT INTO activities_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS activities_fts_ad AFTER DELETE ON activities BEGIN
+        INSERT INTO activities_fts(activities_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS activities_fts_au AFTER UPDATE OF title, description ON activities BEGIN
+        INSERT INTO activities_fts(activities_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO activities_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+)
+
+
+def init_search_index(app, db):
+    """创建活动全文索引（需在应用上下文中调用）
+
+    仅支持带 FTS5 trigram 分词器的 SQLite（3.34+），其他情况下搜索回退到 LIKE。
+    """
+    app.extensions['activity_fts'] = False
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    try:
+        with db.engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'activities_fts'"
+            )).first()
+            for statement in FTS_SCHEMA:
+                conn.execute(text(statement))
+            if not exists:
+                # 首次创建时从已有数据构建索引
+                conn.execute(text("INSERT INTO activities_fts(activities_fts) VALUES ('rebuild')"))
+    except OperationalError as e:
+        app.logger.warning('FTS5 search index unavailable, falling back to LIKE: %s', e)
+        return
+
+    app.extensions['activity_fts'] = True
+
+
+def detect_search_index(app, db):
+    """不做任何建表操作，仅检测全文索引是否已存在（需在应用上下文中调用）"""
+    app.extensions['activity_fts'] = False
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    with db.engine.connect() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'activities_fts'"
+        )).first()
+    app.extensions['activity_fts'] = exists is not None
+
+
+def rebuild_search_index(db):
+    """根据 activities 表重建全文索引"""
+    with db.engine.begin() as conn:
+        conn.execute(text("INSERT INTO activities_fts(activities_fts) VALUES ('rebuild')"))
+
+
+def _fts_phrase(term):
+    """将搜索词转义为 FTS5 短语，trigram 下等价于子串匹配"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def uses_search_index(term):
+    """该搜索词是否走全文索引（索引可用且不短于三个字符）"""
+    return bool(current_app.extensions.get('activity_fts')) and len(term.strip()) >= MIN_FTS_TERM_LENGTH
+
+
+def apply_activity_search(query, term, rank=True):
+    """为活动查询添加关键词筛选
+
+    优先使用全文索引；索引不可用或搜索词短于三个字符时回退到 LIKE。
+    全文索引以 id IN (MATCH 子查询) 筛选，由索引驱动查询；
+    rank 为真时需要按相关度（bm25）排序，改为连接全文索引表。
+    """
+    term = term.strip()
+    if uses_search_index(term):
+        match = ACTIVITIES_FTS.c.activities_fts.match(_fts_phrase(term))
+        if rank:
+            return query.join(
+                ACTIVITIES_FTS, ACTIVITIES_FTS.c.rowid == Activity.id
+            ).filter(match).order_by(ACTIVITIES_FTS.c.rank)
+        return query.filter(Activity.id.in_(select(ACTIVITIES_FTS.c.rowid).where(match)))
+
+    return query.filter(or_(
+        Activity.title.contains(term),
+        Activity.description.contains(term)
+    ))
@@ -0,0 +1,118 @@
+from datetime import datetime
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import DateTime
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+class OrJSONProvider(DefaultJSONProvider):
+    """基于 orjson 的 JSON Provider，datetime 由 orjson 直接输出为 ISO 8601"""
+
+    native_datetime = True
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(
+            obj, default=self.default, option=self.option | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app):
+    """JSON_PROVIDER 为 auto 且安装了 orjson 时替换 Flask 默认的 JSON Provider"""
+    if app.config.get('JSON_PROVIDER', 'auto') == 'auto' and orjson is not None:
+        app.json = OrJSONProvider(app)
+
+
+class Projection:
+    """列投影序列化器
+
+    只 SELECT 需要的列，直接从结果行构造字典，不实例化 ORM 对象。
+    - fields: 可用字段，模型列名或 (名称, SQL 表达式)
+    - computed: 派生字段 {名称: (依赖字段, 计算函数)}，整批共用同一个 now
+    - presets: 字段集合预设，如 summary / full
+    - output: 输出的字段（默认全部），只查询输出及其依赖的列
+    - required: 需要查询但不输出的列（如游标分页的排序键）
+    """
+
+    def __init__(self, model, fields, computed=None, presets=None, output=None, required=()):
+        self.model = model
+        self.sources = dict(
+            field if isinstance(field, tuple) else (field, getattr(model, field))
+            for field in fields
+        )
+        self.computed = computed or {}
+        self.presets = presets or {}
+
+        available = list(self.sources) + list(self.computed)
+        if output is None:
+            output = available
+        unknown = [name for name in output if name not in available]
+        if unknown:
+            raise ValueError(f'Unknown field: {unknown[0]}')
+
+        output = set(output)
+        selected = output | set(required)
+        for name in output & set(self.computed):
+            selected.update(self.computed[name][0])
+
+        self.output = [name for name in available if name in output]
+        self.fields = [name for name in self.sources if name in selected]
+        self.hidden = [name for name in self.fields if name not in output]
+        self.datetime_fields = [
+            name for name in self.fields
+            if name in output and isinstance(getattr(self.sources[name], 'type', None), DateTime)
+        ]
+
+    def narrow(self, names, required=()):
+        """返回只输出 names 中字段的投影"""
+        return Projection(
+            self.model, list(self.sources.items()), self.computed, self.presets, names, required
+        )
+
+    def for_request(self, args, default, required=()):
+        """按 fields 查询参数（逗号分隔的字段名或预设名）选择输出字段，id 总是输出"""
+        names = ['id']
+        for name in (args.get('fields') or default).split(','):
+            name = name.strip()
+            if name:
+                names.extend(self.presets.get(name, [name]))
+        return self.narrow(names, required)
+
+    def columns(self, prefix=''):
+        """返回带标签的列，用于 query.with_entities()"""
+        return [self.sources[name].label(prefix + name) for name in self.fields]
+
+    def serialize(self, row, offset=0, now=None, native_datetime=None):
+        """将结果行中从 offset 开始的列转换为字典"""
+        values = dict(zip(self.fields, row[offset:offset + len(self.fields)]))
+        for name in self.output:
+            if name in self.computed:
+                values[name] = self.computed[name][1](values, now)
+        for name in self.hidden:
+            del values[name]
+
+        if native_datetime is None:
+            native_datetime = getattr(current_app.json, 'native_datetime', False)
+        if not native_datetime:
+            for name in self.datetime_fields:
+                if values[name] is not None:
+                    values[name] = values[name].isoformat()
+        return values
+
+    def serialize_all(self, rows, offset=0):
+        """序列化多行，整批共用一个 now"""
+        now = datetime.utcnow()
+        native_datetime = getattr(current_app.json, 'native_datetime', False)
+        return [self.serialize(row, offset, now, native_datetime) for row in rows]
@@ -0,0 +1,177 @@
+import os
+import signal
+import socket
+import threading
+import time
+from werkzeug.serving import make_server
+from app import db
+from app.utils.async_reads import async_reads
+
+
+def warmup(app):
+    """预热：在 fork 之前请求 WARMUP_PATHS 中的接口
+
+    直接调用视图函数（不经过 before_request 与请求信号，不会启动后台线程、不计入指标），
+    使 SQLAlchemy 语句编译缓存、路由匹配、JSON 序列化与响应缓存在主进程中就绪，
+    fork 后各 worker 共享这些内存页。返回 {路径: 状态码}。
+    """
+    started = time.perf_counter()
+    results = {}
+    for path in app.config.get('WARMUP_PATHS', ()):
+        with app.test_request_context(path):
+            try:
+                response = app.make_response(app.dispatch_request())
+                results[path] = response.status_code
+            except Exception as e:
+                app.logger.warning('Warmup request %s failed: %s', path, e)
+                results[path] = None
+    app.logger.info('Warmup finished in %.0f ms', (time.perf_counter() - started) * 1000)
+    return results
+
+
+def before_fork(app):
+    """fork 之前关闭主进程中的数据库连接及异步读事件循环，避免子进程共用同一连接"""
+    with app.app_context():
+        async_reads.shutdown()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def after_fork(app):
+    """子进程中重新初始化连接池；close=False 不触碰父进程打开的连接
+
+    后台线程（调度器、签到队列）与密码哈希线程池均按需或按进程号重新启动，无需处理。
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+class PreforkServer:
+    """纯 Python 的预派生多进程 WSGI 服务器（仅 POSIX）
+
+    主进程加载应用、预热并监听端口后 fork 出 workers 个子进程，子进程共享监听套接字，
+    各自运行一个多线程 Werkzeug 服务器。子进程异常退出时自动重启；
+    主进程收到 SIGTERM/SIGINT 后通知子进程停止接受新连接，
+    等待处理中的请求完成（最长 graceful_timeout 秒）后退出。
+    """
+
+    def __init__(self, app, host='0.0.0.0', port=5000, workers=2, threaded=True,
+                 graceful_timeout=30, backlog=2048):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threaded = threaded
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.children = {}
+        self.running = False
+
+    def _bind(self):
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def run(self):
+        self.listener = self._bind()
+        self.port = self.listener.getsockname()[1]
+        before_fork(self.app)
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self._spawn()
+        print(f' * Running on http://{self.host}:{self.port} ({self.workers} workers)', flush=True)
+
+        try:
+            while self.running:
+                self._reap(respawn=True)
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+            self.listener.close()
+
+    def _stop(self, signum, frame):
+        self.running = False
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return
+        # 子进程
+        code = 0
+        try:
+            self._serve_child()
+        except BaseException:
+            self.app.logger.exception('Worker %d crashed', os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _serve_child(self):
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        after_fork(self.app)
+        server = make_server(
+            self.host, self.port, self.app, threaded=self.threaded, fd=self.listener.fileno()
+        )
+        # 停止时等待处理中的请求线程结束
+        server.daemon_threads = False
+        server.block_on_close = True
+
+        def stop(signum, frame):
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+    def _reap(self, respawn):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None:
+                continue
+            if respawn and self.running:
+                self.app.logger.warning(
+                    'Worker %d exited with status %d, restarting', pid, os.waitstatus_to_exitcode(status)
+                )
+                # 启动即退出的 worker 稍作等待，避免快速循环重启
+                if time.monotonic() - started < 1:
+                    time.sleep(1)
+                self._spawn()
+
+    def _shutdown(self):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.1)
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.children.clear()
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models.activity import Activity
+from app.models.registration import Registration
+from app.utils.cache import response_cache
+
+
+def transition_statuses():
+    """已结束的活动标记为 completed，宽限期后仍未签到的报名标记为 absent
+
+    两步均为集合 UPDATE，在同一事务中提交；有活动状态变化时失效活动缓存。
+    返回 {'completed_activities': n, 'absent_registrations': m}。
+    """
+    now = datetime.utcnow()
+    grace = timedelta(hours=current_app.config.get('NO_SHOW_GRACE_HOURS', 24))
+
+    completed = Activity.complete_expired(now)
+    absent = Registration.close_no_shows(now - grace)
+    db.session.commit()
+
+    if completed:
+        response_cache.invalidate('activities')
+        for activity_id in completed:
+            response_cache.invalidate(f'activity:{activity_id}')
+    if completed or absent:
+        current_app.logger.info(
+            'Status transitions: %d activities completed, %d registrations absent',
+            len(completed), absent
+        )
+    return {'completed_activities': len(completed), 'absent_registrations': absent}
@@ -0,0 +1,101 @@
+"""只读接口同步与异步执行路径（ASYNC_READS）的对比压测
+
+在每条 SQL 执行前人为注入固定延迟（在实际执行语句的线程中 sleep，模拟网络数据库或
+慢磁盘的 I/O 等待），高并发下分别测量两种路径的吞吐、延迟分位数与每请求查询数。
+异步路径需要安装 aiosqlite。数据集与 benchmarks.suite 共用同一缓存。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.async_reads --scale small --latency-ms 5 --threads 64
+    python -m benchmarks.async_reads --latency-ms 0 --requests 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+from app import create_app
+from benchmarks.suite import (
+    SCALES, SUITE_CONFIG, TestClientTransport, build_scenarios, prepare_database, run_scenario,
+    token_factory
+)
+
+SCENARIOS = ('activities.list', 'activities.detail', 'users.my_registrations', 'users.statistics')
+
+
+def install_latency(latency):
+    """为之后新建的所有连接注入每条语句的延迟
+
+    使用 sqlite3 的 trace 回调，回调在执行语句的线程中运行：同步路径为请求线程，
+    异步路径为 aiosqlite 的连接线程，事件循环本身不会被阻塞。
+    新连接上的 PRAGMA 不注入延迟：journal_mode 持有文件锁时 sleep 会让建连互相排队。
+    """
+    def trace(statement):
+        if not statement.startswith('PRAGMA'):
+            time.sleep(latency)
+
+    @event.listens_for(Pool, 'connect')
+    def add_latency(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, 'await_'):
+            dbapi_connection.await_(dbapi_connection.driver_connection.set_trace_callback(trace))
+        else:
+            dbapi_connection.set_trace_callback(trace)
+    return add_latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES, key=lambda name: SCALES[name]), default='small')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='每条语句注入的延迟（毫秒）')
+    parser.add_argument('--requests', type=int, default=400, help='每个端点的请求数')
+    parser.add_argument('--threads', type=int, default=64, help='并发线程数')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'volunteer-bench-data'),
+                        help='数据集缓存目录')
+    args = parser.parse_args()
+
+    users, activities, _ = SCALES[args.scale]
+    scenarios = [scenario for scenario in build_scenarios(users, activities) if scenario.name in SCENARIOS]
+    listener = install_latency(args.latency_ms / 1000) if args.latency_ms else None
+
+    print(f'scale={args.scale} latency={args.latency_ms}ms/statement '
+          f'requests={args.requests} threads={args.threads}')
+    print(f'{"endpoint":<26}{"mode":<7}{"rps":>9}{"p50 ms":>10}{"p99 ms":>10}{"queries":>9}{"errors":>8}')
+    results = {}
+    try:
+        for mode in ('sync', 'async'):
+            database = prepare_database(args.scale, args.data_dir)
+            app = create_app(dict(
+                SUITE_CONFIG, SQLALCHEMY_DATABASE_URI=f'sqlite:///{database}', ASYNC_READS=mode == 'async',
+                # 连接池足够大，比较的是执行方式而不是排队等连接
+                SQLALCHEMY_ENGINE_OPTIONS={'pool_size': args.threads, 'max_overflow': args.threads},
+                ASYNC_DB_POOL_SIZE=args.threads
+            ))
+            with app.app_context():
+                from app.utils.async_reads import async_reads
+                if mode == 'async' and not async_reads.enabled():
+                    print('async reads unavailable (install aiosqlite)', file=sys.stderr)
+                    return 1
+
+            tokens = token_factory(app)
+            transport = TestClientTransport(app)
+            for scenario in scenarios:
+                result = run_scenario(transport, scenario, tokens, args.requests, args.threads)
+                results[(scenario.name, mode)] = result
+                print(f'{scenario.name:<26}{mode:<7}{result["rps"]:>9}{result["p50_ms"]:>10}'
+                      f'{result["p99_ms"]:>10}{result["queries_per_request"]:>9}{result["errors"]:>8}',
+                      flush=True)
+    finally:
+        if listener is not None:
+            event.remove(Pool, 'connect', listener)
+
+    print()
+    for scenario in scenarios:
+        sync, async_ = results[(scenario.name, 'sync')], results[(scenario.name, 'async')]
+        print(f'{scenario.name:<26}async/sync rps x{async_["rps"] / sync["rps"]:.2f}, '
+              f'p50 x{async_["p50_ms"] / sync["p50_ms"]:.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""活动当天批量签到/完成压测：逐条调用单项接口 vs 批量接口
+
+用法（在 backend 目录下）:
+    python -m benchmarks.bulk_checkin --volunteers 500
+"""
+import argparse
+import time
+from benchmarks.common import make_app, seed_activity, seed_registrations, seed_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--volunteers', type=int, default=500, help='每个活动的报名人数')
+    args = parser.parse_args()
+
+    app = make_app()
+    users = seed_users(app, args.volunteers + 1)
+    (coordinator_id, coordinator), volunteers = users[0], users[1:]
+    volunteer_ids = [user_id for user_id, _ in volunteers]
+    client = app.test_client()
+
+    # 单项接口：每位志愿者各自签到、确认完成
+    single_activity = seed_activity(
+        app, coordinator_id, max_participants=args.volunteers, volunteer_hours=3
+    )
+    registration_ids = seed_registrations(app, single_activity, volunteer_ids)
+    started = time.perf_counter()
+    for registration_id, (_, headers) in zip(registration_ids, volunteers):
+        client.post(f'/api/users/check-in/{registration_id}', headers=headers)
+    for registration_id, (_, headers) in zip(registration_ids, volunteers):
+        client.post(f'/api/users/complete/{registration_id}', headers=headers, json={})
+    single_elapsed = time.perf_counter() - started
+
+    # 批量接口：协调人一次提交全部报名
+    bulk_activity = seed_activity(
+        app, coordinator_id, max_participants=args.volunteers, volunteer_hours=3
+    )
+    registration_ids = seed_registrations(app, bulk_activity, volunteer_ids)
+    started = time.perf_counter()
+    check_in = client.post(f'/api/activities/{bulk_activity}/check-in', headers=coordinator,
+                           json={'registration_ids': registration_ids}).get_json()
+    complete = client.post(f'/api/activities/{bulk_activity}/complete', headers=coordinator,
+                           json={'registration_ids': registration_ids}).get_json()
+    bulk_elapsed = time.perf_counter() - started
+
+    print(f'{args.volunteers} volunteers, check-in + complete')
+    print(f'  single-item loop: {single_elapsed:.3f}s')
+    print(f'  bulk endpoints:   {bulk_elapsed:.3f}s  '
+          f'(checked in {check_in["succeeded"]}, completed {complete["succeeded"]}, '
+          f'x{single_elapsed / bulk_elapsed:.1f})')
+
+
+if __name__ == '__main__':
+    main()
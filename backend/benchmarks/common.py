@@ -0,0 +1,189 @@
+"""压测脚本公共工具"""
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+from app import create_app, db
+from app.models.activity import Activity
+from app.models.activity_facet import ActivityFacet
+from app.models.registration import Registration
+from app.models.user import User
+
+
+# 合成活动坐标的中心点
+GEO_CENTER = (31.23, 121.47)
+
+
+def make_app(**config):
+    """在临时目录下的独立 SQLite 数据库上创建应用，不影响 instance 中的数据"""
+    workdir = tempfile.mkdtemp(prefix='volunteer-bench-')
+    config.setdefault(
+        'SQLALCHEMY_DATABASE_URI', 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    )
+    return create_app(config)
+
+
+def seed_users(app, count, prefix='user'):
+    """批量创建用户，返回 [(user_id, 认证请求头), ...]"""
+    # 密码哈希开销较大，所有压测用户共用一个
+    password_hash = generate_password_hash('password')
+    with app.app_context():
+        users = [
+            User(
+                username=f'{prefix}{i}',
+                email=f'{prefix}{i}@bench.local',
+                password_hash=password_hash,
+                real_name=f'{prefix}{i}'
+            )
+            for i in range(count)
+        ]
+        db.session.add_all(users)
+        db.session.flush()
+        user_ids = [user.id for user in users]
+        db.session.commit()
+        return [
+            (user_id, {'Authorization': f'Bearer {create_access_token(identity=user_id)}'})
+            for user_id in user_ids
+        ]
+
+
+def seed_activity(app, created_by, **fields):
+    """创建一个未来开始的活动，返回活动 id"""
+    start_time = datetime.utcnow() + timedelta(days=7)
+    values = {
+        'title': '压测活动',
+        'description': '压测活动描述',
+        'location': '社区服务中心',
+        'start_time': start_time,
+        'end_time': start_time + timedelta(hours=2),
+        'created_by': created_by,
+    }
+    values.update(fields)
+    with app.app_context():
+        activity = Activity(**values)
+        db.session.add(activity)
+        db.session.commit()
+        return activity.id
+
+
+def seed_activities(app, count, created_by, batch_size=5000):
+    """批量插入 count 个活动（executemany），用于列表类压测
+
+    活动坐标确定性地分布在以 GEO_CENTER 为中心、约 67 x 67 公里的范围内。
+    """
+    categories = ['环保', '助老', '教育', '社区', '文化']
+    now = datetime.utcnow()
+    with app.app_context():
+        for start in range(0, count, batch_size):
+            rows = []
+            for i in range(start, min(start + batch_size, count)):
+                start_time = now + timedelta(days=i % 60 + 1, hours=i % 24)
+                rows.append({
+                    'title': f'志愿活动{i}',
+                    'description': f'第{i}场志愿活动的详细介绍。' * 20,
+                    'location': f'社区服务站{i % 50}',
+                    'start_time': start_time,
+                    'end_time': start_time + timedelta(hours=3),
+                    'max_participants': 50,
+                    'current_participants': i % 51,
+                    'status': 'active',
+                    'category': categories[i % len(categories)],
+                    'volunteer_hours': 3.0,
+                    'requirements': '年满18周岁，身体健康。' * 5,
+                    'contact_person': '联系人',
+                    'contact_phone': '13800000000',
+                    'image_url': '',
+                    'latitude': GEO_CENTER[0] + (i * 7919 % 6000 - 3000) / 10000,
+                    'longitude': GEO_CENTER[1] + (i * 104729 % 7000 - 3500) / 10000,
+                    'created_by': created_by,
+                    'created_at': now - timedelta(seconds=count - i),
+                    'updated_at': now,
+                })
+            db.session.execute(insert(Activity), rows)
+            ActivityFacet.add(Counter((row['category'], row['status']) for row in rows))
+            db.session.commit()
+
+
+def seed_registrations(app, activity_id, user_ids, status='registered'):
+    """为一批用户批量插入某活动的报名记录，返回报名 id 列表（与 user_ids 顺序一致）"""
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(insert(Registration), [
+            {'user_id': user_id, 'activity_id': activity_id, 'status': status,
+             'registration_time': now}
+            for user_id in user_ids
+        ])
+        db.session.execute(
+            Activity.__table__.update().where(Activity.id == activity_id).values(
+                current_participants=Activity.current_participants + len(user_ids)
+            )
+        )
+        db.session.commit()
+        rows = db.session.query(Registration.id, Registration.user_id).filter(
+            Registration.activity_id == activity_id
+        ).all()
+        ids = {user_id: registration_id for registration_id, user_id in rows}
+        return [ids[user_id] for user_id in user_ids]
+
+
+def seed_dataset(app, users, activities, registrations, batch_size=20000):
+    """按给定规模批量生成完整的合成数据集（用户、活动、报名），结果可复现
+
+    报名按 (用户, 活动) 确定性分布且不重复：第 i 条属于用户 i % users，
+    同一用户的报名落在相邻的不同活动上，因此每个用户最多 activities 条报名。
+    所有用户的密码均为 password。
+    """
+    if registrations > users * activities:
+        raise ValueError('registrations must not exceed users * activities')
+
+    now = datetime.utcnow()
+    with app.app_context():
+        from app.utils.passwords import password_hasher
+
+        password_hash = password_hasher.hash('password')
+        for start in range(0, users, batch_size):
+            db.session.execute(insert(User), [
+                {'username': f'user{i}', 'email': f'user{i}@bench.local',
+                 'password_hash': password_hash, 'real_name': f'志愿者{i}',
+                 'role': 'admin' if i == 0 else 'volunteer', 'volunteer_hours': float(i % 97),
+                 'created_at': now, 'updated_at': now}
+                for i in range(start, min(start + batch_size, users))
+            ])
+            db.session.commit()
+        admin_id = db.session.query(User.id).filter(User.username == 'user0').scalar()
+        first_user_id = admin_id
+
+    seed_activities(app, activities, admin_id, batch_size=min(batch_size, 5000))
+
+    statuses = ['registered', 'checked_in', 'completed', 'completed', 'cancelled']
+    with app.app_context():
+        first_activity_id = db.session.query(db.func.min(Activity.id)).scalar()
+        for start in range(0, registrations, batch_size):
+            rows = []
+            for i in range(start, min(start + batch_size, registrations)):
+                user_index, round_index = i % users, i // users
+                rows.append({
+                    'user_id': first_user_id + user_index,
+                    'activity_id': first_activity_id + (user_index * 31 + round_index) % activities,
+                    'status': statuses[i % len(statuses)],
+                    'registration_time': now - timedelta(minutes=registrations - i),
+                })
+            db.session.execute(insert(Registration), rows)
+            db.session.commit()
+
+        # 报名人数与实际报名记录保持一致
+        counts = Registration.query.with_entities(
+            Registration.activity_id, db.func.count(Registration.id)
+        ).filter(Registration.status != 'cancelled').group_by(Registration.activity_id).all()
+        db.session.execute(Activity.__table__.update().values(current_participants=0))
+        db.session.execute(
+            Activity.__table__.update().where(
+                Activity.id == db.bindparam('activity_id')
+            ).values(current_participants=db.bindparam('participants')),
+            [{'activity_id': activity_id, 'participants': count} for activity_id, count in counts]
+        )
+        db.session.commit()
+    return admin_id
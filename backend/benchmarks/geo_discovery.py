@@ -0,0 +1,137 @@
+"""附近活动与时间窗口查询压测：R*Tree 空间索引、B-tree 列索引与全表扫描的对比
+
+生成 --activities 个带坐标的活动（默认 10 万，缓存到 --data-dir），分别在三种模式下
+请求「附近 + 时间窗口」「附近」「时间窗口」三类列表查询：
+- rtree: R*Tree 索引按外接矩形与开始时间查出候选活动
+- btree: 不使用 R*Tree，按 (latitude, longitude) 与 (status, start_time) 索引的范围条件查询
+- scan: 同时删除上述两个索引，作为没有任何空间/时间索引时的参照
+三种模式返回的结果数逐一核对一致。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.geo_discovery
+    python -m benchmarks.geo_discovery --activities 20000 --requests 200 --threads 4
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from app import create_app, db
+from app.models.activity import Activity
+from benchmarks.common import GEO_CENTER, seed_activities, seed_users
+from benchmarks.suite import SUITE_CONFIG, Scenario, TestClientTransport, run_scenario
+
+MODES = ('rtree', 'btree', 'scan')
+
+
+def prepare_database(count, data_dir):
+    """生成（或复用已缓存的）活动数据集，返回缓存文件路径"""
+    os.makedirs(data_dir, exist_ok=True)
+    cached = os.path.join(data_dir, f'geo-{count}.db')
+    if not os.path.exists(cached):
+        print(f'Seeding {count} activities ...', flush=True)
+        started = time.perf_counter()
+        partial = cached + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        app = create_app(dict(SUITE_CONFIG, SQLALCHEMY_DATABASE_URI=f'sqlite:///{partial}'))
+        (admin_id, _), = seed_users(app, 1, prefix='geo-admin')
+        seed_activities(app, count, admin_id)
+        with app.app_context():
+            db.engine.dispose()
+        with sqlite3.connect(partial) as conn:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        os.replace(partial, cached)
+        print(f'Seeded in {time.perf_counter() - started:.1f}s', flush=True)
+    return cached
+
+
+def build_scenarios(first_start, radius_km):
+    """查询中心在数据范围内按请求序号轮换，时间窗口从最早的开始时间起按天滑动"""
+    def center(i):
+        return (f'lat={GEO_CENTER[0] + (i * 37 % 41 - 20) / 100:.2f}'
+                f'&lng={GEO_CENTER[1] + (i * 53 % 47 - 23) / 100:.2f}&radius_km={radius_km}')
+
+    def window(i, days):
+        after = first_start + timedelta(days=i % 50)
+        return (f'starts_after={after.isoformat()}'
+                f'&starts_before={(after + timedelta(days=days)).isoformat()}')
+
+    return [
+        Scenario('nearby+window', lambda i: (
+            'GET', f'/api/activities/?{center(i)}&{window(i, 3)}&per_page=20', None, None)),
+        Scenario('nearby', lambda i: (
+            'GET', f'/api/activities/?{center(i)}&per_page=20', None, None)),
+        Scenario('window', lambda i: (
+            'GET', f'/api/activities/?{window(i, 1)}&per_page=20', None, None)),
+    ]
+
+
+def open_mode(cached, mode):
+    """复制数据集并按模式创建应用"""
+    workdir = tempfile.mkdtemp(prefix='volunteer-geo-')
+    path = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(cached, path)
+    app = create_app(dict(SUITE_CONFIG, SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}'))
+    with app.app_context():
+        if mode != 'rtree':
+            app.extensions['activity_geo'] = False
+        if mode == 'scan':
+            db.session.execute(db.text('DROP INDEX ix_activities_latitude_longitude'))
+            db.session.execute(db.text('DROP INDEX ix_activities_status_start_time'))
+            db.session.commit()
+        first_start = db.session.query(db.func.min(Activity.start_time)).scalar()
+    return app, first_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--activities', type=int, default=100000, help='活动数量')
+    parser.add_argument('--radius-km', type=float, default=3.0, help='附近查询的半径（公里）')
+    parser.add_argument('--requests', type=int, default=300, help='每类查询的请求数')
+    parser.add_argument('--threads', type=int, default=8, help='并发线程数')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'volunteer-bench-data'),
+                        help='数据集缓存目录')
+    args = parser.parse_args()
+
+    cached = prepare_database(args.activities, args.data_dir)
+    print(f'activities={args.activities} radius={args.radius_km}km '
+          f'requests={args.requests} threads={args.threads}')
+    print(f'{"query":<16}{"mode":<7}{"rps":>9}{"p50 ms":>10}{"p99 ms":>10}{"queries":>9}{"errors":>8}')
+
+    results, totals = {}, {}
+    for mode in MODES:
+        app, first_start = open_mode(cached, mode)
+        transport = TestClientTransport(app)
+        client = app.test_client()
+        for scenario in build_scenarios(first_start, args.radius_km):
+            # 核对各模式的结果数一致
+            totals[(scenario.name, mode)] = [
+                client.get(scenario.request(i)[1]).get_json()['total'] for i in range(20)
+            ]
+            result = run_scenario(transport, scenario, None, args.requests, args.threads)
+            results[(scenario.name, mode)] = result
+            print(f'{scenario.name:<16}{mode:<7}{result["rps"]:>9}{result["p50_ms"]:>10}'
+                  f'{result["p99_ms"]:>10}{result["queries_per_request"]:>9}{result["errors"]:>8}',
+                  flush=True)
+
+    print()
+    mismatched = False
+    for scenario in build_scenarios(first_start, args.radius_km):
+        rtree, scan = results[(scenario.name, 'rtree')], results[(scenario.name, 'scan')]
+        btree = results[(scenario.name, 'btree')]
+        matches = [totals[(scenario.name, mode)] for mode in MODES]
+        mismatched |= any(total != matches[0] for total in matches)
+        print(f'{scenario.name:<16}avg matches {sum(matches[0]) / len(matches[0]):.0f}, '
+              f'p50 rtree {rtree["p50_ms"]} / btree {btree["p50_ms"]} / scan {scan["p50_ms"]} ms')
+    if mismatched:
+        print('result counts differ between modes', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
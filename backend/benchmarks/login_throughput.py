@@ -0,0 +1,76 @@
+"""登录吞吐压测：对比不同密码哈希算法与成本参数下的每秒登录数
+
+用法（在 backend 目录下）:
+    python -m benchmarks.login_throughput --logins 200 --threads 16
+    python -m benchmarks.login_throughput --only bcrypt-10 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from app import db
+from app.models.user import User
+from app.utils.passwords import password_hasher
+from benchmarks.common import make_app, seed_users
+
+CONFIGURATIONS = {
+    'bcrypt-10': {'PASSWORD_HASHER': 'bcrypt', 'BCRYPT_ROUNDS': 10},
+    'bcrypt-12': {'PASSWORD_HASHER': 'bcrypt', 'BCRYPT_ROUNDS': 12},
+    'scrypt-2^14': {'PASSWORD_HASHER': 'scrypt', 'SCRYPT_N': 2 ** 14},
+    'scrypt-2^15': {'PASSWORD_HASHER': 'scrypt', 'SCRYPT_N': 2 ** 15},
+    'pbkdf2-310k': {'PASSWORD_HASHER': 'pbkdf2', 'PBKDF2_ITERATIONS': 310000},
+    'pbkdf2-600k': {'PASSWORD_HASHER': 'pbkdf2', 'PBKDF2_ITERATIONS': 600000},
+}
+
+
+def run(name, config, args):
+    app = make_app(**config, PASSWORD_HASH_WORKERS=args.workers,
+                   PASSWORD_HASH_MAX_PENDING=args.logins)
+    users = seed_users(app, args.users)
+    with app.app_context():
+        # 所有用户共用一个按当前配置生成的哈希，登录时不会触发重新哈希
+        User.query.update({User.password_hash: password_hasher.hash('password')})
+        db.session.commit()
+
+    def login(i):
+        response = app.test_client().post('/api/auth/login', json={
+            'username': f'user{i % len(users)}', 'password': 'password'
+        })
+        return response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        statuses = Counter(pool.map(login, range(args.logins)))
+    elapsed = time.perf_counter() - started
+
+    print(f'{name:<12} {args.logins / elapsed:8.1f} logins/s  '
+          f'{elapsed / args.logins * 1000:7.1f} ms/login  '
+          + ' '.join(f'{status}:{count}' for status, count in sorted(statuses.items())))
+    return statuses[200] == args.logins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=100, help='每种配置的登录请求数')
+    parser.add_argument('--users', type=int, default=50, help='压测用户数')
+    parser.add_argument('--threads', type=int, default=16, help='并发请求线程数')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='密码哈希线程池大小（默认按 CPU 数，0 为在请求线程内计算）')
+    parser.add_argument('--only', action='append', choices=sorted(CONFIGURATIONS),
+                        help='只运行指定配置，可重复')
+    args = parser.parse_args()
+
+    if args.workers is None:
+        args.workers = os.cpu_count() or 1
+
+    print(f'{args.logins} logins, {args.threads} threads, hash workers={args.workers}')
+    ok = True
+    for name in args.only or CONFIGURATIONS:
+        ok = run(name, CONFIGURATIONS[name], args) and ok
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
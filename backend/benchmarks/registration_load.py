@@ -0,0 +1,57 @@
+"""并发报名压测：大量用户同时报名同一热门活动，校验恰好 max_participants 人成功
+
+用法（在 backend 目录下）:
+    python -m benchmarks.registration_load --users 500 --capacity 50 --threads 32
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from app import db
+from app.models.activity import Activity
+from app.models.registration import Registration
+from benchmarks.common import make_app, seed_activity, seed_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=500, help='并发报名的用户数')
+    parser.add_argument('--capacity', type=int, default=50, help='活动人数上限')
+    parser.add_argument('--threads', type=int, default=32, help='并发线程数')
+    args = parser.parse_args()
+
+    app = make_app()
+    users = seed_users(app, args.users)
+    activity_id = seed_activity(app, users[0][0], max_participants=args.capacity)
+    url = f'/api/activities/{activity_id}/register'
+
+    def register(user):
+        _, headers = user
+        response = app.test_client().post(url, headers=headers, json={})
+        return response.status_code, (response.get_json() or {}).get('error')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = Counter(pool.map(register, users))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        current_participants = db.session.get(Activity, activity_id).current_participants
+        registrations = Registration.query.filter_by(activity_id=activity_id).count()
+
+    print(f'{args.users} requests, {args.threads} threads: '
+          f'{elapsed:.2f}s, {args.users / elapsed:.1f} req/s')
+    for (status, error), count in sorted(results.items(), key=lambda item: -item[1]):
+        print(f'  {status} {error or "ok"}: {count}')
+    print(f'current_participants={current_participants} registrations={registrations}')
+
+    succeeded = results[(201, None)]
+    expected = min(args.capacity, args.users)
+    ok = succeeded == current_participants == registrations == expected
+    print('PASS' if ok else f'FAIL: expected exactly {expected} successful registrations')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
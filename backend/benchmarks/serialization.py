@@ -0,0 +1,64 @@
+"""列表序列化微基准：ORM + to_dict() + 标准库 JSON 对比列投影 + orjson
+
+用法（在 backend 目录下）:
+    python -m benchmarks.serialization --activities 2000 --page-size 100 --iterations 200
+"""
+import argparse
+import time
+from flask.json.provider import DefaultJSONProvider
+from app.models.activity import Activity, ACTIVITY_PROJECTION
+from app.utils.serialization import OrJSONProvider, orjson
+from benchmarks.common import make_app, seed_activities, seed_users
+
+
+def legacy_page(app, page_size):
+    """修改前的路径：加载完整 ORM 对象，逐个 to_dict()"""
+    activities = Activity.query.filter(Activity.status == 'active').order_by(
+        Activity.created_at.desc(), Activity.id.desc()
+    ).limit(page_size).all()
+    return app.json.dumps([activity.to_dict() for activity in activities])
+
+
+def projection_page(app, page_size):
+    """列投影路径：只查询输出列，由结果行直接序列化"""
+    rows = Activity.query.with_entities(*ACTIVITY_PROJECTION.columns()).filter(
+        Activity.status == 'active'
+    ).order_by(
+        Activity.created_at.desc(), Activity.id.desc()
+    ).limit(page_size).all()
+    return app.json.dumps(ACTIVITY_PROJECTION.serialize_all(rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--activities', type=int, default=2000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    app = make_app(JSON_PROVIDER='default')
+    (user_id, _), = seed_users(app, 1)
+    seed_activities(app, args.activities, user_id)
+
+    variants = [
+        ('orm + to_dict + json', legacy_page, DefaultJSONProvider(app)),
+        ('projection + json', projection_page, DefaultJSONProvider(app)),
+    ]
+    if orjson is not None:
+        variants.append(('projection + orjson', projection_page, OrJSONProvider(app)))
+
+    with app.test_request_context():
+        baseline = None
+        for name, run, provider in variants:
+            app.json = provider
+            run(app, args.page_size)  # 预热
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                run(app, args.page_size)
+            per_page_ms = (time.perf_counter() - started) / args.iterations * 1000
+            baseline = baseline or per_page_ms
+            print(f'{name:<22} {per_page_ms:7.2f} ms/page  x{baseline / per_page_ms:.2f}')
+
+
+if __name__ == '__main__':
+    main()
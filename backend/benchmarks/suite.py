@@ -0,0 +1,333 @@
+"""API 基准测试套件：在合成数据集上并发请求各个端点，报告延迟分位数、吞吐与每请求查询数
+
+数据集按 --scale 生成并缓存到 --data-dir（相同规模只生成一次），每次运行使用其副本，
+写操作不会影响后续运行。每请求查询数取自 Server-Timing 响应头。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.suite --scale small
+    python -m benchmarks.suite --scale large --threads 16 --requests 500
+    python -m benchmarks.suite --scale small --save benchmarks/baselines/small.json
+    python -m benchmarks.suite --scale small --compare benchmarks/baselines/small.json
+    python -m benchmarks.suite --only activities.list --only users.statistics --server
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import make_server
+from app import create_app
+from benchmarks.common import GEO_CENTER, seed_dataset
+
+# 数据集规模：(用户数, 活动数, 报名数)
+SCALES = {
+    'tiny': (500, 250, 5000),
+    'small': (5000, 2500, 100000),
+    'medium': (20000, 10000, 500000),
+    'large': (100000, 50000, 2000000),
+}
+
+# 套件使用的配置：关闭响应缓存与后台任务，测量的是数据库路径本身
+SUITE_CONFIG = {
+    'RESPONSE_CACHE_BACKEND': 'none',
+    'SCHEDULER_MODE': 'none',
+    'SERVER_TIMING': True,
+    'SLOW_QUERY_MS': 0,
+    'BCRYPT_ROUNDS': 4,
+}
+
+
+class Scenario:
+    """一个被测端点：request(i) 返回第 i 个请求的 (方法, 路径, 用户序号, JSON 请求体)"""
+
+    def __init__(self, name, request):
+        self.name = name
+        self.request = request
+
+
+def build_scenarios(users, activities):
+    search_terms = ['志愿活动1', '社区服务站', '详细介绍', '志愿活动42']
+    return [
+        Scenario('activities.list', lambda i: (
+            'GET', f'/api/activities/?page={i % 20 + 1}&per_page=20', None, None)),
+        Scenario('activities.list_cursor', lambda i: (
+            'GET', '/api/activities/?cursor=&per_page=20', None, None)),
+        Scenario('activities.search', lambda i: (
+            'GET', f'/api/activities/?search={search_terms[i % len(search_terms)]}', None, None)),
+        Scenario('activities.nearby', lambda i: (
+            'GET', f'/api/activities/?lat={GEO_CENTER[0] + (i % 9 - 4) / 100:.2f}'
+                   f'&lng={GEO_CENTER[1] + (i % 7 - 3) / 100:.2f}&radius_km=3&per_page=20', None, None)),
+        Scenario('activities.facets', lambda i: (
+            'GET', '/api/activities/facets', None, None)),
+        Scenario('activities.detail', lambda i: (
+            'GET', f'/api/activities/{i * 7919 % activities + 1}', None, None)),
+        Scenario('auth.profile', lambda i: (
+            'GET', '/api/auth/profile', i * 13 % users, None)),
+        Scenario('users.my_registrations', lambda i: (
+            'GET', '/api/users/my-registrations?per_page=20', i * 17 % users, None)),
+        Scenario('users.statistics', lambda i: (
+            'GET', '/api/users/statistics', i * 19 % users, None)),
+        Scenario('users.leaderboard', lambda i: (
+            'GET', '/api/users/leaderboard?limit=20', i * 23 % users, None)),
+        Scenario('activities.register', lambda i: (
+            # 用户 i 报名距离已有报名较远的活动，避免重复报名
+            'POST', f'/api/activities/{(i * 31 + activities // 2) % activities + 1}/register',
+            i % users, {})),
+        Scenario('auth.login', lambda i: (
+            'POST', '/api/auth/login', None,
+            {'username': f'user{i * 29 % users}', 'password': 'password'})),
+    ]
+
+
+def prepare_database(scale, data_dir):
+    """生成（或复用已缓存的）数据集，返回本次运行使用的数据库副本路径"""
+    users, activities, registrations = SCALES[scale]
+    os.makedirs(data_dir, exist_ok=True)
+    cached = os.path.join(data_dir, f'{scale}.db')
+    if not os.path.exists(cached):
+        print(f'Seeding {scale} dataset: {users} users, {activities} activities, '
+              f'{registrations} registrations ...', flush=True)
+        started = time.perf_counter()
+        partial = cached + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        app = create_app(dict(SUITE_CONFIG, SQLALCHEMY_DATABASE_URI=f'sqlite:///{partial}'))
+        seed_dataset(app, users, activities, registrations)
+        with app.app_context():
+            from app import db
+            db.engine.dispose()
+        # 合并 WAL 后再作为缓存文件
+        with sqlite3.connect(partial) as conn:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        os.replace(partial, cached)
+        print(f'Seeded in {time.perf_counter() - started:.1f}s', flush=True)
+
+    workdir = tempfile.mkdtemp(prefix='volunteer-suite-')
+    path = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(cached, path)
+    return path
+
+
+def token_factory(app):
+    """返回 tokens(用户序号) -> 访问令牌，令牌按需生成并缓存（user0 为管理员）"""
+    with app.app_context():
+        from app import db
+        from app.models.user import User
+
+        first_user_id = db.session.query(db.func.min(User.id)).scalar()
+    cache = {}
+    lock = threading.Lock()
+
+    def tokens(user_index):
+        with lock:
+            if user_index not in cache:
+                with app.app_context():
+                    role = 'admin' if user_index == 0 else 'volunteer'
+                    cache[user_index] = create_access_token(
+                        identity=first_user_id + user_index,
+                        additional_claims={'role': role, 'username': f'user{user_index}'}
+                    )
+            return cache[user_index]
+    return tokens
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class TestClientTransport:
+    """通过 Flask test client 在进程内发送请求"""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def send(self, method, path, headers, body):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers, json=body)
+        return response.status_code, response.headers.get('Server-Timing', '')
+
+    def close(self):
+        pass
+
+
+class ServerTransport:
+    """启动本地多线程 WSGI 服务器，通过 HTTP 发送请求"""
+
+    def __init__(self, app):
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def send(self, method, path, headers, body):
+        data = None
+        headers = dict(headers)
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, response.headers.get('Server-Timing', '')
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Server-Timing', '')
+
+    def close(self):
+        self.server.shutdown()
+
+
+def run_scenario(transport, scenario, tokens, count, threads):
+    def one(i):
+        method, path, user_index, body = scenario.request(i)
+        headers = {}
+        if user_index is not None:
+            headers['Authorization'] = f'Bearer {tokens(user_index)}'
+        started = time.perf_counter()
+        status, timing = transport.send(method, path, headers, body)
+        elapsed = time.perf_counter() - started
+        match = re.search(r'desc="(\d+) queries"', timing)
+        return elapsed, status, int(match.group(1)) if match else None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(one, range(count)))
+    wall = time.perf_counter() - started
+
+    latencies = [elapsed for elapsed, _, _ in results]
+    queries = [query_count for _, _, query_count in results if query_count is not None]
+    return {
+        'requests': count,
+        'errors': sum(1 for _, status, _ in results if status >= 400),
+        'rps': round(count / wall, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """与基线比较，返回回归描述列表
+
+    每请求查询数只允许因并发下缓存未命中产生的微小波动（0.25）；
+    p50 与吞吐允许 tolerance 的相对波动，且 p50 增加需超过 min_delta_ms；
+    p99 在常规请求数下受调度抖动影响过大，只报告不比较。
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        if (previous['queries_per_request'] is not None and current['queries_per_request'] is not None
+                and current['queries_per_request'] > previous['queries_per_request'] + 0.25):
+            regressions.append(f'{name}: queries/request {previous["queries_per_request"]}'
+                               f' -> {current["queries_per_request"]}')
+        if (current['p50_ms'] > previous['p50_ms'] * (1 + tolerance)
+                and current['p50_ms'] - previous['p50_ms'] > min_delta_ms):
+            regressions.append(f'{name}: p50_ms {previous["p50_ms"]} -> {current["p50_ms"]}')
+        if current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f'{name}: rps {previous["rps"]} -> {current["rps"]}')
+        if current['errors'] > previous['errors']:
+            regressions.append(f'{name}: errors {previous["errors"]} -> {current["errors"]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES, key=lambda name: SCALES[name]), default='small')
+    parser.add_argument('--requests', type=int, default=200, help='每个端点的请求数')
+    parser.add_argument('--threads', type=int, default=8, help='并发线程数')
+    parser.add_argument('--server', action='store_true', help='通过本地 WSGI 服务器（HTTP）而非 test client 请求')
+    parser.add_argument('--only', action='append', help='只运行指定端点，可重复')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'volunteer-bench-data'),
+                        help='数据集缓存目录')
+    parser.add_argument('--save', help='将结果保存为 JSON 基线')
+    parser.add_argument('--compare', help='与 JSON 基线比较，有回归时返回非零退出码')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='延迟/吞吐允许的相对波动')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='延迟增加低于该值时不视为回归')
+    args = parser.parse_args()
+
+    users, activities, registrations = SCALES[args.scale]
+    database = prepare_database(args.scale, args.data_dir)
+    app = create_app(dict(SUITE_CONFIG, SQLALCHEMY_DATABASE_URI=f'sqlite:///{database}'))
+
+    tokens = token_factory(app)
+    scenarios = build_scenarios(users, activities)
+    if args.only:
+        unknown = set(args.only) - {scenario.name for scenario in scenarios}
+        if unknown:
+            parser.error(f'unknown scenario: {", ".join(sorted(unknown))}')
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.only]
+
+    transport = ServerTransport(app) if args.server else TestClientTransport(app)
+    print(f'scale={args.scale} ({users} users, {activities} activities, {registrations} registrations) '
+          f'requests={args.requests} threads={args.threads} '
+          f'transport={"server" if args.server else "test-client"}')
+    print(f'{"endpoint":<26}{"rps":>9}{"p50 ms":>10}{"p99 ms":>10}{"queries":>9}{"errors":>8}')
+    results = {}
+    try:
+        for scenario in scenarios:
+            result = run_scenario(transport, scenario, tokens, args.requests, args.threads)
+            results[scenario.name] = result
+            queries = '-' if result['queries_per_request'] is None else result['queries_per_request']
+            print(f'{scenario.name:<26}{result["rps"]:>9}{result["p50_ms"]:>10}{result["p99_ms"]:>10}'
+                  f'{queries:>9}{result["errors"]:>8}', flush=True)
+    finally:
+        transport.close()
+
+    report = {
+        'meta': {
+            'scale': args.scale,
+            'users': users,
+            'activities': activities,
+            'registrations': registrations,
+            'requests': args.requests,
+            'threads': args.threads,
+            'transport': 'server' if args.server else 'test-client',
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f'Saved baseline to {args.save}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        print('FAIL' if regressions else f'OK (compared with {args.compare})')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
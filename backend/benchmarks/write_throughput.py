@@ -0,0 +1,73 @@
+"""SQLite 写入吞吐压测：对比默认连接参数与 WAL + synchronous=NORMAL
+
+多个写线程持续更新个人资料，同时有读线程拉取活动列表，
+分别统计两种配置下的写入/读取吞吐和 database is locked 等错误数。
+
+用法（在 backend 目录下）:
+    python -m benchmarks.write_throughput --writers 8 --readers 8 --seconds 5
+"""
+import argparse
+import threading
+import time
+from benchmarks.common import make_app, seed_activity, seed_users
+
+PROFILES = {
+    # 修改前：rollback journal + synchronous=FULL（SQLite 默认值）
+    'before': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL'},
+    'after': {'SQLITE_JOURNAL_MODE': 'WAL', 'SQLITE_SYNCHRONOUS': 'NORMAL'},
+}
+
+
+def run_profile(name, args):
+    app = make_app(**PROFILES[name])
+    users = seed_users(app, args.writers)
+    for _ in range(20):
+        seed_activity(app, users[0][0])
+
+    deadline = time.perf_counter() + args.seconds
+    counters = {'writes': 0, 'reads': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def record(key):
+        with lock:
+            counters[key] += 1
+
+    def writer(headers):
+        client = app.test_client()
+        i = 0
+        while time.perf_counter() < deadline:
+            response = client.put('/api/auth/profile', headers=headers, json={'phone': str(i)})
+            record('writes' if response.status_code == 200 else 'errors')
+            i += 1
+
+    def reader():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            response = client.get('/api/activities/?include_total=false')
+            record('reads' if response.status_code == 200 else 'errors')
+
+    threads = [threading.Thread(target=writer, args=(headers,)) for _, headers in users]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f'{name:>6}: {counters["writes"] / args.seconds:8.1f} writes/s '
+          f'{counters["reads"] / args.seconds:8.1f} reads/s '
+          f'{counters["errors"]} errors  ({PROFILES[name]})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8, help='写线程数')
+    parser.add_argument('--readers', type=int, default=8, help='读线程数')
+    parser.add_argument('--seconds', type=float, default=5, help='每种配置的持续时间')
+    args = parser.parse_args()
+
+    for name in PROFILES:
+        run_profile(name, args)
+
+
+if __name__ == '__main__':
+    main()
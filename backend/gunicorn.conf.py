@@ -0,0 +1,25 @@
+"""gunicorn 配置（需 pip install gunicorn）：gunicorn -c gunicorn.conf.py wsgi:app
+
+与 serve.py 读取相同的环境变量。应用在主进程中加载一次（建表/迁移只执行一次），
+预热后再 fork 出 worker，worker 启动后重新初始化数据库连接池。
+"""
+import os
+from app.utils.serving import after_fork, before_fork, warmup
+
+bind = f"{os.environ.get('SERVER_HOST', '0.0.0.0')}:{os.environ.get('SERVER_PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('SERVER_THREADS', 8))
+graceful_timeout = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+preload_app = True
+
+
+def when_ready(server):
+    app = server.app.wsgi()
+    if os.environ.get('SERVER_WARMUP', 'true').lower() not in ('false', '0', 'no'):
+        warmup(app)
+    before_fork(app)
+
+
+def post_fork(server, worker):
+    after_fork(server.app.wsgi())
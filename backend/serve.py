@@ -0,0 +1,49 @@
+"""生产环境启动入口：预派生多进程 WSGI 服务器（开发调试仍使用 run.py）
+
+主进程加载应用（建表/迁移只执行一次）并预热，随后 fork 出多个 worker 共享监听端口。
+不支持 fork 的平台（Windows）退化为单进程多线程服务器。
+
+用法（在 backend 目录下）:
+    python serve.py
+    python serve.py --workers 4 --port 8000
+    WEB_CONCURRENCY=4 SERVER_PORT=8000 python serve.py
+"""
+import argparse
+import os
+from werkzeug.serving import make_server
+from app import create_app
+from app.utils.serving import PreforkServer, warmup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=os.environ.get('SERVER_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('SERVER_PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1)),
+                        help='worker 进程数')
+    parser.add_argument('--graceful-timeout', type=int,
+                        default=int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30)),
+                        help='停止时等待处理中请求的最长时间（秒）')
+    parser.add_argument('--no-warmup', action='store_true',
+                        default=os.environ.get('SERVER_WARMUP', 'true').lower() in ('false', '0', 'no'),
+                        help='跳过启动预热')
+    args = parser.parse_args()
+
+    app = create_app()
+    if not args.no_warmup:
+        warmup(app)
+
+    if not hasattr(os, 'fork'):
+        server = make_server(args.host, args.port, app, threaded=True)
+        print(f' * Running on http://{args.host}:{server.server_port}', flush=True)
+        server.serve_forever()
+        return
+
+    PreforkServer(
+        app, host=args.host, port=args.port, workers=max(args.workers, 1),
+        graceful_timeout=args.graceful_timeout
+    ).run()
+
+
+if __name__ == '__main__':
+    main()
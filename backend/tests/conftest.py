@@ -0,0 +1,93 @@
+import contextlib
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models.activity import Activity
+from app.models.user import User
+from app.utils.identity import identity_claims
+
+# 测试使用的配置：独立的临时数据库，关闭响应缓存与后台任务，降低密码哈希成本
+TEST_CONFIG = {
+    'TESTING': True,
+    'RESPONSE_CACHE_BACKEND': 'none',
+    'SCHEDULER_MODE': 'none',
+    'BCRYPT_ROUNDS': 4,
+    'PASSWORD_HASH_WORKERS': 0,
+    'CHECKIN_QUEUE_MODE': 'sync',
+}
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(dict(TEST_CONFIG, SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "test.db"}'))
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """创建用户，返回 (user_id, 认证请求头)"""
+    def make(username, role='volunteer'):
+        with app.app_context():
+            user = User(
+                username=username, email=f'{username}@test.local',
+                password_hash='unused', real_name=username, role=role
+            )
+            db.session.add(user)
+            db.session.commit()
+            token = create_access_token(identity=user.id, additional_claims=identity_claims(user))
+            return user.id, {'Authorization': f'Bearer {token}'}
+    return make
+
+
+@pytest.fixture
+def count_queries(app):
+    """上下文管理器：统计块内执行的 SQL 语句（不含 PRAGMA），返回语句列表"""
+    @contextlib.contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if not statement.lstrip().upper().startswith('PRAGMA'):
+                statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+    return counter
+
+
+@pytest.fixture
+def seed_activities(app):
+    """批量插入 count 个活动，返回活动 id 列表"""
+    def seed(count, created_by, **overrides):
+        now = datetime.utcnow()
+        with app.app_context():
+            activities = []
+            for i in range(count):
+                start_time = now + timedelta(days=i % 30 + 1, hours=i % 24)
+                fields = dict(
+                    title=f'志愿活动{i}', location=f'社区服务站{i % 5}',
+                    start_time=start_time, end_time=start_time + timedelta(hours=3),
+                    category=('环保', '助老', '教育')[i % 3], volunteer_hours=3.0,
+                    created_by=created_by
+                )
+                fields.update(overrides)
+                activities.append(Activity(**fields))
+            db.session.add_all(activities)
+            db.session.commit()
+            return [activity.id for activity in activities]
+    return seed
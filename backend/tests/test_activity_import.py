@@ -0,0 +1,89 @@
+from datetime import datetime
+from app import db
+from app.models.activity import Activity
+
+
+def _row(**overrides):
+    row = {
+        'title': '社区清洁', 'description': '清理公园垃圾', 'location': '中心公园',
+        'start_time': '2030-05-01T09:00:00', 'end_time': '2030-05-01T12:00:00',
+    }
+    row.update(overrides)
+    return row
+
+
+def _import(client, headers, rows):
+    response = client.post('/api/activities/import', json={'activities': rows}, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+
+def test_import_and_create_share_the_utc_rule(app, client, make_user):
+    _, headers = make_user('admin', role='admin')
+    report = _import(client, headers, [
+        _row(start_time='2030-05-01T09:00:00Z', end_time='2030-05-01T12:00:00'),
+        _row(start_time='2030-05-01T09:00:00+08:00', end_time='2030-05-01T03:00:00'),
+        _row(start_time='2030-05-01T09:00:00', end_time='2030-05-01T12:00:00+08:00'),
+    ])
+    assert report['imported'] == 2
+    assert report['errors'] == [{'row': 3, 'error': 'Start time must be before end time'}]
+
+    created = client.post('/api/activities/', json=_row(
+        start_time='2030-05-01T09:00:00+08:00', end_time='2030-05-01T03:00:00'
+    ), headers=headers)
+    assert created.status_code == 201
+
+    # 带时区偏移的时间统一换算为不带时区的 UTC 时间，导入与创建结果一致
+    with app.app_context():
+        times = db.session.query(Activity.start_time, Activity.end_time).order_by(Activity.id).all()
+    assert [tuple(row) for row in times] == [
+        (datetime(2030, 5, 1, 9), datetime(2030, 5, 1, 12)),
+        (datetime(2030, 5, 1, 1), datetime(2030, 5, 1, 3)),
+        (datetime(2030, 5, 1, 1), datetime(2030, 5, 1, 3)),
+    ]
+
+    # 时间窗口参数按同一规则解析
+    window = client.get('/api/activities/?starts_after=2030-05-01T08:30:00%2B08:00'
+                        '&starts_before=2030-05-01T09:30:00%2B08:00').get_json()
+    assert window['total'] == 2
+
+
+def test_non_scalar_text_fields_are_rejected_per_row(app, client, make_user):
+    _, headers = make_user('admin', role='admin')
+    report = _import(client, headers, [
+        _row(),
+        _row(description={'text': '嵌套对象'}),
+        _row(requirements=['年满18周岁']),
+        _row(category=True),
+        _row(contact_phone=13800000000),
+    ])
+
+    assert report['imported'] == 2
+    assert report['errors'] == [
+        {'row': 2, 'error': 'description must be a string'},
+        {'row': 3, 'error': 'requirements must be a string'},
+        {'row': 4, 'error': 'category must be a string'},
+    ]
+    with app.app_context():
+        assert Activity.query.filter_by(contact_phone='13800000000').count() == 1
+
+
+def test_failed_chunk_is_reported_per_row(app, client, make_user):
+    _, headers = make_user('admin', role='admin')
+    app.config['IMPORT_CHUNK_SIZE'] = 2
+    with app.app_context():
+        db.session.execute(db.text(
+            "CREATE TRIGGER reject_boom BEFORE INSERT ON activities WHEN new.title = 'boom' "
+            "BEGIN SELECT RAISE(ABORT, 'rejected'); END"
+        ))
+        db.session.commit()
+
+    report = _import(client, headers, [
+        _row(), _row(), _row(title='boom'), _row(), _row(start_time='bad'),
+    ])
+
+    assert (report['imported'], report['failed']) == (2, 3)
+    assert [error['row'] for error in report['errors']] == [3, 4, 5]
+    assert report['errors'][0]['error'] == 'Database error: rejected'
+    with app.app_context():
+        assert Activity.query.count() == 2
@@ -0,0 +1,65 @@
+def _get(client, count_queries, query_string='', etag=None):
+    headers = {'If-None-Match': etag} if etag else {}
+    with count_queries() as statements:
+        response = client.get(f'/api/activities/?{query_string}', headers=headers)
+    return response, len(statements)
+
+
+def test_matching_etag_returns_304_without_page_query(client, make_user, seed_activities, count_queries):
+    admin_id, _ = make_user('admin', role='admin')
+    seed_activities(30, admin_id)
+
+    response, queries = _get(client, count_queries, 'per_page=5')
+    assert response.status_code == 200
+    assert len(response.get_json()['activities']) == 5
+    assert response.get_json()['total'] == 30
+    # 版本聚合（兼作总数）+ 数据页，不再单独 COUNT
+    assert queries == 2
+
+    etag = response.headers['ETag']
+    not_modified, queries = _get(client, count_queries, 'per_page=5', etag)
+    assert not_modified.status_code == 304
+    assert not_modified.get_data() == b''
+    # 只执行版本聚合，不查询数据页、不序列化
+    assert queries == 1
+
+
+def test_etag_depends_on_query_args_and_facets(client, make_user, seed_activities, count_queries):
+    admin_id, _ = make_user('admin', role='admin')
+    seed_activities(9, admin_id)
+
+    etag = _get(client, count_queries, 'per_page=5')[0].headers['ETag']
+    # 省略参数与显式传入默认值等价
+    assert _get(client, count_queries, 'per_page=5&page=1', etag)[0].status_code == 304
+    assert _get(client, count_queries, 'per_page=5&page=2', etag)[0].status_code == 200
+    assert _get(client, count_queries, 'per_page=5&category=环保', etag)[0].status_code == 200
+
+    response, queries = _get(client, count_queries, 'facets=true')
+    assert 'categories' in response.get_json()['facets']
+    # 版本聚合 + 分类计数 + 数据页
+    assert queries == 3
+    assert _get(client, count_queries, 'facets=true', response.headers['ETag'])[0].status_code == 304
+
+
+def test_etag_changes_after_writes(client, make_user, seed_activities, count_queries):
+    admin_id, admin_headers = make_user('admin', role='admin')
+    _, volunteer_headers = make_user('volunteer')
+    activity_ids = seed_activities(5, admin_id)
+
+    etag = _get(client, count_queries)[0].headers['ETag']
+    # 报名只修改 current_participants
+    registered = client.post(f'/api/activities/{activity_ids[0]}/register', headers=volunteer_headers, json={})
+    assert registered.status_code == 201, registered.get_json()
+    response = _get(client, count_queries, etag=etag)[0]
+    assert response.status_code == 200
+    assert response.get_json()['activities'][-1]['current_participants'] == 1
+
+    etag = response.headers['ETag']
+    created = client.post('/api/activities/', headers=admin_headers, json={
+        'title': '新活动', 'description': '新活动', 'location': '社区服务站', 'category': '环保',
+        'start_time': '2099-01-01T09:00:00', 'end_time': '2099-01-01T12:00:00',
+    })
+    assert created.status_code == 201
+    response = _get(client, count_queries, etag=etag)[0]
+    assert response.status_code == 200
+    assert response.get_json()['total'] == 6
@@ -0,0 +1,66 @@
+from sqlalchemy import event
+from app import db
+from app.models.hours_ledger import HoursLedgerEntry
+from app.models.registration import Registration
+from app.models.user import User
+
+
+def _checked_in(app, make_user, seed_activities, members=3):
+    admin_id, headers = make_user('admin', role='admin')
+    activity_id, = seed_activities(1, admin_id)
+    member_ids = [make_user(f'member{i}')[0] for i in range(members)]
+    with app.app_context():
+        registrations = [Registration(user_id=member_id, activity_id=activity_id, status='checked_in')
+                         for member_id in member_ids]
+        db.session.add_all(registrations)
+        db.session.commit()
+        return headers, activity_id, [registration.id for registration in registrations]
+
+
+def _ledger(app):
+    with app.app_context():
+        return (HoursLedgerEntry.query.count(),
+                sorted(hours for hours, in db.session.query(User.volunteer_hours).filter(User.role != 'admin')))
+
+
+def test_completion_credits_hours_once(app, client, make_user, seed_activities):
+    headers, activity_id, registration_ids = _checked_in(app, make_user, seed_activities)
+    url = f'/api/activities/{activity_id}/complete'
+
+    first = client.post(url, json={'registration_ids': registration_ids[:2] + [999999]}, headers=headers)
+    assert first.get_json()['succeeded'] == 2
+    assert [result['success'] for result in first.get_json()['results']] == [True, True, False]
+
+    second = client.post(url, json={'registration_ids': registration_ids}, headers=headers).get_json()
+    assert second['succeeded'] == 1
+    assert [result.get('error') for result in second['results']] == [
+        'Registration is completed', 'Registration is completed', None
+    ]
+    assert _ledger(app) == (3, [3.0, 3.0, 3.0])
+
+
+def test_rows_changed_concurrently_are_not_credited(app, client, make_user, seed_activities):
+    headers, activity_id, registration_ids = _checked_in(app, make_user, seed_activities)
+    raced = registration_ids[0]
+
+    # 在状态流转的 UPDATE 执行前，模拟另一个事务已把其中一条报名改为 completed
+    def concurrent_completion(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE registrations'):
+            cursor.connection.execute(
+                "UPDATE registrations SET status = 'completed' WHERE id = ?", (raced,)
+            )
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', concurrent_completion)
+    try:
+        response = client.post(f'/api/activities/{activity_id}/complete',
+                               json={'registration_ids': registration_ids}, headers=headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', concurrent_completion)
+
+    body = response.get_json()
+    assert body['succeeded'] == 2
+    assert body['results'][0] == {'registration_id': raced, 'success': False,
+                                  'error': 'Registration is completed'}
+    assert _ledger(app) == (2, [0.0, 3.0, 3.0])
@@ -0,0 +1,206 @@
+import sqlite3
+import time
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.models.checkin_batch import CheckInBatch
+from app.models.registration import Registration
+from app.models.user_stats import UserStats
+from app.utils.checkin_queue import checkin_queue
+from tests.conftest import TEST_CONFIG
+
+
+@pytest.fixture
+def synced_batch(app, client, make_user, seed_activities):
+    """活动创建者提交一个离线签到批次，返回 (活动 id, 创建者请求头)"""
+    organizer_id, organizer = make_user('organizer')
+    member_id, _ = make_user('member')
+    activity_id, = seed_activities(1, organizer_id)
+    with app.app_context():
+        registration = Registration(user_id=member_id, activity_id=activity_id)
+        db.session.add(registration)
+        db.session.commit()
+        registration_id = registration.id
+
+    response = client.post(
+        f'/api/activities/{activity_id}/check-in/sync',
+        json={'items': [{'registration_id': registration_id}]},
+        headers=dict(organizer, **{'Idempotency-Key': 'batch-1'})
+    )
+    assert response.status_code == 202
+    return activity_id, organizer
+
+
+def test_batch_status_requires_manager(client, make_user, synced_batch):
+    activity_id, organizer = synced_batch
+    _, outsider = make_user('outsider')
+    url = f'/api/activities/{activity_id}/check-in/sync/batch-1'
+
+    assert client.get(url, headers=outsider).status_code == 403
+    response = client.get(url, headers=organizer)
+    assert response.status_code == 200
+    assert response.get_json()['batch']['status'] == 'applied'
+
+
+def test_replayed_batch_requires_manager(client, make_user, synced_batch):
+    activity_id, organizer = synced_batch
+    _, outsider = make_user('outsider')
+    url = f'/api/activities/{activity_id}/check-in/sync'
+
+    response = client.post(url, json={'items': []}, headers=dict(outsider, **{'Idempotency-Key': 'batch-1'}))
+    assert response.status_code == 403
+    assert 'batch' not in response.get_json()
+    response = client.post(url, json={'items': []}, headers=dict(organizer, **{'Idempotency-Key': 'batch-1'}))
+    assert response.status_code == 200
+
+
+def test_pending_batches_drain_after_restart(tmp_path):
+    # 模拟重启：批次已持久化但未处理，新进程在第一个请求后开始处理
+    app = create_app(dict(TEST_CONFIG, CHECKIN_QUEUE_MODE='thread', CHECKIN_QUEUE_POLL_INTERVAL=0.05,
+                          SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "restart.db"}'))
+    with app.app_context():
+        db.session.add(CheckInBatch(idempotency_key='left-over', activity_id=1, submitted_by=1, items=[],
+                                    received_at=datetime.utcnow()))
+        db.session.commit()
+
+    app.test_client().get('/api/activities/')
+    deadline = time.monotonic() + 5
+    with app.app_context():
+        while time.monotonic() < deadline:
+            status = db.session.query(CheckInBatch.status).filter_by(idempotency_key='left-over').scalar()
+            db.session.remove()
+            if status == 'applied':
+                break
+            time.sleep(0.05)
+    assert status == 'applied'
+
+
+def test_concurrently_cancelled_registration_is_not_checked_in(app, client, make_user, seed_activities):
+    app.config['USER_STATS_COUNTERS'] = True
+    organizer_id, organizer = make_user('organizer')
+    member_ids = [make_user(f'member{i}')[0] for i in range(2)]
+    activity_id, = seed_activities(1, organizer_id)
+    with app.app_context():
+        registrations = [Registration(user_id=member_id, activity_id=activity_id) for member_id in member_ids]
+        db.session.add_all(registrations)
+        db.session.commit()
+        cancelled, kept = [registration.id for registration in registrations]
+
+    # 队列读取报名状态之后、签到 UPDATE 执行之前，其中一条报名被取消
+    def concurrent_cancel(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE registrations'):
+            cursor.connection.execute("UPDATE registrations SET status = 'cancelled' WHERE id = ?", (cancelled,))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', concurrent_cancel)
+    try:
+        response = client.post(
+            f'/api/activities/{activity_id}/check-in/sync',
+            json={'items': [{'registration_id': cancelled}, {'registration_id': kept}]},
+            headers=dict(organizer, **{'Idempotency-Key': 'race'})
+        )
+    finally:
+        event.remove(engine, 'before_cursor_execute', concurrent_cancel)
+
+    assert response.get_json()['batch']['results'] == [
+        {'registration_id': cancelled, 'success': False, 'error': 'Registration is cancelled'},
+        {'registration_id': kept, 'success': True, 'status': 'checked_in'},
+    ]
+    with app.app_context():
+        assert [UserStats.load(member_id)['checked_in_activities'] for member_id in member_ids] == [0, 1]
+        assert db.session.get(Registration, kept).check_in_time is not None
+
+
+def test_transient_errors_are_retried_with_backoff(app, client, make_user, seed_activities):
+    app.config['CHECKIN_QUEUE_MAX_ATTEMPTS'] = 2
+    organizer_id, organizer = make_user('organizer')
+    member_id, _ = make_user('member')
+    activity_id, = seed_activities(1, organizer_id)
+    with app.app_context():
+        registration = Registration(user_id=member_id, activity_id=activity_id)
+        db.session.add(registration)
+        db.session.commit()
+        registration_id = registration.id
+
+    def locked(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE registrations'):
+            raise OperationalError(statement, parameters, sqlite3.OperationalError('database is locked'))
+
+    def submit():
+        return client.post(
+            f'/api/activities/{activity_id}/check-in/sync',
+            json={'items': [{'registration_id': registration_id}]},
+            headers=dict(organizer, **{'Idempotency-Key': 'flaky'})
+        ).get_json()['batch']
+
+    def retry_now():
+        with app.app_context():
+            CheckInBatch.query.update({CheckInBatch.retry_at: datetime.utcnow()})
+            db.session.commit()
+            checkin_queue.drain()
+            return CheckInBatch.query.one().to_dict()
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', locked)
+    try:
+        batch = submit()
+        # 暂时性错误：放回队列等待重试，重传时看到的是待处理状态而不是 failed
+        assert (batch['status'], batch['attempts']) == ('pending', 1)
+        assert 'database is locked' in batch['error']
+        assert submit()['status'] == 'pending'
+        with app.app_context():
+            assert CheckInBatch.query.one().retry_at > datetime.utcnow()
+            assert checkin_queue.drain() == 0
+    finally:
+        event.remove(engine, 'before_cursor_execute', locked)
+
+    batch = retry_now()
+    assert (batch['status'], batch['attempts'], batch['error']) == ('applied', 2, None)
+    assert submit()['status'] == 'applied'
+    assert batch['results'] == [{'registration_id': registration_id, 'success': True, 'status': 'checked_in'}]
+
+
+def test_data_errors_fail_without_retry(app, make_user, seed_activities):
+    app.config['CHECKIN_QUEUE_MAX_ATTEMPTS'] = 2
+    organizer_id, _ = make_user('organizer')
+    member_id, _ = make_user('member')
+    activity_id, = seed_activities(1, organizer_id)
+    with app.app_context():
+        registration = Registration(user_id=member_id, activity_id=activity_id)
+        db.session.add(registration)
+        db.session.flush()
+        db.session.add(CheckInBatch(idempotency_key='broken', activity_id=activity_id, submitted_by=organizer_id,
+                                    items=[{'registration_id': registration.id, 'checked_in_at': 'not a time'}],
+                                    received_at=datetime.utcnow()))
+        db.session.commit()
+        # 数据错误不重试
+        checkin_queue.drain()
+        batch = CheckInBatch.query.one().to_dict()
+    assert (batch['status'], batch['attempts']) == ('failed', 1)
+
+
+def test_transient_errors_fail_after_max_attempts(app, make_user, seed_activities):
+    app.config['CHECKIN_QUEUE_MAX_ATTEMPTS'] = 2
+    organizer_id, _ = make_user('organizer')
+    activity_id, = seed_activities(1, organizer_id)
+    with app.app_context():
+        db.session.add(CheckInBatch(idempotency_key='doomed', activity_id=activity_id, submitted_by=organizer_id,
+                                    items=[], received_at=datetime.utcnow(), attempts=1))
+        db.session.commit()
+
+        def locked(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('UPDATE checkin_batches') and 'applied_at' in statement:
+                raise OperationalError(statement, parameters, sqlite3.OperationalError('database is locked'))
+
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', locked)
+        try:
+            checkin_queue.drain()
+        finally:
+            event.remove(engine, 'before_cursor_execute', locked)
+        batch = CheckInBatch.query.one().to_dict()
+    assert (batch['status'], batch['attempts']) == ('failed', 2)
@@ -0,0 +1,41 @@
+from app import db
+from app.models.hours_ledger import HoursLedgerEntry
+
+
+def _credit(app, hours_by_user):
+    with app.app_context():
+        for user_id, hours in hours_by_user.items():
+            HoursLedgerEntry.record([user_id], hours)
+        db.session.commit()
+        return HoursLedgerEntry.period_of(HoursLedgerEntry.query.first().created_at)
+
+
+def test_my_hours_and_rank_match_the_live_list(app, client, make_user):
+    users = [make_user(f'member{i}') for i in range(3)]
+    (first, _), (second, _), (me, headers) = users
+    period = _credit(app, {first: 5.0, second: 3.0, me: 1.0})
+
+    # 预热身份快照，再更新时长：名次与本人时长都应读取最新数据
+    assert client.get('/api/users/leaderboard', headers=headers).get_json()['me'] == {'rank': 3, 'hours': 1.0}
+    _credit(app, {me: 3.0})
+
+    for query in ('', f'?period={period}'):
+        body = client.get(f'/api/users/leaderboard{query}', headers=headers).get_json()
+        assert body['me'] == {'rank': 2, 'hours': 4.0}
+        assert [(row['user_id'], row['rank']) for row in body['leaderboard']] == [(first, 1), (me, 2), (second, 3)]
+
+
+def test_user_without_hours_in_period(app, client, make_user):
+    other, _ = make_user('other')
+    _, headers = make_user('me')
+    period = _credit(app, {other: 2.0})
+    body = client.get(f'/api/users/leaderboard?period={period}', headers=headers).get_json()
+    assert body['me'] == {'rank': 2, 'hours': 0}
+
+
+def test_period_must_match_stored_keys(client, make_user):
+    _, headers = make_user('me')
+    for period in ('2030-5', '2030-13', '30-05', '2030-05-01'):
+        response = client.get(f'/api/users/leaderboard?period={period}', headers=headers)
+        assert response.status_code == 400, period
+    assert client.get('/api/users/leaderboard?period=2030-05', headers=headers).status_code == 200
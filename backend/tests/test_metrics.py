@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from tests.conftest import TEST_CONFIG
+
+
+def test_metrics_endpoint_is_not_exposed_without_token(client):
+    assert client.get('/metrics').status_code == 404
+
+
+@pytest.fixture
+def metrics_app(tmp_path):
+    return create_app(dict(TEST_CONFIG, METRICS_TOKEN='secret', SERVER_TIMING=True,
+                           SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "metrics.db"}'))
+
+
+def test_metrics_endpoint_requires_token(metrics_app):
+    client = metrics_app.test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert 'http_requests_total' in response.get_data(as_text=True)
+
+
+def test_failed_statements_do_not_leak_timing_state(metrics_app):
+    with metrics_app.app_context():
+        with db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.exec_driver_sql('SELECT * FROM missing_table')
+            assert not any(key.startswith('metrics') for key in conn.info)
+
+    response = metrics_app.test_client().get('/api/activities/')
+    assert response.status_code == 200
+    assert 'queries"' in response.headers['Server-Timing']
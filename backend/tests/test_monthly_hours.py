@@ -0,0 +1,43 @@
+from sqlalchemy import event
+from app import db
+from app.models.monthly_hours import MonthlyHours
+
+
+def _hours(app, period):
+    with app.app_context():
+        return dict(db.session.query(MonthlyHours.user_id, MonthlyHours.hours).filter_by(period=period))
+
+
+def test_add_inserts_then_accumulates(app, make_user):
+    first, _ = make_user('first')
+    second, _ = make_user('second')
+    with app.app_context():
+        MonthlyHours.add([first], '2030-05', 2.0)
+        MonthlyHours.add([first, second, second], '2030-05', 3.0)
+        db.session.commit()
+    assert _hours(app, '2030-05') == {first: 5.0, second: 3.0}
+
+
+def test_concurrent_insert_falls_back_to_update(app, make_user):
+    raced, _ = make_user('raced')
+    other, _ = make_user('other')
+
+    inserted = []
+
+    # UPDATE 之后、INSERT 的保存点之前，模拟另一个事务已插入同一用户本月的汇总行
+    def concurrent_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(('SAVEPOINT', 'INSERT INTO monthly_hours')) and not inserted:
+            inserted.append(raced)
+            cursor.connection.execute(
+                "INSERT INTO monthly_hours (user_id, period, hours) VALUES (?, '2030-05', 1.5)", (raced,)
+            )
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', concurrent_insert)
+        try:
+            MonthlyHours.add([raced, other], '2030-05', 2.0)
+            db.session.commit()
+        finally:
+            event.remove(engine, 'before_cursor_execute', concurrent_insert)
+    assert _hours(app, '2030-05') == {raced: 3.5, other: 2.0}
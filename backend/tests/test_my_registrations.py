@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.registration import Registration
+
+
+def _register_all(app, user_id, activity_ids):
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add_all(
+            Registration(user_id=user_id, activity_id=activity_id,
+                         registration_time=now - timedelta(minutes=i))
+            for i, activity_id in enumerate(activity_ids)
+        )
+        db.session.commit()
+
+
+def _queries_for(client, count_queries, headers, query_string):
+    with count_queries() as statements:
+        response = client.get(f'/api/users/my-registrations?{query_string}', headers=headers)
+    assert response.status_code == 200
+    return response.get_json(), len(statements)
+
+
+def test_query_count_does_not_grow_with_page_size(app, client, make_user, seed_activities, count_queries):
+    admin_id, _ = make_user('admin', role='admin')
+    user_id, headers = make_user('volunteer')
+    _register_all(app, user_id, seed_activities(60, admin_id))
+    # 预热：首次请求会加载 JWT 用户快照
+    client.get('/api/users/my-registrations', headers=headers)
+
+    small, small_count = _queries_for(client, count_queries, headers, 'per_page=5')
+    large, large_count = _queries_for(client, count_queries, headers, 'per_page=50')
+
+    assert len(small['registrations']) == 5
+    assert len(large['registrations']) == 50
+    assert small['total'] == large['total'] == 60
+    # 数据页 + COUNT，与每页条数无关
+    assert small_count == large_count == 2
+
+
+def test_cursor_pages_use_constant_queries(app, client, make_user, seed_activities, count_queries):
+    admin_id, _ = make_user('admin', role='admin')
+    user_id, headers = make_user('volunteer')
+    _register_all(app, user_id, seed_activities(30, admin_id))
+    client.get('/api/users/my-registrations', headers=headers)
+
+    seen, cursor, counts = [], '', []
+    while True:
+        page, count = _queries_for(
+            client, count_queries, headers, f'per_page=7&include_total=false&cursor={cursor}'
+        )
+        seen.extend(item['id'] for item in page['registrations'])
+        counts.append(count)
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 30
+    assert set(counts) == {1}
@@ -0,0 +1,42 @@
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models.user import User
+
+
+def _create(app, password_hash):
+    with app.app_context():
+        user = User(username='legacy', email='legacy@test.local', password_hash=password_hash,
+                    real_name='legacy')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def _stored_hash(app, user_id):
+    with app.app_context():
+        return db.session.get(User, user_id).password_hash
+
+
+def test_legacy_hash_is_upgraded_after_login_response(app, client):
+    legacy = generate_password_hash('secret', 'pbkdf2:sha256:1000')
+    user_id = _create(app, legacy)
+
+    response = client.post('/api/auth/login', json={'username': 'legacy', 'password': 'secret'})
+    assert response.status_code == 200
+    response.close()
+
+    upgraded = _stored_hash(app, user_id)
+    assert upgraded.startswith('$2b$04$')
+    # 新哈希仍可登录，且不再重新哈希
+    assert client.post('/api/auth/login', json={'username': 'legacy', 'password': 'secret'}).status_code == 200
+    assert _stored_hash(app, user_id) == upgraded
+
+
+def test_wrong_password_keeps_hash(app, client):
+    legacy = generate_password_hash('secret', 'pbkdf2:sha256:1000')
+    user_id = _create(app, legacy)
+
+    response = client.post('/api/auth/login', json={'username': 'legacy', 'password': 'wrong'})
+    response.close()
+    assert response.status_code == 401
+    assert _stored_hash(app, user_id) == legacy
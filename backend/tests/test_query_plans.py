@@ -0,0 +1,97 @@
+"""列表、搜索、附近活动、我的报名与用户统计接口的查询计划检查
+
+捕获接口实际执行的语句（由 _filtered_activities_query、paginate_query、UserStats.aggregate 构建），
+逐条执行 EXPLAIN QUERY PLAN，断言不全表扫描 activities / registrations，也不为排序建临时 B-tree。
+全文检索与附近活动查询由 FTS5 / R*Tree 索引驱动，只对命中的活动排序，允许临时 B-tree。
+"""
+import pytest
+from sqlalchemy import event
+from app import db
+
+
+@pytest.fixture
+def capture_plans(app):
+    """统计请求执行的语句，返回 [(语句, 查询计划明细)]"""
+    def capture(client, url, headers=None):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        with app.app_context():
+            engine = db.engine
+            event.listen(engine, 'before_cursor_execute', record)
+            try:
+                response = client.get(url, headers=headers)
+            finally:
+                event.remove(engine, 'before_cursor_execute', record)
+            assert response.status_code == 200, response.get_data(as_text=True)
+
+            with engine.connect() as conn:
+                return [
+                    (statement, [row[3] for row in conn.exec_driver_sql(
+                        'EXPLAIN QUERY PLAN ' + statement, parameters
+                    )])
+                    for statement, parameters in statements
+                ]
+    return capture
+
+
+def _assert_indexed(plans, sorts_matches=False):
+    assert plans
+    for statement, details in plans:
+        for detail in details:
+            assert detail.split()[:2] not in (['SCAN', 'activities'], ['SCAN', 'registrations']), (
+                statement, details)
+            if not sorts_matches:
+                assert 'TEMP B-TREE' not in detail, (statement, details)
+
+
+@pytest.fixture
+def dataset(app, make_user, seed_activities):
+    admin_id, _ = make_user('admin', role='admin')
+    user_id, headers = make_user('volunteer')
+    activity_ids = seed_activities(40, admin_id, latitude=31.23, longitude=121.47)
+    with app.app_context():
+        from app.models.registration import Registration
+        db.session.add_all(Registration(user_id=user_id, activity_id=activity_id)
+                           for activity_id in activity_ids[:20])
+        db.session.commit()
+    return headers
+
+
+@pytest.mark.parametrize('query_string', [
+    '',
+    'page=3&per_page=5',
+    'category=环保',
+    'cursor=&per_page=5',
+])
+def test_activity_list_plans(client, dataset, capture_plans, query_string):
+    _assert_indexed(capture_plans(client, f'/api/activities/?{query_string}'))
+
+
+@pytest.mark.parametrize('query_string', [
+    'search=志愿活动',
+    'search=志愿活动&cursor=',
+    'category=环保&search=志愿活动',
+    'lat=31.23&lng=121.47&radius_km=5',
+    'lat=31.23&lng=121.47&starts_after=2000-01-01T00:00:00&starts_before=2100-01-01T00:00:00',
+])
+def test_indexed_discovery_plans(client, dataset, capture_plans, query_string):
+    plans = capture_plans(client, f'/api/activities/?{query_string}')
+    _assert_indexed(plans, sorts_matches=True)
+    # 每条语句都先在虚拟表索引中定位候选活动
+    for statement, details in plans:
+        assert any(detail.startswith(('SCAN activities_fts', 'SCAN activities_geo')) for detail in details), (
+            statement, details)
+
+
+@pytest.mark.parametrize('url', [
+    '/api/users/my-registrations?per_page=5',
+    '/api/users/my-registrations?status=registered',
+    '/api/users/my-registrations?cursor=',
+    '/api/users/statistics',
+])
+def test_user_plans(client, dataset, capture_plans, url):
+    _assert_indexed(capture_plans(client, url, headers=dataset))
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models.registration import Registration
+from app.models.user_stats import UserStats
+
+
+@pytest.fixture
+def counters(app):
+    app.config['USER_STATS_COUNTERS'] = True
+    return app
+
+
+def _insert_before_savepoint(engine, user_id, checked_in):
+    """保存点之前模拟另一个事务已创建该用户的计数器行"""
+    inserted = []
+
+    def concurrent_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(('SAVEPOINT', 'INSERT INTO user_stats')) and not inserted:
+            inserted.append(user_id)
+            cursor.connection.execute(
+                'INSERT INTO user_stats (user_id, total_registrations, checked_in_activities, '
+                'completed_activities, cancelled_activities, created_activities) VALUES (?, 1, ?, 0, 0, 0)',
+                (user_id, checked_in)
+            )
+
+    event.listen(engine, 'before_cursor_execute', concurrent_insert)
+    return lambda: event.remove(engine, 'before_cursor_execute', concurrent_insert)
+
+
+def test_statistics_backfills_counters(counters, client, make_user):
+    _, headers = make_user('member')
+    first = client.get('/api/users/statistics', headers=headers)
+    second = client.get('/api/users/statistics', headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json()
+    with counters.app_context():
+        assert UserStats.query.count() == 1
+
+
+def test_concurrent_first_read_is_not_an_error(counters, client, make_user):
+    user_id, headers = make_user('member')
+    with counters.app_context():
+        remove = _insert_before_savepoint(db.engine, user_id, 0)
+    try:
+        response = client.get('/api/users/statistics', headers=headers)
+    finally:
+        remove()
+    assert response.status_code == 200
+    with counters.app_context():
+        assert UserStats.query.count() == 1
+
+
+def test_concurrent_insert_keeps_this_transactions_delta(counters, make_user, seed_activities):
+    admin_id, _ = make_user('admin', role='admin')
+    user_id, _ = make_user('member')
+    activity_id, = seed_activities(1, admin_id)
+    with counters.app_context():
+        db.session.add(Registration(user_id=user_id, activity_id=activity_id, status='checked_in'))
+        db.session.commit()
+
+        # 对方事务创建的行看不到本事务的签到，本事务的增量仍需累加上去
+        remove = _insert_before_savepoint(db.engine, user_id, 0)
+        try:
+            UserStats.bump_many([user_id], checked_in_activities=1)
+            db.session.commit()
+        finally:
+            remove()
+        assert db.session.get(UserStats, user_id).checked_in_activities == 1
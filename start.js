@@ -73,7 +73,9 @@ function startBackend() {
         colorLog('yellow', '[INFO] 正在启动后端服务...');
         
         const pythonCmd = isWindows ? 'python' : 'python3';
-        backendProcess = spawn(pythonCmd, ['run.py'], {
+        // BACKEND_SERVER=production 时使用多进程生产服务器
+        const backendScript = process.env.BACKEND_SERVER === 'production' ? 'serve.py' : 'run.py';
+        backendProcess = spawn(pythonCmd, [backendScript], {
             cwd: backendPath,
             stdio: ['pipe', 'pipe', 'pipe'],
             shell: true
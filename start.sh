@@ -46,8 +46,12 @@ if [ -d "venv" ]; then
     source venv/bin/activate
 fi
 
-# 启动后端（后台运行）
-python run.py &
+# 启动后端（后台运行）；BACKEND_SERVER=production 时使用多进程生产服务器
+if [ "$BACKEND_SERVER" = "production" ]; then
+    python serve.py &
+else
+    python run.py &
+fi
 BACKEND_PID=$!
 echo -e "${GREEN}[SUCCESS] 后端服务已启动 (PID: $BACKEND_PID)${NC}"
 